@@ -0,0 +1,164 @@
+"""artifact_store.py — Request-scoped ABox artifacts with bounded retention.
+
+Every pipeline run gets its own artifact, so concurrent requests for the
+same project slug can no longer overwrite each other's ABox between the
+RDF and SPARQL stages.  Two modes are supported:
+
+  memory — the rdflib Graph is handed straight to the SPARQL stage
+           (no serialise/parse round trip); the default.
+  disk   — Turtle is written to a unique temporary file and atomically
+           renamed to <root>/<slug>-<uuid>.ttl.
+
+Artifacts are pinned while in use.  A released memory artifact is
+dropped at once (nothing reads a graph back after its run); released
+disk artifacts stay on disk, where the reported abox_path points, until
+they exceed the age limit or the store exceeds its size budget, and are
+then evicted oldest first.
+
+Usage:
+    store = ArtifactStore(mode="memory", max_bytes=256 << 20)
+    art = store.put("duplex_a", graph)
+    try:
+        stage_sparql(art.source)
+    finally:
+        store.release(art)
+"""
+
+import os
+import time
+import uuid
+import hashlib
+import threading
+from pathlib import Path
+from rdflib import Graph
+
+# Rough in-memory footprint of one rdflib triple (Memory store, indexes
+# included); only used to charge memory artifacts against max_bytes.
+APPROX_BYTES_PER_TRIPLE = 600
+
+
+def graph_digest(g: Graph) -> str:
+    """SHA-256 of a graph's sorted N-Triples (independent of parse order)."""
+    h = hashlib.sha256()
+    nt = g.serialize(format="nt", encoding="utf-8")
+    for line in sorted(nt.splitlines()):
+        h.update(line + b"\n")
+    return h.hexdigest()
+
+
+class Artifact:
+    """One request's ABox: an in-memory graph or a private Turtle file."""
+
+    def __init__(self, slug: str, graph: Graph | None = None,
+                 path: Path | None = None, size: int = 0):
+        self.key = f"{slug}-{uuid.uuid4().hex}"
+        self.slug = slug
+        self.graph = graph
+        self.path = path
+        self.size = size
+        self.triple_count = len(graph) if graph is not None else 0
+        self.created = time.time()
+        self.pins = 0
+
+    @property
+    def source(self) -> Graph | str:
+        """What stage_sparql should load: the graph itself or its file path."""
+        return self.graph if self.graph is not None else str(self.path)
+
+    def digest(self) -> str:
+        """SHA-256 of the ABox (file bytes, or sorted N-Triples in memory)."""
+        if self.graph is not None:
+            return graph_digest(self.graph)
+        h = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+        return h.hexdigest()
+
+
+class ArtifactStore:
+    """Thread-safe, size- and age-bounded store of request-scoped ABoxes."""
+
+    def __init__(self, mode: str = "memory", root: str | Path | None = None,
+                 max_bytes: int = 256 << 20, max_age_s: float = 3600.0):
+        if mode not in ("memory", "disk"):
+            raise ValueError(f"Unknown artifact store mode: {mode}")
+        if mode == "disk" and root is None:
+            raise ValueError("Disk artifact store needs a root directory")
+        self.mode = mode
+        self.root = Path(root) if mode == "disk" else None
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self._items: dict[str, Artifact] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._sweep_orphans()
+
+    def _sweep_orphans(self):
+        """Delete stale files left behind by a previous process."""
+        cutoff = time.time() - self.max_age_s
+        for f in self.root.glob("*.ttl*"):
+            try:
+                if f.stat().st_mtime < cutoff:
+                    f.unlink()
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, slug: str, graph: Graph) -> Artifact:
+        """Store a new artifact for *slug*; it is returned pinned."""
+        if self.mode == "memory":
+            art = Artifact(slug, graph=graph,
+                           size=len(graph) * APPROX_BYTES_PER_TRIPLE)
+        else:
+            art = Artifact(slug)
+            final = self.root / f"{art.key}.ttl"
+            tmp = self.root / f"{art.key}.ttl.tmp"
+            graph.serialize(destination=str(tmp), format="turtle")
+            os.replace(tmp, final)
+            art.path = final
+            art.size = final.stat().st_size
+            art.triple_count = len(graph)
+
+        with self._lock:
+            art.pins = 1
+            self._items[art.key] = art
+            self._total += art.size
+            self._evict_locked()
+        return art
+
+    def release(self, art: Artifact):
+        """Unpin an artifact; memory artifacts are dropped once unpinned."""
+        with self._lock:
+            art.pins = max(0, art.pins - 1)
+            if not art.pins and art.graph is not None \
+                    and art.key in self._items:
+                self._drop_locked(art)
+            self._evict_locked()
+
+    def _drop_locked(self, art: Artifact):
+        del self._items[art.key]
+        self._total -= art.size
+        if art.path is not None:
+            try:
+                art.path.unlink()
+            except OSError:
+                pass
+
+    def _evict_locked(self):
+        now = time.time()
+        # Insertion order is creation order, so iteration is oldest first.
+        for art in list(self._items.values()):
+            if art.pins:
+                continue
+            if (now - art.created > self.max_age_s
+                    or self._total > self.max_bytes):
+                self._drop_locked(art)
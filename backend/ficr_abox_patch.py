@@ -0,0 +1,314 @@
+"""ficr_abox_patch.py — Incremental ABox updates from survey JSON changes.
+
+Computes the exact triple delta between two ficr-survey-v1 documents
+(or between a survey and an RFC 6902 JSON Patch against it), including
+the derived ficr:isStoreyAbove / isStoreyBelow / hasStoreyHeight and
+bot:adjacentZone facts, and applies it to an existing ABox graph.
+
+Only records whose JSON changed are re-emitted, so the work done is
+proportional to the size of the change rather than the building.
+
+Usage:
+    python ficr_abox_patch.py old_survey.json new_survey.json
+    python ficr_abox_patch.py old_survey.json --patch changes.json \
+        -o patched_abox.ttl
+"""
+
+import json
+import argparse
+from rdflib import Graph
+
+from ficr_json_to_rdf import (
+    BOT, RECORD_EMITTERS, instance_namespace, convert,
+    building_triples, storey_triples, storey_order_triples, door_index,
+)
+
+
+# ── RFC 6902 JSON Patch ───────────────────────────────────────────────
+
+def _pointer(path: str) -> list[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON Pointer: {path!r}")
+    return [t.replace("~1", "/").replace("~0", "~")
+            for t in path[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise ValueError(f"Invalid array index: {token!r}")
+    idx = int(token)
+    limit = len(container) + (1 if allow_end else 0)
+    if idx >= limit:
+        raise ValueError(f"Array index out of range: {idx}")
+    return idx
+
+
+def _get(doc, tokens: list[str]):
+    node = doc
+    for tok in tokens:
+        if isinstance(node, list):
+            node = node[_index(node, tok)]
+        elif isinstance(node, dict) and tok in node:
+            node = node[tok]
+        else:
+            raise ValueError(f"Path not found: /{'/'.join(tokens)}")
+    return node
+
+
+def _copy_to_parent(doc, tokens: list[str]):
+    """Shallow-copy the containers along *tokens* (copy-on-write).
+
+    Returns (new_root, parent_container).  Containers off the path stay
+    shared with the original document, which is never mutated.
+    """
+    root = list(doc) if isinstance(doc, list) else dict(doc)
+    node = root
+    for tok in tokens[:-1]:
+        key = _index(node, tok) if isinstance(node, list) else tok
+        if isinstance(node, dict) and key not in node:
+            raise ValueError(f"Path not found: /{'/'.join(tokens)}")
+        child = node[key]
+        child = list(child) if isinstance(child, list) else dict(child)
+        node[key] = child
+        node = child
+    return root, node
+
+
+def _add(doc, tokens, value):
+    if not tokens:
+        return value
+    root, parent = _copy_to_parent(doc, tokens)
+    if isinstance(parent, list):
+        parent.insert(_index(parent, tokens[-1], allow_end=True), value)
+    else:
+        parent[tokens[-1]] = value
+    return root
+
+
+def _remove(doc, tokens):
+    if not tokens:
+        raise ValueError("Cannot remove the document root")
+    root, parent = _copy_to_parent(doc, tokens)
+    if isinstance(parent, list):
+        del parent[_index(parent, tokens[-1])]
+    elif tokens[-1] in parent:
+        del parent[tokens[-1]]
+    else:
+        raise ValueError(f"Path not found: /{'/'.join(tokens)}")
+    return root
+
+
+def _replace(doc, tokens, value):
+    if not tokens:
+        return value
+    root, parent = _copy_to_parent(doc, tokens)
+    if isinstance(parent, list):
+        parent[_index(parent, tokens[-1])] = value
+    elif tokens[-1] in parent:
+        parent[tokens[-1]] = value
+    else:
+        raise ValueError(f"Path not found: /{'/'.join(tokens)}")
+    return root
+
+
+def _apply_op(doc, op: dict):
+    kind = op.get("op")
+    tokens = _pointer(op.get("path", ""))
+    if kind == "add":
+        return _add(doc, tokens, op["value"])
+    if kind == "remove":
+        return _remove(doc, tokens)
+    if kind == "replace":
+        return _replace(doc, tokens, op["value"])
+    if kind == "move":
+        src = _pointer(op["from"])
+        value = _get(doc, src)
+        return _add(_remove(doc, src), tokens, value)
+    if kind == "copy":
+        return _add(doc, tokens, _get(doc, _pointer(op["from"])))
+    if kind == "test":
+        if _get(doc, tokens) != op.get("value"):
+            raise ValueError(f"Test failed at {op.get('path')}")
+        return doc
+    raise ValueError(f"Unknown JSON Patch op: {kind!r}")
+
+
+def apply_json_patch(doc: dict, patch: list[dict]) -> dict:
+    """Apply an RFC 6902 JSON Patch and return the patched document.
+
+    *doc* is left untouched; unchanged sub-trees are shared between the
+    input and the result.  Raises ValueError on a malformed or failing
+    operation (non-object op, missing member, path through a scalar).
+    """
+    for op in patch:
+        try:
+            doc = _apply_op(doc, op)
+        except (TypeError, KeyError, IndexError, AttributeError) as e:
+            raise ValueError(f"Malformed JSON Patch op {op!r}: {e!r}") from e
+    return doc
+
+
+def patch_scope(patch: list[dict]) -> set[str]:
+    """Top-level survey keys touched by a JSON Patch."""
+    scope = set()
+    for op in patch:
+        for key in ("path", "from"):
+            if key in op:
+                tokens = _pointer(op[key])
+                if not tokens:
+                    return {"*"}
+                scope.add(tokens[0])
+    return scope
+
+
+# ── Triple delta ──────────────────────────────────────────────────────
+
+def _by_id(records: list[dict]) -> dict[str, dict]:
+    return {r["id"]: r for r in records}
+
+
+def _changed_ids(old: dict[str, dict], new: dict[str, dict]) -> set[str]:
+    changed = set()
+    for rid in old.keys() | new.keys():
+        a, b = old.get(rid), new.get(rid)
+        if a is not b and a != b:
+            changed.add(rid)
+    return changed
+
+
+def _zone_triples(spaces: list[dict], affected: set[str], inst) -> set[tuple]:
+    """bot:adjacentZone triples that involve at least one affected space."""
+    doors = door_index(spaces)
+    touched = {ref for sp in spaces if sp["id"] in affected
+               for ref in sp.get("adjacent_elements", [])
+               if ref.startswith("D-")}
+    out = set()
+    for d in touched:
+        sp_ids = doors[d]
+        for i in range(len(sp_ids)):
+            for j in range(i + 1, len(sp_ids)):
+                a, b = sp_ids[i], sp_ids[j]
+                if a in affected or b in affected:
+                    out.add((inst[a], BOT.adjacentZone, inst[b]))
+                    out.add((inst[b], BOT.adjacentZone, inst[a]))
+    return out
+
+
+def diff_surveys(old: dict, new: dict,
+                 scope: set[str] | None = None) -> tuple[set, set]:
+    """Return (added, removed) triple sets turning convert(old) into convert(new).
+
+    *scope* optionally restricts the comparison to the given top-level
+    keys (see patch_scope); by default every section is compared.
+    """
+    old_slug = old["meta"]["project_slug"]
+    if old_slug != new["meta"]["project_slug"] or (scope and "*" in scope):
+        # Every instance IRI changes with the slug — no delta to exploit.
+        old_g, new_g = set(convert(old)), set(convert(new))
+        return new_g - old_g, old_g - new_g
+
+    inst = instance_namespace(old_slug)
+    in_scope = (lambda key: True) if scope is None else (lambda key: key in scope)
+    added, removed = set(), set()
+
+    # ── Building (+ storeys, whose bot:hasStorey hangs off its IRI) ──
+    bld_old, bld_new = old["building"], new["building"]
+    storeys_dirty = False
+    if in_scope("building") and bld_old != bld_new:
+        removed.update(building_triples(bld_old, inst))
+        added.update(building_triples(bld_new, inst))
+        if bld_old["id"] != bld_new["id"]:
+            for s in old["storeys"]:
+                removed.update(storey_triples(s, bld_old["id"], inst))
+            for s in new["storeys"]:
+                added.update(storey_triples(s, bld_new["id"], inst))
+            storeys_dirty = True
+
+    # ── Storeys and derived storey ordering ──
+    if in_scope("storeys"):
+        s_old, s_new = _by_id(old["storeys"]), _by_id(new["storeys"])
+        for sid in _changed_ids(s_old, s_new):
+            if sid in s_old:
+                removed.update(storey_triples(s_old[sid], bld_old["id"], inst))
+            if sid in s_new:
+                added.update(storey_triples(s_new[sid], bld_new["id"], inst))
+            storeys_dirty = True
+    if storeys_dirty:
+        removed.update(storey_order_triples(old["storeys"], inst))
+        added.update(storey_order_triples(new["storeys"], inst))
+
+    # ── Id-keyed record arrays ──
+    for key, emit in RECORD_EMITTERS.items():
+        if not in_scope(key):
+            continue
+        r_old, r_new = _by_id(old.get(key, [])), _by_id(new.get(key, []))
+        changed = _changed_ids(r_old, r_new)
+        for rid in changed:
+            if rid in r_old:
+                removed.update(emit(r_old[rid], inst))
+            if rid in r_new:
+                added.update(emit(r_new[rid], inst))
+
+        # ── Derived bot:adjacentZone for spaces whose doors changed ──
+        if key == "spaces" and changed:
+            removed.update(_zone_triples(old["spaces"], changed, inst))
+            added.update(_zone_triples(new["spaces"], changed, inst))
+
+    return added - removed, removed - added
+
+
+def apply_delta(g: Graph, added: set, removed: set) -> Graph:
+    """Apply a triple delta to *g* in place and return it."""
+    for t in removed:
+        g.remove(t)
+    for t in added:
+        g.add(t)
+    return g
+
+
+# ── CLI ───────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Compute the ABox triple delta between two FiCR surveys")
+    ap.add_argument("old_survey", help="Previous survey JSON")
+    ap.add_argument("new_survey", nargs="?", default=None,
+                    help="Updated survey JSON")
+    ap.add_argument("--patch", default=None,
+                    help="RFC 6902 JSON Patch file (instead of new_survey)")
+    ap.add_argument("-o", "--output", default=None,
+                    help="Write the patched ABox Turtle to this path")
+    args = ap.parse_args()
+
+    if (args.new_survey is None) == (args.patch is None):
+        ap.error("give exactly one of new_survey or --patch")
+
+    with open(args.old_survey, encoding="utf-8") as f:
+        old = json.load(f)
+
+    scope = None
+    if args.patch:
+        with open(args.patch, encoding="utf-8") as f:
+            ops = json.load(f)
+        new = apply_json_patch(old, ops)
+        scope = patch_scope(ops)
+    else:
+        with open(args.new_survey, encoding="utf-8") as f:
+            new = json.load(f)
+
+    added, removed = diff_surveys(old, new, scope)
+    print(f"+{len(added)} / -{len(removed)} triples")
+
+    if args.output:
+        g = apply_delta(convert(old), added, removed)
+        g.serialize(destination=args.output, format="turtle")
+        print(f"Patched ABox written to {args.output}  ({len(g)} triples)")
+
+
+if __name__ == "__main__":
+    main()
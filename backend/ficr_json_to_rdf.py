@@ -8,7 +8,9 @@ Usage:
 """
 
 import json
+import queue
 import argparse
+import threading
 from collections import defaultdict
 from rdflib import Graph, Namespace, Literal, URIRef, RDF, RDFS, OWL, XSD
 
@@ -25,196 +27,434 @@ def _resolve(curie: str) -> URIRef:
     return URIRef(curie)
 
 
-def convert(survey: dict) -> Graph:
-    """Convert a ficr-survey-v1 dict to an rdflib Graph (ABox)."""
-    g = Graph()
-    slug = survey["meta"]["project_slug"]
+def instance_namespace(slug: str) -> Namespace:
+    """Return the instance namespace for a project slug."""
+    return Namespace(f"https://ficr.example.com/instances/{slug}/")
 
-    base = f"https://ficr.example.com/instances/{slug}/"
-    INST = Namespace(base)
 
-    g.bind("ficr", FICR)
-    g.bind("bot", BOT)
-    g.bind("inst", INST)
-    g.bind("owl", OWL)
-    g.bind("xsd", XSD)
+# ── Per-record triple emitters ────────────────────────────────────────
+# Each emitter returns the triples contributed by exactly one survey
+# record (or one derived fact family), so that convert() and the
+# incremental patcher in ficr_abox_patch.py share a single definition.
 
-    def iri(local_id: str) -> URIRef:
-        return INST[local_id]
+def _typed(subject, rdf_type, label=None) -> list[tuple]:
+    out = [(subject, RDF.type, rdf_type),
+           (subject, RDF.type, OWL.NamedIndividual)]
+    if label:
+        out.append((subject, RDFS.label, Literal(label, lang="en")))
+    return out
 
-    def add_typed(subject, rdf_type, label=None):
-        g.add((subject, RDF.type, rdf_type))
-        g.add((subject, RDF.type, OWL.NamedIndividual))
-        if label:
-            g.add((subject, RDFS.label, Literal(label, lang="en")))
 
-    def opt_decimal(subject, predicate, value):
-        if value is not None:
-            g.add((subject, predicate, Literal(value, datatype=XSD.decimal)))
+def _opt_decimal(out, subject, predicate, value):
+    if value is not None:
+        out.append((subject, predicate, Literal(value, datatype=XSD.decimal)))
 
-    def opt_integer(subject, predicate, value):
-        if value is not None:
-            g.add((subject, predicate, Literal(int(value), datatype=XSD.integer)))
 
-    def opt_boolean(subject, predicate, value):
-        if value is not None:
-            g.add((subject, predicate, Literal(value, datatype=XSD.boolean)))
+def _opt_integer(out, subject, predicate, value):
+    if value is not None:
+        out.append((subject, predicate, Literal(int(value), datatype=XSD.integer)))
 
-    # ── Building ──────────────────────────────────────────────────────
-    bld = survey["building"]
-    bld_iri = iri(bld["id"])
-    add_typed(bld_iri, _resolve(bld["type"]), bld.get("label"))
-    g.add((bld_iri, FICR.hasID, Literal(bld["id"], datatype=XSD.string)))
+
+def _opt_boolean(out, subject, predicate, value):
+    if value is not None:
+        out.append((subject, predicate, Literal(value, datatype=XSD.boolean)))
+
+
+def building_triples(bld: dict, inst: Namespace) -> list[tuple]:
+    bld_iri = inst[bld["id"]]
+    out = _typed(bld_iri, _resolve(bld["type"]), bld.get("label"))
+    out.append((bld_iri, FICR.hasID, Literal(bld["id"], datatype=XSD.string)))
     if bld.get("purpose_group"):
-        g.add((bld_iri, FICR.hasPurposeGroup, _resolve(bld["purpose_group"])))
+        out.append((bld_iri, FICR.hasPurposeGroup, _resolve(bld["purpose_group"])))
+    return out
 
-    # ── Storeys ───────────────────────────────────────────────────────
-    storeys_sorted = sorted(survey["storeys"], key=lambda s: s["elevation_m"])
-    storey_info = []  # [(iri, elevation), ...]
 
-    for s in storeys_sorted:
-        s_iri = iri(s["id"])
-        add_typed(s_iri, _resolve(s["type"]), s.get("label"))
-        opt_decimal(s_iri, FICR.hasElevation, s.get("elevation_m"))
-        g.add((bld_iri, BOT.hasStorey, s_iri))
-        storey_info.append((s_iri, s["elevation_m"]))
+def storey_triples(s: dict, bld_id: str, inst: Namespace) -> list[tuple]:
+    s_iri = inst[s["id"]]
+    out = _typed(s_iri, _resolve(s["type"]), s.get("label"))
+    _opt_decimal(out, s_iri, FICR.hasElevation, s.get("elevation_m"))
+    out.append((inst[bld_id], BOT.hasStorey, s_iri))
+    return out
+
 
-    # Derived: ficr:isStoreyAbove / ficr:isStoreyBelow
+def storey_order_triples(storeys: list[dict], inst: Namespace) -> list[tuple]:
+    """Derived ficr:isStoreyAbove / isStoreyBelow / hasStoreyHeight."""
+    storey_info = [(inst[s["id"]], s["elevation_m"])
+                   for s in sorted(storeys, key=lambda s: s["elevation_m"])]
+    out = []
     for i in range(len(storey_info) - 1):
         lower_iri = storey_info[i][0]
         upper_iri = storey_info[i + 1][0]
-        g.add((upper_iri, FICR.isStoreyAbove, lower_iri))
-        g.add((lower_iri, FICR.isStoreyBelow, upper_iri))
+        out.append((upper_iri, FICR.isStoreyAbove, lower_iri))
+        out.append((lower_iri, FICR.isStoreyBelow, upper_iri))
 
-    # Derived: ficr:hasStoreyHeight (= next storey's base elevation)
+    # hasStoreyHeight (= next storey's base elevation)
     for i in range(len(storey_info)):
         if i + 1 < len(storey_info):
             top = storey_info[i + 1][1]
-            g.add((storey_info[i][0], FICR.hasStoreyHeight,
-                   Literal(top, datatype=XSD.decimal)))
+            out.append((storey_info[i][0], FICR.hasStoreyHeight,
+                        Literal(top, datatype=XSD.decimal)))
+    return out
 
-    # ── Spaces ────────────────────────────────────────────────────────
-    for sp in survey["spaces"]:
-        sp_iri = iri(sp["id"])
-        add_typed(sp_iri, _resolve(sp["type"]), sp.get("label"))
 
-        # Storey containment
-        g.add((iri(sp["storey_ref"]), BOT.hasSpace, sp_iri))
+def space_triples(sp: dict, inst: Namespace) -> list[tuple]:
+    sp_iri = inst[sp["id"]]
+    out = _typed(sp_iri, _resolve(sp["type"]), sp.get("label"))
 
-        opt_decimal(sp_iri, FICR.hasArea, sp.get("area_m2"))
+    # Storey containment
+    out.append((inst[sp["storey_ref"]], BOT.hasSpace, sp_iri))
 
-        if sp.get("usage"):
-            g.add((sp_iri, FICR.hasSpaceUsage, _resolve(sp["usage"])))
+    _opt_decimal(out, sp_iri, FICR.hasArea, sp.get("area_m2"))
 
-        for elem_ref in sp.get("adjacent_elements", []):
-            g.add((sp_iri, BOT.adjacentElement, iri(elem_ref)))
+    if sp.get("usage"):
+        out.append((sp_iri, FICR.hasSpaceUsage, _resolve(sp["usage"])))
 
-    # ── Elements ──────────────────────────────────────────────────────
-    for elem in survey["elements"]:
-        e_iri = iri(elem["id"])
-        e_type = elem["type"]
-        add_typed(e_iri, _resolve(e_type), elem.get("label"))
-
-        if e_type == "ficr:Wall":
-            opt_integer(e_iri, FICR.hasREI, elem.get("rei"))
-            opt_boolean(e_iri, FICR.isExternal, elem.get("is_external"))
-            opt_boolean(e_iri, FICR.isLoadBearing, elem.get("is_load_bearing"))
-            opt_decimal(e_iri, FICR.hasArea, elem.get("area_m2"))
-            for role in elem.get("usage_roles", []):
-                g.add((e_iri, FICR.hasElementUsage, _resolve(role)))
-
-        elif e_type == "ficr:Slab":
-            opt_integer(e_iri, FICR.hasREI, elem.get("rei"))
-            opt_boolean(e_iri, FICR.isExternal, elem.get("is_external"))
-            opt_boolean(e_iri, FICR.isLoadBearing, elem.get("is_load_bearing"))
-            opt_decimal(e_iri, FICR.hasArea, elem.get("area_m2"))
-
-        elif e_type == "ficr:Doorset":
-            opt_boolean(e_iri, FICR.isObscured, elem.get("is_obscured"))
-            opt_integer(e_iri, FICR.hasREI, elem.get("rei"))
-            for role in elem.get("usage_roles", []):
-                g.add((e_iri, FICR.hasElementUsage, _resolve(role)))
-
-        elif e_type == "ficr:Ceiling":
-            opt_decimal(e_iri, FICR.hasArea, elem.get("area_m2"))
-            opt_decimal(e_iri, FICR.hasThickness, elem.get("thickness_m"))
-
-        elif e_type == "ficr:Window":
-            opt_boolean(e_iri, FICR.isExternal, elem.get("is_external"))
+    for elem_ref in sp.get("adjacent_elements", []):
+        out.append((sp_iri, BOT.adjacentElement, inst[elem_ref]))
+    return out
 
-    # ── Derived: bot:adjacentZone (spaces sharing a doorset) ──────────
+
+def element_triples(elem: dict, inst: Namespace) -> list[tuple]:
+    e_iri = inst[elem["id"]]
+    e_type = elem["type"]
+    out = _typed(e_iri, _resolve(e_type), elem.get("label"))
+
+    if e_type == "ficr:Wall":
+        _opt_integer(out, e_iri, FICR.hasREI, elem.get("rei"))
+        _opt_boolean(out, e_iri, FICR.isExternal, elem.get("is_external"))
+        _opt_boolean(out, e_iri, FICR.isLoadBearing, elem.get("is_load_bearing"))
+        _opt_decimal(out, e_iri, FICR.hasArea, elem.get("area_m2"))
+        for role in elem.get("usage_roles", []):
+            out.append((e_iri, FICR.hasElementUsage, _resolve(role)))
+
+    elif e_type == "ficr:Slab":
+        _opt_integer(out, e_iri, FICR.hasREI, elem.get("rei"))
+        _opt_boolean(out, e_iri, FICR.isExternal, elem.get("is_external"))
+        _opt_boolean(out, e_iri, FICR.isLoadBearing, elem.get("is_load_bearing"))
+        _opt_decimal(out, e_iri, FICR.hasArea, elem.get("area_m2"))
+
+    elif e_type == "ficr:Doorset":
+        _opt_boolean(out, e_iri, FICR.isObscured, elem.get("is_obscured"))
+        _opt_integer(out, e_iri, FICR.hasREI, elem.get("rei"))
+        for role in elem.get("usage_roles", []):
+            out.append((e_iri, FICR.hasElementUsage, _resolve(role)))
+
+    elif e_type == "ficr:Ceiling":
+        _opt_decimal(out, e_iri, FICR.hasArea, elem.get("area_m2"))
+        _opt_decimal(out, e_iri, FICR.hasThickness, elem.get("thickness_m"))
+
+    elif e_type == "ficr:Window":
+        _opt_boolean(out, e_iri, FICR.isExternal, elem.get("is_external"))
+    return out
+
+
+def door_index(spaces: list[dict]) -> dict[str, list[str]]:
+    """Map each doorset id to the ids of the spaces adjacent to it."""
     door_spaces = defaultdict(list)
-    for sp in survey["spaces"]:
+    for sp in spaces:
         for elem_ref in sp.get("adjacent_elements", []):
             if elem_ref.startswith("D-"):
                 door_spaces[elem_ref].append(sp["id"])
+    return door_spaces
 
+
+def adjacent_zone_triples(spaces: list[dict], inst: Namespace) -> list[tuple]:
+    """Derived bot:adjacentZone (spaces sharing a doorset)."""
+    out = []
     seen_pairs = set()
-    for sp_ids in door_spaces.values():
+    for sp_ids in door_index(spaces).values():
         for i in range(len(sp_ids)):
             for j in range(i + 1, len(sp_ids)):
                 pair = tuple(sorted([sp_ids[i], sp_ids[j]]))
                 if pair not in seen_pairs:
                     seen_pairs.add(pair)
-                    a, b = iri(sp_ids[i]), iri(sp_ids[j])
-                    g.add((a, BOT.adjacentZone, b))
-                    g.add((b, BOT.adjacentZone, a))
+                    a, b = inst[sp_ids[i]], inst[sp_ids[j]]
+                    out.append((a, BOT.adjacentZone, b))
+                    out.append((b, BOT.adjacentZone, a))
+    return out
+
+
+def risk_unit_triples(ru: dict, inst: Namespace) -> list[tuple]:
+    ru_iri = inst[ru["id"]]
+    out = _typed(ru_iri, FICR.RiskUnit, ru.get("label"))
+
+    for sp_ref in ru.get("covers_spaces", []):
+        out.append((ru_iri, FICR.coversSpatialZone, inst[sp_ref]))
 
-    # ── Risk Units ────────────────────────────────────────────────────
-    for ru in survey.get("risk_units", []):
-        ru_iri = iri(ru["id"])
-        add_typed(ru_iri, FICR.RiskUnit, ru.get("label"))
+    if ru.get("installation_status"):
+        out.append((ru_iri, FICR.hasInstallationStatus,
+                    _resolve(ru["installation_status"])))
 
-        for sp_ref in ru.get("covers_spaces", []):
-            g.add((ru_iri, FICR.coversSpatialZone, iri(sp_ref)))
+    for exp_ref in ru.get("is_exposed_to", []):
+        out.append((ru_iri, FICR.isExposedTo, inst[exp_ref]))
 
-        if ru.get("installation_status"):
-            g.add((ru_iri, FICR.hasInstallationStatus,
-                   _resolve(ru["installation_status"])))
+    if ru.get("declared_exposure_value") is not None:
+        out.append((ru_iri, FICR.declaredExposureValue,
+                    Literal(ru["declared_exposure_value"], datatype=XSD.decimal)))
+    return out
 
-        for exp_ref in ru.get("is_exposed_to", []):
-            g.add((ru_iri, FICR.isExposedTo, iri(exp_ref)))
 
-        if ru.get("declared_exposure_value") is not None:
-            g.add((ru_iri, FICR.declaredExposureValue,
-                   Literal(ru["declared_exposure_value"], datatype=XSD.decimal)))
+def boundary_assumption_triples(ba: dict, inst: Namespace) -> list[tuple]:
+    ba_iri = inst[ba["id"]]
+    out = _typed(ba_iri, FICR.BoundaryAssumption, ba.get("label"))
 
-    # ── Boundary Assumptions ──────────────────────────────────────────
-    for ba in survey.get("boundary_assumptions", []):
-        ba_iri = iri(ba["id"])
-        add_typed(ba_iri, FICR.BoundaryAssumption, ba.get("label"))
+    if ba.get("assumption_type"):
+        out.append((ba_iri, FICR.hasAssumptionType,
+                    _resolve(ba["assumption_type"])))
 
-        if ba.get("assumption_type"):
-            g.add((ba_iri, FICR.hasAssumptionType,
-                   _resolve(ba["assumption_type"])))
+    if ba.get("condition_state"):
+        out.append((ba_iri, FICR.hasConditionState,
+                    _resolve(ba["condition_state"])))
 
-        if ba.get("condition_state"):
-            g.add((ba_iri, FICR.hasConditionState,
-                   _resolve(ba["condition_state"])))
+    if ba.get("applies_to_risk_unit"):
+        out.append((ba_iri, FICR.appliesToRiskUnit,
+                    inst[ba["applies_to_risk_unit"]]))
 
-        if ba.get("applies_to_risk_unit"):
-            g.add((ba_iri, FICR.appliesToRiskUnit,
-                   iri(ba["applies_to_risk_unit"])))
+    for ev_ref in ba.get("supported_by_evidence", []):
+        out.append((ba_iri, FICR.supportedByEvidence, inst[ev_ref]))
+    return out
 
-        for ev_ref in ba.get("supported_by_evidence", []):
-            g.add((ba_iri, FICR.supportedByEvidence, iri(ev_ref)))
 
-    # ── Evidence Log ──────────────────────────────────────────────────
-    for ev in survey.get("evidence_log", []):
-        ev_iri = iri(ev["id"])
-        add_typed(ev_iri, _resolve(ev["type"]), ev.get("label"))
+def evidence_triples(ev: dict, inst: Namespace) -> list[tuple]:
+    ev_iri = inst[ev["id"]]
+    out = _typed(ev_iri, _resolve(ev["type"]), ev.get("label"))
 
-        if ev.get("document_title"):
-            g.add((ev_iri, FICR.documentTitle,
-                   Literal(ev["document_title"], datatype=XSD.string)))
+    if ev.get("document_title"):
+        out.append((ev_iri, FICR.documentTitle,
+                    Literal(ev["document_title"], datatype=XSD.string)))
 
-        if ev.get("document_uri"):
-            g.add((ev_iri, FICR.documentURI,
-                   Literal(ev["document_uri"], datatype=XSD.anyURI)))
+    if ev.get("document_uri"):
+        out.append((ev_iri, FICR.documentURI,
+                    Literal(ev["document_uri"], datatype=XSD.anyURI)))
+    return out
+
+
+def new_graph(slug: str) -> Graph:
+    """Create an empty ABox graph with the standard prefix bindings."""
+    g = Graph()
+    g.bind("ficr", FICR)
+    g.bind("bot", BOT)
+    g.bind("inst", instance_namespace(slug))
+    g.bind("owl", OWL)
+    g.bind("xsd", XSD)
+    return g
+
+
+def record_triples(section: str, record: dict, inst: Namespace,
+                   bld_id: str | None = None) -> list[tuple]:
+    """Triples of one record of a top-level survey section."""
+    if section == "building":
+        return building_triples(record, inst)
+    if section == "storeys":
+        return storey_triples(record, bld_id, inst)
+    return RECORD_EMITTERS[section](record, inst)
+
+
+# Top-level survey arrays whose records are keyed by "id" and emitted
+# independently (also used by ficr_abox_patch).
+RECORD_EMITTERS = {
+    "spaces": space_triples,
+    "elements": element_triples,
+    "risk_units": risk_unit_triples,
+    "boundary_assumptions": boundary_assumption_triples,
+    "evidence_log": evidence_triples,
+}
+
+
+def _build(survey: dict, triples_for) -> Graph:
+    slug = survey["meta"]["project_slug"]
+    inst = instance_namespace(slug)
+    g = new_graph(slug)
+
+    def add_all(triples):
+        for t in triples:
+            g.add(t)
+
+    # ── Building ──────────────────────────────────────────────────────
+    bld = survey["building"]
+    add_all(triples_for("building", bld, inst, None))
+
+    # ── Storeys ───────────────────────────────────────────────────────
+    for s in survey["storeys"]:
+        add_all(triples_for("storeys", s, inst, bld["id"]))
+    add_all(storey_order_triples(survey["storeys"], inst))
+
+    # ── Spaces ────────────────────────────────────────────────────────
+    for sp in survey["spaces"]:
+        add_all(triples_for("spaces", sp, inst, None))
+
+    # ── Elements ──────────────────────────────────────────────────────
+    for elem in survey["elements"]:
+        add_all(triples_for("elements", elem, inst, None))
+
+    # ── Derived: bot:adjacentZone (spaces sharing a doorset) ──────────
+    add_all(adjacent_zone_triples(survey["spaces"], inst))
+
+    # ── Risk Units, Boundary Assumptions, Evidence Log ────────────────
+    for section in ("risk_units", "boundary_assumptions", "evidence_log"):
+        for rec in survey.get(section, []):
+            add_all(triples_for(section, rec, inst, None))
 
     return g
 
 
+def convert(survey: dict) -> Graph:
+    """Convert a ficr-survey-v1 dict to an rdflib Graph (ABox)."""
+    return _build(survey, record_triples)
+
+
+# Top-level survey keys whose records contribute triples
+_CONVERTED_SECTIONS = ("building", "storeys", *RECORD_EMITTERS)
+
+
+class IncrementalConverter:
+    """Convert survey records as they arrive (e.g. while LLM#1 streams).
+
+    add() only queues a finished record; a worker thread adds its triples
+    to the graph of the streamed document, so the stream is never held
+    up.  convert() then turns that graph into convert(survey) by applying
+    the triple delta of whatever changed since (local repairs, JSON
+    Patches) with ficr_abox_patch.diff_surveys.  Unchanged records are
+    recognised by identity, so *survey* must derive from the streamed
+    records through copy-on-write edits (apply_json_patch) and records
+    must never be mutated in place.  Whenever the streamed graph cannot
+    be trusted (invalid or duplicate records, another slug) convert()
+    falls back to a full conversion: the result always equals
+    convert(survey).
+    """
+
+    _STOP = object()
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._worker: threading.Thread | None = None
+        self._stopping: threading.Thread | None = None
+        self._clear()
+        self.reused = 0         # converted records kept by the last convert()
+
+    def _clear(self):
+        self._graph: Graph | None = None
+        self._inst = None
+        self._doc: dict = {}            # the streamed document, by section
+        self._pending: list[tuple[str, dict]] = []
+        self._ids: set[tuple] = set()
+        self._converted: set[int] = set()   # id() of converted records
+        self._usable = True
+        self.records = 0        # records converted ahead of time
+
+    # ── Producer side (the stream loop) ───────────────────────────────
+
+    def reset(self):
+        """Start over for a new generation; earlier records are dropped."""
+        self._wait()
+        self._clear()
+
+    def add(self, section: str, record):
+        """Queue one finished top-level record (or the meta object)."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True,
+                                            name="abox-convert")
+            self._worker.start()
+        self._queue.put((section, record))
+
+    def finish(self):
+        """No more records: the worker stops once the queue is drained."""
+        if self._worker is not None:
+            self._queue.put(self._STOP)
+            self._stopping, self._worker = self._worker, None
+
+    def _wait(self):
+        self.finish()
+        if self._stopping is not None:
+            self._stopping.join()
+            self._stopping = None
+
+    # ── Worker ────────────────────────────────────────────────────────
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            self._receive(*item)
+
+    def _receive(self, section: str, record):
+        if section == "meta":
+            slug = record.get("project_slug") if isinstance(record, dict) else None
+            if isinstance(slug, str) and self._graph is None:
+                self._doc["meta"] = record
+                self._graph = new_graph(slug)
+                self._inst = instance_namespace(slug)
+        elif section in _CONVERTED_SECTIONS:
+            if not isinstance(record, dict):
+                self._usable = False
+                return
+            if section == "building":
+                self._doc["building"] = record
+            else:
+                self._doc.setdefault(section, []).append(record)
+            self._pending.append((section, record))
+        if self._graph is not None:
+            self._emit_pending()
+
+    def _emit_pending(self):
+        building = self._doc.get("building")
+        bld_id = building.get("id") if building is not None else None
+        waiting = []
+        for section, record in self._pending:
+            if section == "storeys" and bld_id is None:
+                waiting.append((section, record))
+                continue
+            key = (section, record.get("id"))
+            if key in self._ids:
+                self._usable = False        # duplicate id: diff by id breaks
+            self._ids.add(key)
+            try:
+                triples = record_triples(section, record, self._inst, bld_id)
+            except (KeyError, TypeError, AttributeError, ValueError):
+                self._usable = False        # invalid record: full rebuild
+                continue
+            for t in triples:
+                self._graph.add(t)
+            self._converted.add(id(record))
+            self.records += 1
+        self._pending = waiting
+
+    # ── Final graph ───────────────────────────────────────────────────
+
+    def convert(self, survey: dict) -> Graph:
+        """convert(survey), reusing the graph built while streaming."""
+        # ficr_abox_patch imports this module
+        from ficr_abox_patch import apply_delta, diff_surveys
+
+        self._wait()
+        self.reused = 0
+        g, streamed, usable = self._graph, self._doc, self._usable
+        # The graph is handed out: a second convert() rebuilds from scratch
+        self._graph, self._usable = None, False
+        if (g is None or not usable or self._pending
+                or "building" not in streamed
+                or survey["meta"]["project_slug"]
+                != streamed["meta"]["project_slug"]):
+            return convert(survey)
+        streamed = {"storeys": [], "spaces": [], "elements": [], **streamed}
+        try:
+            derived = (storey_order_triples(streamed["storeys"], self._inst)
+                       + adjacent_zone_triples(streamed["spaces"], self._inst))
+            added, removed = diff_surveys(streamed, survey)
+        except (KeyError, TypeError, AttributeError, ValueError):
+            return convert(survey)
+        for t in derived:
+            g.add(t)
+        apply_delta(g, added, removed)
+        kept = self._converted
+        self.reused = sum(id(r) in kept for section in _CONVERTED_SECTIONS
+                          for r in ([survey["building"]]
+                                    if section == "building"
+                                    else survey.get(section, [])))
+        return g
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Convert FiCR survey JSON to ABox Turtle")
@@ -0,0 +1,128 @@
+"""ficr_report_prompt.py — Compact encoding of SPARQL results for LLM #2.
+
+The report model only needs the query titles, column names and values.
+Pretty-printed JSON repeats every column name in every row and carries
+file paths and probe descriptions, so most of its input tokens are
+overhead.  This module renders each query as a small table instead:
+
+    ## A1 Building and Storey Overview (4 rows)
+    buildingID<TAB>storeyLabel<TAB>storeyType<TAB>elevation_m<TAB>...
+    BLD-DA<TAB>Level 1<TAB>GroundAndAboveStorey<TAB>0.0<TAB>...
+
+Usage:
+    python ficr_report_prompt.py results.json          # print the prompt
+    python ficr_report_prompt.py results.json --stats  # token counts only
+"""
+
+import json
+import re
+import sys
+import argparse
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional: fall back to a word/punctuation estimate
+    _ENCODING = None
+
+FORMATS = ("compact", "json")
+
+_HEADER = """\
+FiCR SPARQL results: {triples} triples, {queries} queries.
+Each section is one query: a header line of column names, then one line
+per result row. Fields are tab-separated; an empty field means no value.
+"""
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Input-token count (tiktoken if installed, otherwise an estimate)."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(_TOKEN_RE.findall(text))
+
+
+def _cell(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, (int, float)):
+        return json.dumps(v)
+    return str(v).replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+
+def format_results(sparql_results: dict) -> str:
+    """Render SPARQL results as per-query delimited tables."""
+    meta = sparql_results.get("meta", {})
+    probes = sparql_results.get("probes", {})
+    lines = [_HEADER.format(triples=meta.get("total_triples", "?"),
+                            queries=meta.get("query_count", "?"))]
+    failed = meta.get("probes_failed") or []
+    if failed:
+        lines.append("Precondition probes failed (data gap, expect empty "
+                     "results): " + ", ".join(failed) + "\n")
+
+    for qid, res in sparql_results.get("results", {}).items():
+        flags = ""
+        if not probes.get(qid, {}).get("pass", True):
+            flags = " [probe failed]"
+        lines.append(f"## {qid} {res.get('title', '')} "
+                     f"({res.get('row_count', 0)} rows){flags}")
+        if "error" in res:
+            lines.append(f"error: {_cell(res['error'])}")
+        columns = res.get("columns") or []
+        if columns and res.get("rows"):
+            lines.append("\t".join(columns))
+            for row in res["rows"]:
+                lines.append("\t".join(_cell(row.get(c)) for c in columns))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def report_input(sparql_results: dict, fmt: str = "compact") -> str:
+    """User message for the report LLM in the given format."""
+    if fmt == "json":
+        return json.dumps(sparql_results, indent=2, ensure_ascii=False)
+    if fmt == "compact":
+        return format_results(sparql_results)
+    raise ValueError(f"Unknown report input format: {fmt}")
+
+
+def token_stats(sparql_results: dict, prompt: str) -> dict:
+    """Input tokens of the pretty JSON encoding vs. the prompt actually sent."""
+    before = estimate_tokens(report_input(sparql_results, "json"))
+    after = estimate_tokens(prompt)
+    return {
+        "json_tokens": before,
+        "prompt_tokens": after,
+        "saved_pct": round(100.0 * (before - after) / before, 1) if before else 0.0,
+        "exact": _ENCODING is not None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="FiCR report prompt — compact SPARQL results for LLM #2")
+    ap.add_argument("results", help="SPARQL results JSON (ficr_sparql_runner -o)")
+    ap.add_argument("--format", choices=FORMATS, default="compact")
+    ap.add_argument("--stats", action="store_true",
+                    help="Print token counts instead of the prompt")
+    args = ap.parse_args()
+
+    with open(args.results, encoding="utf-8") as f:
+        data = json.load(f)
+    prompt = report_input(data, args.format)
+    if not args.stats:
+        sys.stdout.write(prompt)
+        return
+    s = token_stats(data, prompt)
+    kind = "tokens" if s["exact"] else "tokens (estimated)"
+    print(f"  JSON    : {s['json_tokens']:>7} {kind}")
+    print(f"  {args.format:<8}: {s['prompt_tokens']:>7} {kind}")
+    print(f"  Saved   : {s['saved_pct']}%")
+
+
+if __name__ == "__main__":
+    main()
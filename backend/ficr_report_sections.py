@@ -0,0 +1,185 @@
+"""ficr_report_sections.py — Section-wise report generation for LLM #2.
+
+REPORT_SYSTEM_PROMPT asks for six fixed sections in one long serial
+call.  Each section only needs a subset of the competency queries, so
+they can be written independently and concurrently:
+
+    1 Building Overview    A1 A2 A3
+    2 Element Inventory    A4 A5
+    3 Compliance Check     B*
+    4 Risk Assessment      C1 C2 C3 C5 C7
+    5 Evidence Summary     C4 C6
+    6 Recommendations      B1 B2 C4 C7
+
+ordered_merge() then streams the concurrently generated sections in
+section order: the earliest unfinished section streams live and later
+ones are buffered until it completes, so total latency is about that of
+the slowest section.
+
+Usage:
+    python ficr_report_sections.py results.json     # print section prompts
+"""
+
+import sys
+import asyncio
+import argparse
+import json
+from typing import AsyncIterator, NamedTuple
+
+from ficr_report_prompt import report_input
+
+_PREAMBLE = """\
+You are a fire compliance report writer. You will receive structured SPARQL
+query results from a fire compliance analysis of a building. You are writing
+ONE section of a larger report; other sections are written separately.
+
+Write only this section, starting with its heading exactly as given:
+
+{heading}
+{instructions}
+
+Use bullet points and tables where helpful. Be precise and reference specific
+element IDs and values from the data. Do not add an introduction, conclusion
+or any other section.
+"""
+
+
+class Section(NamedTuple):
+    number: int
+    title: str
+    instructions: str
+    queries: tuple[str, ...]    # query ids, or module prefixes such as "B"
+
+    @property
+    def heading(self) -> str:
+        return f"## {self.number}. {self.title}"
+
+    def wants(self, qid: str) -> bool:
+        return any(qid == q or (len(q) == 1 and qid.startswith(q))
+                   for q in self.queries)
+
+
+SECTIONS: tuple[Section, ...] = (
+    Section(1, "Building Overview",
+            "Summarise the building (name, purpose group, storeys, spaces).",
+            ("A1", "A2", "A3")),
+    Section(2, "Element Inventory",
+            "List the structural and fire-safety elements found (walls, "
+            "slabs, doorsets,\nceilings, windows) with key properties (REI "
+            "ratings, external/load-bearing\nstatus).",
+            ("A4", "A5")),
+    Section(3, "Compliance Check",
+            "For each element checked against regulatory requirements, state "
+            "whether it\nmeets the required REI rating. Highlight any "
+            "non-compliant elements.",
+            ("B",)),
+    Section(4, "Risk Assessment",
+            "Describe the risk units, their sprinkler status, boundary "
+            "assumptions, and\ncondition states. Flag any assumptions with "
+            "condition \"Unknown\" or\n\"Compromised\" as requiring further "
+            "investigation.",
+            ("C1", "C2", "C3", "C5", "C7")),
+    Section(5, "Evidence Summary",
+            "List supporting evidence (documents, observations) and note any "
+            "gaps.",
+            ("C4", "C6")),
+    Section(6, "Recommendations",
+            "Provide actionable next steps based on the findings.",
+            ("B1", "B2", "C4", "C7")),
+)
+
+# Joins consecutive sections in the assembled report.
+SEPARATOR = "\n\n"
+
+
+def system_prompt(section: Section) -> str:
+    return _PREAMBLE.format(heading=section.heading,
+                            instructions=section.instructions)
+
+
+def prompt_id(sections: tuple[Section, ...] = SECTIONS) -> str:
+    """Stable identity of the section prompts (for report cache keys)."""
+    return "\0".join(system_prompt(s) for s in sections)
+
+
+def section_results(sparql_results: dict, section: Section) -> dict:
+    """SPARQL results restricted to the queries a section needs."""
+    results = {qid: r for qid, r in sparql_results.get("results", {}).items()
+               if section.wants(qid)}
+    meta = dict(sparql_results.get("meta", {}))
+    meta["query_count"] = len(results)
+    meta["probes_failed"] = [q for q in meta.get("probes_failed") or []
+                             if q in results]
+    probes = {qid: p for qid, p in sparql_results.get("probes", {}).items()
+              if qid in results}
+    return {"meta": meta, "probes": probes, "results": results}
+
+
+def section_messages(sparql_results: dict, fmt: str = "compact",
+                     sections: tuple[Section, ...] = SECTIONS
+                     ) -> list[tuple[Section, str, str]]:
+    """(section, system prompt, user message) for each given section."""
+    return [(s, system_prompt(s),
+             report_input(section_results(sparql_results, s), fmt))
+            for s in sections]
+
+
+def join_sections(texts: list[str]) -> str:
+    return SEPARATOR.join(t.strip("\n") for t in texts)
+
+
+async def ordered_merge(streams: list[AsyncIterator[str]]) -> AsyncIterator[str]:
+    """Run chunk streams concurrently, yield their chunks in list order.
+
+    Stream i is forwarded live once streams 0..i-1 have finished; until
+    then its chunks are buffered.  SEPARATOR is inserted between streams.
+    The first failure cancels the remaining streams and is re-raised.
+    """
+    queues: list[asyncio.Queue] = [asyncio.Queue() for _ in streams]
+    done = object()
+
+    async def pump(stream, queue: asyncio.Queue):
+        try:
+            async for chunk in stream:
+                queue.put_nowait(chunk)
+        except Exception as e:
+            for q in queues:    # surface it now, not when its turn comes
+                q.put_nowait(e)
+        finally:
+            queue.put_nowait(done)
+
+    tasks = [asyncio.create_task(pump(s, q)) for s, q in zip(streams, queues)]
+    try:
+        for i, queue in enumerate(queues):
+            if i:
+                yield SEPARATOR
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="FiCR report sections — per-section prompts for LLM #2")
+    ap.add_argument("results", help="SPARQL results JSON (ficr_sparql_runner -o)")
+    ap.add_argument("--format", choices=("compact", "json"), default="compact")
+    args = ap.parse_args()
+
+    with open(args.results, encoding="utf-8") as f:
+        data = json.load(f)
+    for section, system, user_msg in section_messages(data, args.format):
+        sys.stdout.write(f"{'═' * 72}\n{section.heading}  "
+                         f"({len(section_results(data, section)['results'])} "
+                         f"queries)\n{'─' * 72}\n{system}\n{user_msg}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,9 @@ Usage:
 import json
 import re
 import argparse
+import threading
 from rdflib import Graph, Namespace, Literal, URIRef
+from rdflib.plugins.sparql import prepareQuery
 
 FICR = Namespace("https://w3id.org/bam/ficr#")
 BOT = Namespace("https://w3id.org/bot#")
@@ -125,12 +127,19 @@ PROBES = {
 
 # ── Graph loading ─────────────────────────────────────────────────────
 
-def load_graph(tbox_path: str, regulatory_path: str, abox_path: str) -> Graph:
-    """Parse and merge TBox + regulatory config + ABox into one Graph."""
+def load_graph(tbox_path: str, regulatory_path: str,
+               abox_path: "str | Graph") -> Graph:
+    """Parse and merge TBox + regulatory config + ABox into one Graph.
+
+    The ABox may be given as a Turtle path or as an in-memory Graph.
+    """
     g = Graph()
     g.parse(tbox_path, format="turtle")
     g.parse(regulatory_path, format="turtle")
-    g.parse(abox_path, format="turtle")
+    if isinstance(abox_path, Graph):
+        g += abox_path
+    else:
+        g.parse(abox_path, format="turtle")
     return g
 
 
@@ -175,14 +184,20 @@ def parse_sparql_file(path: str) -> list[tuple[str, str, str]]:
 
 # ── Probe runner ──────────────────────────────────────────────────────
 
-def run_probes(g: Graph, query_ids: list[str]) -> dict:
-    """Run ASK probes for each query id. Returns {qid: {pass, description}}."""
+def run_probes(g: Graph, query_ids: list[str],
+               probes: dict | None = None) -> dict:
+    """Run ASK probes for each query id. Returns {qid: {pass, description}}.
+
+    *probes* defaults to PROBES; values may be query strings or prepared
+    queries.
+    """
+    probes = PROBES if probes is None else probes
     out = {}
     for qid in query_ids:
-        if qid not in PROBES:
+        if qid not in probes:
             out[qid] = {"pass": True, "description": "(no probe defined)"}
             continue
-        desc, ask = PROBES[qid]
+        desc, ask = probes[qid]
         try:
             passed = bool(g.query(ask))
             out[qid] = {"pass": passed, "description": desc}
@@ -221,9 +236,12 @@ def _to_json(val):
 
 # ── Query executor ────────────────────────────────────────────────────
 
-def execute_queries(g: Graph,
-                    queries: list[tuple[str, str, str]]) -> dict:
-    """Run SELECT queries and return structured results per query."""
+def execute_queries(g: Graph, queries: list[tuple]) -> dict:
+    """Run SELECT queries and return structured results per query.
+
+    Each query is (id, title, sparql), where sparql is a query string or
+    a prepared query.
+    """
     out = {}
     for qid, title, sparql in queries:
         entry = {"title": title}
@@ -248,7 +266,7 @@ def execute_queries(g: Graph,
 # ── Public API ────────────────────────────────────────────────────────
 
 def run(tbox_path: str, regulatory_path: str,
-        abox_path: str, sparql_path: str) -> dict:
+        abox_path: "str | Graph", sparql_path: str) -> dict:
     """Full pipeline: load → probe → execute → return structured dict."""
     g = load_graph(tbox_path, regulatory_path, abox_path)
     queries = parse_sparql_file(sparql_path)
@@ -263,7 +281,8 @@ def run(tbox_path: str, regulatory_path: str,
         "meta": {
             "tbox": str(tbox_path),
             "regulatory_config": str(regulatory_path),
-            "abox": str(abox_path),
+            "abox": ("(in-memory graph)" if isinstance(abox_path, Graph)
+                     else str(abox_path)),
             "sparql_file": str(sparql_path),
             "total_triples": len(g),
             "query_count": len(queries),
@@ -274,6 +293,114 @@ def run(tbox_path: str, regulatory_path: str,
     }
 
 
+class QueryContext:
+    """TBox + regulatory config and compiled CQ/probe queries, loaded once.
+
+    Parsing the ontology and preparing the SPARQL algebra dominate a
+    single run; a context pays those costs up front so that each later
+    run only loads its ABox and evaluates.
+
+    The base graph is shared read-only.  rdflib's prepared queries keep
+    evaluation state on the query objects, so each thread gets its own
+    prepared copies.  Preparing a set is as slow as loading the ontology,
+    so one spare set is kept ready (see prepare()); the next thread that
+    needs queries adopts it instead of preparing its own.
+    """
+
+    def __init__(self, tbox_path: str, regulatory_path: str,
+                 sparql_path: str):
+        self.tbox_path = str(tbox_path)
+        self.regulatory_path = str(regulatory_path)
+        self.sparql_path = str(sparql_path)
+
+        self.base = Graph()
+        self.base.parse(self.tbox_path, format="turtle")
+        self.base.parse(self.regulatory_path, format="turtle")
+
+        self._sources = parse_sparql_file(self.sparql_path)
+        self._local = threading.local()
+        self._spare: list[tuple[list, dict]] = []
+        self._spare_lock = threading.Lock()
+        self.prepare()
+
+    def _compile(self) -> tuple[list, dict]:
+        queries = [(qid, title, prepareQuery(q))
+                   for qid, title, q in self._sources]
+        probes = {qid: (desc, prepareQuery(ask))
+                  for qid, (desc, ask) in PROBES.items()}
+        return queries, probes
+
+    def prepare(self):
+        """Make sure a prepared query set is ready for the next thread.
+
+        Safe to call from any thread (e.g. while stage 1 is running); a
+        set is only ever used by the one thread that adopts it.
+        """
+        with self._spare_lock:
+            if self._spare:
+                return
+        compiled = self._compile()
+        with self._spare_lock:
+            if not self._spare:
+                self._spare.append(compiled)
+
+    def _adopt(self):
+        with self._spare_lock:
+            compiled = self._spare.pop() if self._spare else None
+        if compiled is None:
+            compiled = self._compile()
+        self._local.queries, self._local.probes = compiled
+
+    @property
+    def queries(self) -> list[tuple]:
+        """(id, title, prepared query) list for the calling thread."""
+        if not hasattr(self._local, "queries"):
+            self._adopt()
+        return self._local.queries
+
+    @property
+    def probes(self) -> dict:
+        """{id: (description, prepared ASK)} for the calling thread."""
+        if not hasattr(self._local, "probes"):
+            self._adopt()
+        return self._local.probes
+
+    def merged(self, abox_path: "str | Graph") -> Graph:
+        """A fresh graph holding the base ontology plus one ABox."""
+        g = Graph()
+        g += self.base
+        if isinstance(abox_path, Graph):
+            g += abox_path
+        else:
+            g.parse(abox_path, format="turtle")
+        return g
+
+    def run(self, abox_path: "str | Graph") -> dict:
+        """Same result structure as run(), using the preloaded state."""
+        g = self.merged(abox_path)
+        qids = [q[0] for q in self.queries]
+
+        probes = run_probes(g, qids, self.probes)
+        results = execute_queries(g, self.queries)
+
+        failed = [qid for qid, p in probes.items() if not p["pass"]]
+
+        return {
+            "meta": {
+                "tbox": self.tbox_path,
+                "regulatory_config": self.regulatory_path,
+                "abox": ("(in-memory graph)" if isinstance(abox_path, Graph)
+                         else str(abox_path)),
+                "sparql_file": self.sparql_path,
+                "total_triples": len(g),
+                "query_count": len(self.queries),
+                "probes_failed": failed,
+            },
+            "probes": probes,
+            "results": results,
+        }
+
+
 # ── CLI ───────────────────────────────────────────────────────────────
 
 def main():
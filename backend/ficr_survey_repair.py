@@ -0,0 +1,325 @@
+"""ficr_survey_repair.py — Local repair of LLM#1 survey JSON.
+
+Most validation failures in LLM#1 output are mechanical: a missing
+"ficr:" prefix, a near-miss enum value ("ficr:Habitableroom"), numbers
+emitted as strings ("60"), or an optional array left out.  repair()
+fixes these from the JSON Schema errors alone, as RFC 6902 operations,
+without another LLM call.
+
+Whatever is left is handed back to the model as a small patch request
+(patch_request()) covering only the failing records; its JSON Patch
+reply is parsed by extract_patch() and applied with
+ficr_abox_patch.apply_json_patch().
+
+Usage:
+    python ficr_survey_repair.py survey.json -o repaired.json
+"""
+
+import re
+import json
+import difflib
+import argparse
+
+from ficr_abox_patch import apply_json_patch
+
+# Namespace spellings models use for FiCR terms instead of "ficr:".
+_TERM_PREFIXES = ("https://w3id.org/bam/ficr#", "http://w3id.org/bam/ficr#",
+                  "ficr:", "ficr_", "ficr.")
+_NUMBER_RE = re.compile(r"^\s*[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*$")
+_BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+# Enum near-misses closer than this (difflib ratio) are corrected.
+ENUM_CUTOFF = 0.85
+MAX_PASSES = 4
+
+PATCH_SYSTEM_PROMPT = """\
+You fix validation errors in a ficr-survey-v1 JSON document produced from a
+building description. You are shown the errors, the failing records and the
+ids defined in the document.
+
+Respond with ONLY a JSON array of RFC 6902 JSON Patch operations ("add",
+"remove", "replace") against the full document that fix every listed error.
+Paths are JSON Pointers such as /spaces/3/storey_ref. Do not regenerate the
+document and do not change anything that is not needed to fix an error.
+"""
+
+
+def pointer(path) -> str:
+    """JSON Pointer for a jsonschema path (deque / list of keys)."""
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1")
+                   for p in path)
+
+
+def _norm(term: str) -> str:
+    t = term.strip()
+    for prefix in _TERM_PREFIXES:
+        if t.lower().startswith(prefix.lower()):
+            t = t[len(prefix):]
+            break
+    return re.sub(r"[^a-z0-9]", "", t.lower())
+
+
+def match_term(value: str, candidates: list) -> str | None:
+    """The allowed value *value* most plausibly meant, or None."""
+    options = {_norm(c): c for c in candidates if isinstance(c, str)}
+    key = _norm(value)
+    if key in options:
+        return options[key]
+    close = difflib.get_close_matches(key, list(options), n=1,
+                                      cutoff=ENUM_CUTOFF)
+    return options[close[0]] if close else None
+
+
+def _coerce(value, expected):
+    """Value converted to one of the *expected* JSON types, or None."""
+    types = [expected] if isinstance(expected, str) else list(expected)
+    if isinstance(value, str):
+        text = value.strip()
+        if ("number" in types or "integer" in types) and _NUMBER_RE.match(text):
+            number = float(text)
+            if "integer" in types and number.is_integer():
+                return int(number)
+            if "number" in types:
+                return number
+        if "boolean" in types and text.lower() in _BOOLEANS:
+            return _BOOLEANS[text.lower()]
+        if "array" in types:
+            return [value]
+    elif isinstance(value, float) and "integer" in types and value.is_integer():
+        return int(value)
+    elif value is None and "array" in types:
+        return []
+    return None
+
+
+def _allowed(err) -> list:
+    return err.validator_value if err.validator == "enum" \
+        else [err.validator_value]
+
+
+def _branch_errors(err) -> list:
+    """Errors of the oneOf/anyOf branch the instance was most likely meant for.
+
+    Branches whose const/enum checks pass are preferred, then the branch
+    with the fewest errors.
+    """
+    branches: dict[int, list] = {}
+    for sub in err.context:
+        branches.setdefault(sub.relative_schema_path[0], []).append(sub)
+    if not branches:
+        return []
+
+    def rank(errs):
+        return (any(e.validator in ("const", "enum") for e in errs), len(errs))
+
+    return min(branches.values(), key=rank)
+
+
+def _fix_alternatives(err, ops: dict[str, dict]):
+    """oneOf/anyOf: fix a near-miss discriminator (element "type", an enum
+    or null), else repair within the most plausible branch."""
+    allowed: dict[str, tuple[object, list]] = {}    # path -> (value, values)
+    for sub in err.context:
+        if sub.validator in ("const", "enum"):
+            path = pointer(sub.absolute_path)
+            allowed.setdefault(path, (sub.instance, []))[1].extend(_allowed(sub))
+    fixed_any = False
+    for path, (value, values) in allowed.items():
+        if isinstance(value, str):
+            fixed = match_term(value, values)
+            if fixed is not None and fixed != value:
+                ops[path] = {"op": "replace", "path": path, "value": fixed}
+                fixed_any = True
+    if not fixed_any:
+        _fixes(_branch_errors(err), ops)
+
+
+def _fixes(errors, ops: dict[str, dict]):
+    """Collect a JSON Patch op per fixable error into *ops* (by path)."""
+    for err in errors:
+        path = pointer(err.absolute_path)
+        value = err.instance
+        if err.validator in ("oneOf", "anyOf"):
+            _fix_alternatives(err, ops)
+        elif err.validator in ("enum", "const") and isinstance(value, str):
+            fixed = match_term(value, _allowed(err))
+            if fixed is not None and fixed != value:
+                ops[path] = {"op": "replace", "path": path, "value": fixed}
+        elif err.validator == "type":
+            fixed = _coerce(value, err.validator_value)
+            if fixed is not None:
+                ops[path] = {"op": "replace", "path": path, "value": fixed}
+        elif err.validator == "pattern" and isinstance(value, str) \
+                and ":" in value:
+            # Prefixed ids ("inst:S1", "ficr:S1") for local ids
+            local = value.split(":", 1)[1].strip()
+            if re.search(err.validator_value, local):
+                ops[path] = {"op": "replace", "path": path, "value": local}
+        elif err.validator == "required" and isinstance(value, dict):
+            props = err.schema.get("properties", {})
+            for name in err.validator_value:
+                sub = props.get(name, {})
+                if name not in value and sub.get("type") == "array" \
+                        and not sub.get("minItems"):
+                    p = f"{path}/{name}"
+                    ops[p] = {"op": "add", "path": p, "value": []}
+
+
+def _reference_fixes(survey: dict, validator) -> list[dict]:
+    """Prefixed references ("inst:S-L1") whose local part is a defined id."""
+    ids = set()
+    if isinstance(survey.get("building"), dict):
+        ids.add(survey["building"].get("id"))
+    for section in validator.id_sections:
+        for rec in survey.get(section) or []:
+            if isinstance(rec, dict):
+                ids.add(rec.get("id"))
+
+    def fixed(ref):
+        if isinstance(ref, str) and ref not in ids and ":" in ref:
+            local = ref.split(":", 1)[1].strip()
+            if local in ids:
+                return local
+        return None
+
+    ops = []
+    for section, fields in validator.reference_fields.items():
+        records = survey.get(section)
+        if not isinstance(records, list):
+            continue
+        for i, rec in enumerate(records):
+            if not isinstance(rec, dict):
+                continue
+            for field, _ in fields:
+                value = rec.get(field)
+                base = f"/{section}/{i}/{field}"
+                if isinstance(value, list):
+                    refs = [(f"{base}/{j}", ref) for j, ref in enumerate(value)]
+                else:
+                    refs = [(base, value)]
+                for path, ref in refs:
+                    local = fixed(ref)
+                    if local is not None:
+                        ops.append({"op": "replace", "path": path,
+                                    "value": local})
+    return ops
+
+
+def repair(survey: dict, validator) -> tuple[dict, list[dict]]:
+    """Fix mechanically repairable schema and reference errors.
+
+    *validator* is a pipeline.SurveyValidator.  Returns the repaired
+    survey (the input is not modified) and the JSON Patch applied.
+    """
+    applied: list[dict] = []
+    for _ in range(MAX_PASSES):
+        if validator.schema_valid(survey):
+            break
+        ops: dict[str, dict] = {}
+        _fixes(list(validator.iter_schema_errors(survey)), ops)
+        if not ops:
+            break
+        # Only value replacements and new object keys: order is irrelevant
+        patch = list(ops.values())
+        try:
+            survey = apply_json_patch(survey, patch)
+        except ValueError:
+            break
+        applied.extend(patch)
+    if isinstance(survey, dict):
+        patch = _reference_fixes(survey, validator)
+        if patch:
+            survey = apply_json_patch(survey, patch)
+            applied.extend(patch)
+    return survey, applied
+
+
+# ── Patch requests for errors that remain ────────────────────────────
+
+def _record_pointer(error: str) -> str:
+    """Pointer to the top-level record an error message refers to."""
+    path = error.split(":", 1)[0].strip()
+    if path == "(root)":
+        return ""
+    parts = path.split(".")
+    depth = 2 if len(parts) > 1 and parts[1].isdigit() else 1
+    return "/" + "/".join(parts[:depth])
+
+
+def _get(doc, ptr: str):
+    for token in ptr.strip("/").split("/") if ptr else ():
+        doc = doc[int(token)] if isinstance(doc, list) else doc[token]
+    return doc
+
+
+def patch_request(survey: dict, errors: list[str], user_input: str,
+                  max_errors: int = 40) -> str:
+    """User message asking LLM#1 for a JSON Patch fixing *errors*."""
+    records: dict[str, object] = {}
+    for e in errors[:max_errors]:
+        ptr = _record_pointer(e)
+        if ptr and ptr not in records:
+            try:
+                records[ptr] = _get(survey, ptr)
+            except (KeyError, IndexError, ValueError, TypeError):
+                pass
+    ids = {section: [r.get("id") for r in survey.get(section) or []
+                     if isinstance(r, dict)]
+           for section in ("storeys", "spaces", "elements", "risk_units",
+                           "boundary_assumptions", "evidence_log")
+           if isinstance(survey.get(section), list)}
+    lines = [f"The document has {len(errors)} validation error(s):"]
+    lines += [f"  - {e}" for e in errors[:max_errors]]
+    if len(errors) > max_errors:
+        lines.append(f"  ... and {len(errors) - max_errors} more")
+    lines += ["", "Failing records (pointer: current value):"]
+    lines += [f"{p}: {json.dumps(v, ensure_ascii=False)}"
+              for p, v in records.items()]
+    lines += ["", "Ids defined in the document:",
+              json.dumps(ids, ensure_ascii=False),
+              "", "Original description:", user_input]
+    return "\n".join(lines)
+
+
+def extract_patch(text: str) -> list[dict]:
+    """The JSON Patch array in an LLM reply (may be in a code fence)."""
+    fence = re.search(r'```(?:json)?\s*\n(.*?)```', text, re.DOTALL)
+    if fence:
+        text = fence.group(1)
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON Patch array found in LLM response.")
+    patch = json.loads(text[start:end + 1])
+    if not all(isinstance(op, dict) and "op" in op for op in patch):
+        raise ValueError("LLM response is not a JSON Patch.")
+    return patch
+
+
+def main():
+    from pipeline import get_validator
+
+    ap = argparse.ArgumentParser(
+        description="FiCR survey repair — fix mechanical schema errors")
+    ap.add_argument("survey", help="Survey JSON (possibly invalid)")
+    ap.add_argument("-o", "--output", default=None, help="Repaired JSON path")
+    args = ap.parse_args()
+
+    with open(args.survey, encoding="utf-8") as f:
+        survey = json.load(f)
+    validator = get_validator()
+    before = validator.validate(survey)
+    repaired, patch = repair(survey, validator)
+    after = validator.validate(repaired)
+    print(f"  Errors before: {len(before)}, after: {len(after)} "
+          f"({len(patch)} fix(es))")
+    for op in patch:
+        print(f"    {op['op']:<7} {op['path']} = {json.dumps(op['value'])}")
+    for e in after:
+        print(f"  - {e}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(repaired, f, indent=2, ensure_ascii=False)
+        print(f"  Repaired survey written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""ficr_survey_stream.py — Incremental parsing of streamed LLM#1 output.
+
+LLM#1 writes one large survey JSON document.  SurveyStream is fed the
+reply chunk by chunk as it streams and hands back each top-level record
+(every item of storeys / spaces / elements / …, and the meta / building
+objects) the moment its closing brace arrives.  Records can then be
+validated and converted to RDF while the model is still writing.
+
+Structural errors — malformed JSON, a section that is not an array, a
+record that is not an object — raise StructuralError as soon as they are
+seen, so the caller can abort the generation instead of waiting minutes
+for a document that cannot be parsed.
+
+Usage:
+    stream = SurveyStream()
+    for chunk in llm.stream(system, user):
+        for section, index, record in stream.feed(chunk):
+            ...
+    survey = stream.document()
+"""
+
+import re
+import json
+import argparse
+
+# Top-level keys whose value is an array of records.
+RECORD_SECTIONS = ("storeys", "spaces", "elements", "risk_units",
+                   "boundary_assumptions", "evidence_log")
+
+_CLOSE = {"}": "{", "]": "["}
+_WS = " \t\r\n"
+_STRING_STOP = re.compile(r'["\\]')
+
+
+class StructuralError(ValueError):
+    """The streamed document cannot become a valid survey."""
+
+
+class SurveyStream:
+    """Incremental scanner over one streamed survey JSON document.
+
+    Only brackets, strings and the top-level grammar are tracked while
+    scanning; each finished record is parsed with json.loads and added to
+    the document, and text that has been consumed is dropped from the
+    buffer.  The work per chunk is therefore proportional to the chunk
+    (plus the part of the record still being written).
+    """
+
+    def __init__(self, sections=RECORD_SECTIONS):
+        self.sections = frozenset(sections)
+        self.received = 0       # characters fed so far
+        self.counts: dict[str, int] = {}
+        self.complete = False
+        self._buf = ""          # unconsumed tail of the reply
+        self._pos = 0           # scan position in _buf
+        self._started = False   # top-level "{" seen
+        self._doc: dict = {}
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._state = "key"     # top level: key / colon / value / comma
+        self._key = None
+        self._token = None      # start of the current top-level key or value
+        self._item = None       # start of the current record
+
+    def _fail(self, message: str):
+        context = self._buf[max(0, self._pos - 40):self._pos + 1]
+        raise StructuralError(f"{message} (near {context!r})")
+
+    def _parse(self, start: int, end: int, what: str):
+        try:
+            return json.loads(self._buf[start:end])
+        except json.JSONDecodeError as e:
+            self._fail(f"malformed {what}: {e.msg}")
+
+    def _append(self, chunk: str):
+        """Drop the consumed prefix of the buffer (rebasing offsets), add *chunk*."""
+        keep = min(x for x in (self._pos, self._token, self._item)
+                   if x is not None)
+        if keep:
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            if self._token is not None:
+                self._token -= keep
+            if self._item is not None:
+                self._item -= keep
+        self._buf += chunk
+        self.received += len(chunk)
+
+    def feed(self, chunk: str) -> list[tuple[str, int | None, object]]:
+        """Scan *chunk*; (section, index, record) for each record it finishes.
+
+        index is None for top-level values that are not record arrays
+        (meta, building).
+        """
+        self._append(chunk)
+        out = []
+        text = self._buf
+        n = len(text)
+        i = self._pos
+        if not self._started:
+            i = text.find("{", i)
+            if i == -1:
+                self._pos = n
+                return out
+            self._started = True
+            self._stack.append("{")
+            i += 1
+        while i < n and not self.complete:
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._state == "key":
+                        self._pos = i
+                        self._key = self._parse(self._token, i + 1, "key")
+                        self._token = None
+                        self._state = "colon"
+                else:
+                    # Jump to the next quote or backslash
+                    m = _STRING_STOP.search(text, i)
+                    i = m.start() if m else n
+                    continue
+                i += 1
+                continue
+
+            self._pos = i
+            depth = len(self._stack)
+            if depth == 1:
+                i = self._top_level(c, i, out)
+                continue
+            if depth == 2 and self._key in self.sections \
+                    and c not in _WS + ",{]":
+                self._fail(f"record in {self._key!r} is not an object")
+            if c == '"':
+                self._in_string = True
+            elif c in "{[":
+                if depth == 2 and self._key in self.sections:
+                    self._item = i
+                self._stack.append(c)
+            elif c in "}]":
+                if self._stack[-1] != _CLOSE[c]:
+                    self._fail(f"mismatched {c!r}")
+                self._stack.pop()
+                if len(self._stack) == 2 and self._item is not None:
+                    section = self._key
+                    record = self._parse(self._item, i + 1,
+                                         f"record in {section!r}")
+                    index = self.counts.get(section, 0)
+                    self.counts[section] = index + 1
+                    self._doc[section].append(record)
+                    out.append((section, index, record))
+                    self._item = None
+                elif len(self._stack) == 1:
+                    if self._key not in self.sections:
+                        self._value(self._parse(self._token, i + 1,
+                                                f"{self._key!r}"), out)
+                    self._state = "comma"
+            i += 1
+        self._pos = i
+        return out
+
+    def _top_level(self, c: str, i: int, out: list) -> int:
+        """Grammar of the top-level object: "key": value, …"""
+        if c in _WS:
+            return i + 1
+        state = self._state
+        if state == "key":
+            if c == '"':
+                self._in_string = True
+                self._token = i
+            elif c == "}" and self._key is None:
+                self._finish(i)
+            else:
+                self._fail("expected a key")
+        elif state == "colon":
+            if c != ":":
+                self._fail("expected ':'")
+            self._state = "value"
+        elif state == "value":
+            if self._key in self.sections:
+                if c != "[":
+                    self._fail(f"{self._key!r} must be an array")
+                self._doc[self._key] = []
+                self._stack.append(c)
+                self._state = "nested"
+            elif c in "{[":
+                self._token = i
+                self._stack.append(c)
+                self._state = "nested"
+            else:
+                self._token = i
+                if c == '"':
+                    self._in_string = True
+                self._state = "scalar"
+        elif state == "scalar":
+            if c == '"':
+                self._in_string = True
+            elif c in ",}":
+                self._value(self._parse(self._token, i, f"{self._key!r}"),
+                            out)
+                self._state = "comma"
+                return i    # the comma / brace is handled as such next
+        elif state == "comma":
+            if c == ",":
+                self._state = "key"
+            elif c == "}":
+                self._finish(i)
+            else:
+                self._fail("expected ',' or '}'")
+        return i + 1
+
+    def _value(self, value, out: list):
+        """A finished top-level value that is not a record array."""
+        self._doc[self._key] = value
+        self._token = None
+        out.append((self._key, None, value))
+
+    def _finish(self, i: int):
+        self._stack.pop()
+        self.complete = True
+
+    def document(self) -> dict:
+        """The complete document; StructuralError if it was cut short.
+
+        Built from the emitted records, so it shares them with the caller.
+        """
+        if not self.complete:
+            raise StructuralError(
+                "incomplete JSON document" if self._started
+                else "no JSON object in the response")
+        return self._doc
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="FiCR survey stream — replay a saved LLM#1 reply in "
+                    "chunks and show the records as they complete")
+    ap.add_argument("reply", help="Raw LLM#1 reply (JSON, may be fenced)")
+    ap.add_argument("--chunk", type=int, default=16,
+                    help="Characters per simulated chunk (default: 16)")
+    args = ap.parse_args()
+
+    with open(args.reply, encoding="utf-8") as f:
+        text = f.read()
+    stream = SurveyStream()
+    try:
+        for pos in range(0, len(text), args.chunk):
+            for section, index, record in stream.feed(text[pos:pos + args.chunk]):
+                where = section if index is None else f"{section}[{index}]"
+                rid = record.get("id", "") if isinstance(record, dict) else ""
+                print(f"  {pos + args.chunk:>8}  {where:<28} {rid}")
+        stream.document()
+    except StructuralError as e:
+        print(f"  Structural error after {stream.received} chars: {e}")
+        raise SystemExit(1)
+    print(f"  Complete: {stream.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""jobs.py — Bounded background job queue with replayable event logs.
+
+A fixed number of asyncio workers drain a bounded queue of jobs.  Each
+job runs an async generator of (event, data) pairs and buffers every
+event under a monotonically increasing id, so clients can disconnect and
+reconnect (SSE Last-Event-ID) without the work being lost or rerun.
+
+Usage:
+    manager = JobManager(workers=2, max_queued=16)
+    job = manager.submit(lambda: my_async_event_generator())
+    async for event_id, event, data in job.stream(last_event_id):
+        ...
+"""
+
+import time
+import uuid
+import asyncio
+from typing import AsyncIterator, Callable
+
+
+class QueueFull(Exception):
+    """Raised by JobManager.submit when the pending-job queue is full."""
+
+
+class Job:
+    """One queued pipeline run and its buffered event log."""
+
+    def __init__(self, factory: Callable[[], AsyncIterator[tuple[str, dict]]]):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"          # queued → running → done | failed
+        self.created = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.events: list[tuple[int, str, dict]] = []
+        self._factory = factory
+        self._cond = asyncio.Condition()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished is not None
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "event_count": len(self.events),
+        }
+
+    async def _publish(self, event: str, data: dict):
+        self.events.append((len(self.events) + 1, event, data))
+        async with self._cond:
+            self._cond.notify_all()
+
+    async def run(self):
+        self.status = "running"
+        self.started = time.time()
+        failed = False
+        try:
+            async for event, data in self._factory():
+                failed = failed or event == "error"
+                await self._publish(event, data)
+        except Exception as e:
+            failed = True
+            await self._publish("error", {"stage": "job", "message": str(e)})
+        finally:
+            self.status = "failed" if failed else "done"
+            self.finished = time.time()
+            async with self._cond:
+                self._cond.notify_all()
+
+    async def stream(self, last_event_id: int = 0
+                     ) -> AsyncIterator[tuple[int, str, dict]]:
+        """Yield buffered events after *last_event_id*, then live ones."""
+        pos = max(0, last_event_id)
+        while True:
+            while pos < len(self.events):
+                yield self.events[pos]
+                pos += 1
+            if self.is_finished:
+                return
+            async with self._cond:
+                await self._cond.wait_for(
+                    lambda: pos < len(self.events) or self.is_finished)
+
+
+class JobManager:
+    """Fixed-size worker pool over a bounded job queue."""
+
+    def __init__(self, workers: int = 2, max_queued: int = 16,
+                 retention_s: float = 900.0, max_retained: int = 256,
+                 on_start: Callable[[Job], None] | None = None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention_s = retention_s
+        self.max_retained = max_retained
+        self.on_start = on_start        # called as a worker picks a job up
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or the previous event loop has gone away.
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [loop.create_task(self._worker())
+                       for _ in range(self.workers)]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if self.on_start is not None:
+                    self.on_start(job)
+                await job.run()
+            finally:
+                self._queue.task_done()
+
+    def _evict(self):
+        now = time.time()
+        done = [j for j in self._jobs.values() if j.is_finished]
+        for j in done:
+            if now - j.finished > self.retention_s:
+                del self._jobs[j.id]
+        excess = len(self._jobs) - self.max_retained
+        if excess > 0:
+            for j in sorted((j for j in self._jobs.values() if j.is_finished),
+                            key=lambda j: j.finished)[:excess]:
+                del self._jobs[j.id]
+
+    @property
+    def running(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == "running")
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, factory: Callable[[], AsyncIterator[tuple[str, dict]]]
+               ) -> Job:
+        """Enqueue a job; raises QueueFull when max_queued jobs are waiting."""
+        self._ensure_started()
+        self._evict()
+        if self._queue.full():
+            raise QueueFull(f"{self.queue_depth} jobs already queued")
+        job = Job(factory)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
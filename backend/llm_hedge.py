@@ -0,0 +1,210 @@
+"""llm_hedge.py — Hedged LLM requests with first-to-stream-wins cancellation.
+
+A single slow provider response sets the pipeline's tail latency.  With
+hedging, a request is sent to the primary provider; if no token has
+arrived after *delay_s*, the same request also goes to a backup
+provider/model.  Whichever streams its first token first wins and the
+other request is cancelled.  A candidate that fails before its first
+token starts the next backup at once.
+
+Usage:
+    llm = HedgedLLM(primary, [backup], delay_s=3.0)   # LLMAdapter-like
+    text = llm.chat(system, user)
+
+    async for chunk in hedged_stream(
+            [("claude", lambda: stream_a()), ("openai", lambda: stream_b())],
+            delay_s=3.0):
+        ...
+"""
+
+import time
+import queue
+import asyncio
+import threading
+from typing import AsyncIterator, Callable
+
+from metrics import REGISTRY
+
+HEDGES = REGISTRY.counter(
+    "ficr_llm_hedges_total",
+    "Hedged LLM calls by outcome (not_needed / primary / backup)",
+    ["outcome"])
+
+
+def parse_backup(spec: str) -> tuple[str, str]:
+    """"provider:model" → (provider, model)."""
+    provider, sep, model = spec.partition(":")
+    if not sep or not provider.strip() or not model.strip():
+        raise ValueError(f"Hedge backup must be 'provider:model', got {spec!r}")
+    return provider.strip().lower(), model.strip()
+
+
+def _outcome(started: int, winner: int) -> str:
+    if started == 1:
+        return "not_needed"
+    return "primary" if winner == 0 else "backup"
+
+
+class HedgedLLM:
+    """LLMAdapter-compatible wrapper that hedges chat() across adapters.
+
+    Candidates need .provider, .model and a .stream(system, user) chunk
+    generator.  Each runs in its own thread; a losing stream is closed
+    as soon as it yields (a thread blocked before its first token cannot
+    be interrupted, but its result is discarded).
+    """
+
+    def __init__(self, primary, backups: list, delay_s: float = 3.0):
+        self.primary = primary
+        self.backups = list(backups)
+        self.delay_s = delay_s
+        self.provider = primary.provider
+        self.model = primary.model
+
+    def prepare(self, use_async: bool = False):
+        """Open every candidate's client ahead of the first call."""
+        for c in [self.primary] + self.backups:
+            c.prepare(use_async)
+
+    def chat(self, system: str, user: str) -> str:
+        return "".join(self.stream(system, user))
+
+    def stream(self, system: str, user: str):
+        """Chunks of the first candidate to stream; closing it cancels all."""
+        candidates = [self.primary] + self.backups
+        events: queue.Queue = queue.Queue()
+        cancelled = [threading.Event() for _ in candidates]
+
+        def run(i: int):
+            gen = candidates[i].stream(system, user)
+            try:
+                for chunk in gen:
+                    if cancelled[i].is_set():
+                        return
+                    events.put((i, "chunk", chunk))
+                events.put((i, "done", None))
+            except Exception as e:
+                events.put((i, "error", e))
+            finally:
+                gen.close()
+
+        def start():
+            nonlocal started, deadline
+            threading.Thread(target=run, args=(started,), daemon=True,
+                             name=f"hedge-{started}").start()
+            started += 1
+            deadline = time.monotonic() + self.delay_s
+
+        started, deadline = 0, 0.0
+        t0 = time.monotonic()
+        start()
+        winner = None
+        running = 1
+        last_error = None
+        try:
+            while True:
+                timeout = None
+                if winner is None and started < len(candidates):
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    i, kind, value = events.get(timeout=timeout)
+                except queue.Empty:
+                    start()     # no first token in time: fire the next backup
+                    running += 1
+                    continue
+                if winner is not None and i != winner:
+                    continue    # leftovers from a cancelled candidate
+                if kind == "error":
+                    if winner == i:
+                        raise value
+                    last_error = value
+                    running -= 1
+                    if started < len(candidates):
+                        start()
+                        running += 1
+                    elif running == 0:
+                        raise last_error
+                    continue
+                if winner is None:
+                    winner = i
+                    for j, ev in enumerate(cancelled):
+                        if j != i:
+                            ev.set()
+                    HEDGES.inc(_outcome(started, winner))
+                    if started > 1:
+                        c = candidates[i]
+                        print(f"  [hedge] {c.provider}/{c.model} streamed first "
+                              f"after {time.monotonic() - t0:.1f}s "
+                              f"({started} candidates)")
+                if kind == "done":
+                    return
+                yield value
+        finally:
+            for ev in cancelled:    # consumer stopped early: stop everyone
+                ev.set()
+
+
+async def hedged_stream(candidates: list[tuple[str, Callable[[], AsyncIterator[str]]]],
+                        delay_s: float,
+                        on_winner: Callable[[str], None] | None = None
+                        ) -> AsyncIterator[str]:
+    """Stream from the first of *candidates* to produce a chunk.
+
+    *candidates* are (label, start) pairs in priority order; start() opens
+    an async chunk stream.  The next candidate is started whenever
+    *delay_s* passes without a first chunk, or a candidate fails before
+    its first chunk.  Losers are cancelled and closed.
+    """
+    streams: list = []
+    pending: dict[asyncio.Task, int] = {}
+
+    def launch():
+        i = len(streams)
+        streams.append(candidates[i][1]())
+        pending[asyncio.ensure_future(streams[i].__anext__())] = i
+
+    launch()
+    winner, first, last_error = None, None, None
+    try:
+        while winner is None:
+            timeout = delay_s if len(streams) < len(candidates) else None
+            done, _ = await asyncio.wait(pending, timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                launch()
+                continue
+            for task in sorted(done, key=pending.get):
+                i = pending.pop(task)
+                try:
+                    first = task.result()
+                except StopAsyncIteration:
+                    first = None            # empty response still wins
+                except Exception as e:
+                    last_error = e
+                    continue
+                winner = i
+                break
+            if winner is None:
+                if len(streams) < len(candidates):
+                    launch()
+                elif not pending:
+                    raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for i, stream in enumerate(streams):
+            if i != winner:
+                await stream.aclose()
+
+    HEDGES.inc(_outcome(len(streams), winner))
+    if on_winner is not None:
+        on_winner(candidates[winner][0])
+    stream = streams[winner]
+    try:
+        if first is not None:
+            yield first
+            async for chunk in stream:
+                yield chunk
+    finally:
+        await stream.aclose()
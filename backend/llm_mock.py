@@ -0,0 +1,203 @@
+"""llm_mock.py — Record/replay LLM provider for offline benchmarking.
+
+A cassette is a JSONL file of recorded completions, one per line, keyed
+by a hash of the (system, user) prompt pair.  The "mock" provider replays
+them with a configurable time-to-first-token and token rate (or the
+timings recorded with them), so run_pipeline and /run-pipeline can be
+load-tested without API keys, network or provider latency noise.
+
+Replay looks a request up by its exact prompt pair first, then by system
+prompt alone (a load test with varied surveys still gets a deterministic
+completion of the right kind).  Anything else raises MockMiss.
+
+Recording: set FICR_MOCK_RECORD=cassette.jsonl (or pass --record-cassette
+to pipeline.py) and every completed call to a real provider is appended.
+
+Usage:
+    python pipeline.py --provider claude --record-cassette run.jsonl --user "…"
+    python pipeline.py --provider mock --model run.jsonl --user "…"
+    python llm_mock.py run.jsonl            # list recorded completions
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+# Replayed text is streamed in chunks of about this many tokens, at
+# ~4 characters per token.
+CHUNK_TOKENS = 4
+CHARS_PER_TOKEN = 4
+
+
+class MockMiss(LookupError):
+    """No recorded completion for a request."""
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def request_key(system: str, user: str) -> str:
+    return _sha(system + "\0" + user)
+
+
+class Cassette:
+    """Recorded completions in a JSONL file; appends are thread-safe."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries: list[dict] = []
+        self._by_key: dict[str, dict] = {}
+        self._by_system: dict[str, list[dict]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, entry: dict):
+        self.entries.append(entry)
+        self._by_key[entry["key"]] = entry
+        self._by_system.setdefault(entry["system"], []).append(entry)
+
+    def lookup(self, system: str, user: str) -> dict:
+        """The recording for this prompt pair, else one for this system prompt."""
+        key = request_key(system, user)
+        entry = self._by_key.get(key)
+        if entry is not None:
+            return entry
+        same = self._by_system.get(_sha(system))
+        if same:
+            # Deterministic per request, spread across the recordings
+            return same[int(key[:8], 16) % len(same)]
+        raise MockMiss(f"No recorded completion in {self.path} for this "
+                       f"system prompt; record one with FICR_MOCK_RECORD.")
+
+    def record(self, system: str, user: str, text: str, provider: str,
+               model: str, ttft_s: float | None, seconds: float):
+        entry = {"key": request_key(system, user), "system": _sha(system),
+                 "provider": provider, "model": model,
+                 "ttft_s": None if ttft_s is None else round(ttft_s, 3),
+                 "seconds": round(seconds, 3), "text": text}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._index(entry)
+
+
+# ── Replay ───────────────────────────────────────────────────────────
+
+def _schedule(entry: dict, ttft_s: float | None,
+              tokens_per_s: float | None) -> Iterator[tuple[float, str]]:
+    """(seconds after the request, chunk) pairs for replaying *entry*.
+
+    ttft_s / tokens_per_s of None use the recorded timings; a rate of 0
+    streams everything at once.
+    """
+    text = entry["text"]
+    tokens = max(1, len(text) // CHARS_PER_TOKEN)
+    if ttft_s is None:
+        ttft_s = entry.get("ttft_s") or 0.0
+    if tokens_per_s is None:
+        gen_s = entry.get("seconds", 0.0) - ttft_s
+        tokens_per_s = tokens / gen_s if gen_s > 0 else 0.0
+    step = CHUNK_TOKENS * CHARS_PER_TOKEN
+    for i in range(0, max(len(text), 1), step):
+        emitted = i // CHARS_PER_TOKEN
+        at = ttft_s + (emitted / tokens_per_s if tokens_per_s > 0 else 0.0)
+        yield at, text[i:i + step]
+
+
+class MockProvider:
+    """Replays a cassette with LLM-like pacing (chat / stream / astream)."""
+
+    def __init__(self, cassette: Cassette, ttft_s: float | None = None,
+                 tokens_per_s: float | None = None):
+        self.cassette = cassette
+        self.ttft_s = ttft_s
+        self.tokens_per_s = tokens_per_s
+
+    def _plan(self, system: str, user: str):
+        return _schedule(self.cassette.lookup(system, user),
+                         self.ttft_s, self.tokens_per_s)
+
+    def chat(self, system: str, user: str) -> str:
+        plan = list(self._plan(system, user))
+        time.sleep(plan[-1][0])
+        return "".join(chunk for _, chunk in plan)
+
+    def stream(self, system: str, user: str) -> Iterator[str]:
+        t0 = time.monotonic()
+        for at, chunk in self._plan(system, user):
+            delay = t0 + at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield chunk
+
+    async def astream(self, system: str, user: str) -> AsyncIterator[str]:
+        t0 = time.monotonic()
+        for at, chunk in self._plan(system, user):
+            delay = t0 + at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield chunk
+
+
+# ── Recording ────────────────────────────────────────────────────────
+
+def record_stream(cassette: Cassette, provider: str, model: str,
+                  system: str, user: str,
+                  chunks: Iterator[str]) -> Iterator[str]:
+    """Pass *chunks* through; record them once the stream completes."""
+    t0 = time.perf_counter()
+    ttft, parts = None, []
+    for chunk in chunks:
+        if ttft is None:
+            ttft = time.perf_counter() - t0
+        parts.append(chunk)
+        yield chunk
+    cassette.record(system, user, "".join(parts), provider, model, ttft,
+                    time.perf_counter() - t0)
+
+
+async def arecord_stream(cassette: Cassette, provider: str, model: str,
+                         system: str, user: str,
+                         chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """record_stream() for async chunk streams."""
+    t0 = time.perf_counter()
+    ttft, parts = None, []
+    async for chunk in chunks:
+        if ttft is None:
+            ttft = time.perf_counter() - t0
+        parts.append(chunk)
+        yield chunk
+    cassette.record(system, user, "".join(parts), provider, model, ttft,
+                    time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="FiCR mock LLM — list the completions in a cassette")
+    ap.add_argument("cassette", help="Cassette JSONL file")
+    args = ap.parse_args()
+
+    cassette = Cassette(args.cassette)
+    print(f"  {len(cassette.entries)} completion(s), "
+          f"{len(cassette._by_system)} system prompt(s)")
+    for e in cassette.entries:
+        ttft = "-" if e.get("ttft_s") is None else f"{e['ttft_s']:.2f}s"
+        print(f"    {e['key'][:12]}  {e['provider']}/{e['model']:<28} "
+              f"ttft {ttft:>7}  total {e['seconds']:.2f}s  "
+              f"{len(e['text']):>7} chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""llm_scheduler.py — Rate-limit-aware scheduling and retries for LLM calls.
+
+Each provider gets two token buckets, one for requests per minute and one
+for tokens per minute.  A call reserves its share from both before it
+starts.  Reservations are taken in arrival order under a lock, so callers
+(threads and coroutines alike) are served first come, first served.  When
+a budget is exhausted, a call waits for the refill instead of being sent
+and rejected.
+
+Retryable failures (429, 408/409, 5xx / 529 overloaded, connection
+errors) are retried with full-jitter exponential backoff.  A 429 also
+pauses the provider for its Retry-After, so queued callers back off
+together instead of hammering the API.  Streams are only retried before
+their first chunk.
+
+Time spent queued is recorded in ficr_llm_queue_wait_seconds{provider}.
+
+Usage:
+    sched = LLMScheduler(parse_limits("claude=50/40000,openai=500/200000"))
+    text = sched.call("claude", 1200, lambda: client_call())
+    for chunk in sched.stream("claude", 1200, lambda: open_stream()):
+        ...
+    async for chunk in sched.astream("claude", 1200, lambda: aopen()):
+        ...
+"""
+
+import time
+import random
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Iterator
+
+from metrics import REGISTRY
+
+QUEUE_WAIT = REGISTRY.histogram(
+    "ficr_llm_queue_wait_seconds",
+    "Time LLM calls wait for provider rate-limit budget", ["provider"])
+RETRIES = REGISTRY.counter(
+    "ficr_llm_retries_total",
+    "Retried LLM calls by provider and reason", ["provider", "reason"])
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server
+# errors and Anthropic's 529 "overloaded".
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+# SDK exception classes without a status code (connection / timeout) and
+# google.api_core's equivalents of 429 / 503 / 504.
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError",
+                    "ResourceExhausted", "ServiceUnavailable",
+                    "DeadlineExceeded", "TooManyRequests"}
+# Streamed output is charged to the token budget at ~4 characters / token.
+CHARS_PER_TOKEN = 4
+
+
+def parse_limits(spec: str) -> dict[str, tuple[float, float]]:
+    """"claude=50/40000,openai=500" → {provider: (rpm, tpm)}; 0 = unlimited."""
+    limits = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        provider, sep, values = item.partition("=")
+        if not sep:
+            raise ValueError(f"LLM limit must be 'provider=rpm/tpm', got {item!r}")
+        rpm, _, tpm = values.partition("/")
+        limits[provider.strip().lower()] = (float(rpm or 0), float(tpm or 0))
+    return limits
+
+
+def _status(exc: BaseException) -> int | None:
+    for obj in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "code"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def retryable(exc: BaseException) -> bool:
+    """True for rate limits, overload, server and connection errors."""
+    if _status(exc) in RETRYABLE_STATUS:
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(exc).__mro__)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds from a Retry-After(-ms) response header, if present."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass    # HTTP-date form: fall back to backoff
+    return None
+
+
+class TokenBucket:
+    """Continuously refilled budget; reservations may run it into debt.
+
+    reserve() always succeeds and returns how long the caller must wait
+    before its share is covered, so concurrent callers queue in the order
+    they reserved.
+    """
+
+    def __init__(self, per_minute: float, burst_s: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_s)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.level = min(self.capacity,
+                         self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= amount
+        return -self.level / self.rate if self.level < 0 else 0.0
+
+    def charge(self, amount: float, now: float):
+        self.reserve(amount, now)
+
+
+class _Provider:
+    def __init__(self, rpm: float, tpm: float, burst_s: float):
+        self.requests = TokenBucket(rpm, burst_s) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, burst_s) if tpm > 0 else None
+        self.paused_until = 0.0
+        self.queued = 0
+
+
+class LLMScheduler:
+    """Per-provider rate limiting, fair queueing and retries.
+
+    *limits* maps provider → (requests/min, tokens/min); providers not
+    listed are unlimited but still retried.  *burst_s* is how many seconds
+    of budget may be spent at once.
+    """
+
+    def __init__(self, limits: dict[str, tuple[float, float]] | None = None,
+                 retries: int = 4, backoff_s: float = 1.0,
+                 backoff_max_s: float = 30.0, burst_s: float = 10.0):
+        self.limits = dict(limits or {})
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.burst_s = burst_s
+        self._providers: dict[str, _Provider] = {}
+        self._lock = threading.Lock()
+
+    def _provider(self, name: str) -> _Provider:
+        p = self._providers.get(name)
+        if p is None:
+            p = self._providers[name] = _Provider(
+                *self.limits.get(name, (0, 0)), self.burst_s)
+        return p
+
+    # ── Budget ───────────────────────────────────────────────────────
+
+    def _reserve(self, provider: str, tokens: int) -> float:
+        """Take a request and *tokens* from the budget; seconds to wait."""
+        with self._lock:
+            p = self._provider(provider)
+            now = time.monotonic()
+            wait = 0.0
+            if p.requests is not None:
+                wait = max(wait, p.requests.reserve(1, now))
+            if p.tokens is not None:
+                wait = max(wait, p.tokens.reserve(tokens, now))
+            if p.paused_until > now:
+                # Spread the callers released by a 429 pause
+                wait = max(wait, p.paused_until - now
+                           + random.uniform(0, self.backoff_s))
+            if wait > 0:
+                p.queued += 1
+            return wait
+
+    def _done_waiting(self, provider: str, wait: float):
+        QUEUE_WAIT.observe(wait, provider)
+        if wait > 0:
+            with self._lock:
+                self._provider(provider).queued -= 1
+
+    def acquire(self, provider: str, tokens: int) -> float:
+        """Block until the call fits the provider's budget; seconds waited."""
+        wait = self._reserve(provider, tokens)
+        try:
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            self._done_waiting(provider, wait)
+        return wait
+
+    async def aacquire(self, provider: str, tokens: int) -> float:
+        """acquire() for coroutines."""
+        wait = self._reserve(provider, tokens)
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self._done_waiting(provider, wait)
+        return wait
+
+    def charge(self, provider: str, tokens: int):
+        """Count tokens known only after the call (its output)."""
+        if tokens <= 0:
+            return
+        with self._lock:
+            p = self._provider(provider)
+            if p.tokens is not None:
+                p.tokens.charge(tokens, time.monotonic())
+
+    # ── Retries ──────────────────────────────────────────────────────
+
+    def _retry_delay(self, provider: str, attempt: int,
+                     exc: BaseException) -> float | None:
+        """Backoff before the next attempt, or None to give up."""
+        if attempt >= self.retries or not retryable(exc):
+            return None
+        status = _status(exc)
+        RETRIES.inc(provider, str(status) if status else type(exc).__name__)
+        delay = random.uniform(0, min(self.backoff_max_s,
+                                      self.backoff_s * 2 ** attempt))
+        if status == 429:
+            # Rate limited: hold every caller of this provider, not just us
+            pause = retry_after(exc)
+            pause = max(delay, pause if pause is not None else 0.0)
+            with self._lock:
+                p = self._provider(provider)
+                p.paused_until = max(p.paused_until, time.monotonic() + pause)
+            return 0.0      # acquire() waits out the pause
+        return delay
+
+    def call(self, provider: str, tokens: int, fn: Callable[[], object]):
+        """fn() within the provider's budget, retried on retryable errors."""
+        attempt = 0
+        while True:
+            self.acquire(provider, tokens)
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._retry_delay(provider, attempt, e)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def stream(self, provider: str, tokens: int,
+               start: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """Chunks of start()'s stream; retried only before the first chunk."""
+        attempt = 0
+        while True:
+            self.acquire(provider, tokens)
+            gen = start()
+            chars = 0
+            try:
+                for chunk in gen:
+                    chars += len(chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if chars else self._retry_delay(provider, attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                gen.close()
+                self.charge(provider, chars // CHARS_PER_TOKEN)
+            time.sleep(delay)
+            attempt += 1
+
+    async def astream(self, provider: str, tokens: int,
+                      start: Callable[[], AsyncIterator[str]]
+                      ) -> AsyncIterator[str]:
+        """stream() for async chunk streams."""
+        attempt = 0
+        while True:
+            await self.aacquire(provider, tokens)
+            gen = start()
+            chars = 0
+            try:
+                async for chunk in gen:
+                    chars += len(chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if chars else self._retry_delay(provider, attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                await gen.aclose()
+                self.charge(provider, chars // CHARS_PER_TOKEN)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    # ── Introspection ────────────────────────────────────────────────
+
+    def queued(self) -> int:
+        """Calls currently waiting for budget, across providers."""
+        with self._lock:
+            return sum(p.queued for p in self._providers.values())
+
+    def snapshot(self) -> dict:
+        """Per-provider limits, queue length and remaining budget."""
+        with self._lock:
+            now = time.monotonic()
+            out = {}
+            for name, p in sorted(self._providers.items()):
+                rpm, tpm = self.limits.get(name, (0, 0))
+                info = {"rpm": rpm or None, "tpm": tpm or None,
+                        "queued": p.queued,
+                        "paused_s": round(max(0.0, p.paused_until - now), 3),
+                        "queue_wait_count": QUEUE_WAIT.count(name)}
+                for key, bucket in (("requests", p.requests),
+                                    ("tokens", p.tokens)):
+                    if bucket is not None:
+                        level = min(bucket.capacity, bucket.level
+                                    + (now - bucket.updated) * bucket.rate)
+                        info[f"{key}_available"] = round(level, 1)
+                out[name] = info
+            return out
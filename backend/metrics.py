@@ -0,0 +1,195 @@
+"""metrics.py — Minimal in-process metrics in Prometheus text format.
+
+Counters, gauges and fixed-bucket histograms keyed by label values.
+Recording is a dict lookup plus a few additions under a per-metric lock;
+everything else (formatting, gauge callbacks) happens only when the
+/metrics endpoint is scraped.
+
+Usage:
+    STAGE_SECONDS = REGISTRY.histogram(
+        "ficr_stage_duration_seconds", "Pipeline stage latency", ["stage"])
+    STAGE_SECONDS.observe(0.42, "sparql")
+    text = REGISTRY.render()
+"""
+
+import bisect
+import threading
+from typing import Callable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds) covering sub-millisecond lookups to long
+# LLM streams.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels=()):
+        self.name = name
+        self.doc = doc
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.doc}",
+                f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name, doc, labels=()):
+        super().__init__(name, doc, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.label_names, k)} {_fmt(v)}"
+            for k, v in items]
+
+
+class Gauge(_Metric):
+    """Point-in-time value, read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, doc, fn: Callable[[], float]):
+        super().__init__(name, doc)
+        self._fn = fn
+
+    def render(self) -> list[str]:
+        try:
+            value = float(self._fn())
+        except Exception:
+            return []
+        return self._header() + [f"{self.name} {_fmt(value)}"]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution (cumulative on output) per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[i] += 1
+            row[-1] += value
+
+    def count(self, *labels) -> int:
+        row = self._values.get(labels)
+        return sum(row[:-1]) if row else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        out = self._header()
+        for k, row in items:
+            cum = 0
+            for bound, n in zip(self.buckets + (float("inf"),), row[:-1]):
+                cum += n
+                le = f'le="{_fmt(bound)}"'
+                out.append(f"{self.name}_bucket"
+                           f"{_labels(self.label_names, k, le)} {cum}")
+            lbl = _labels(self.label_names, k)
+            out.append(f"{self.name}_sum{lbl} {_fmt(row[-1])}")
+            out.append(f"{self.name}_count{lbl} {cum}")
+        return out
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, doc, labels=()) -> Counter:
+        return self._add(Counter(name, doc, labels))
+
+    def histogram(self, name, doc, labels=(),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, doc, labels, buckets))
+
+    def gauge(self, name, doc, fn: Callable[[], float]) -> Gauge:
+        return self._add(Gauge(name, doc, fn))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ── Pipeline metrics shared by the CLI and the server ───────────────
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "ficr_stage_duration_seconds",
+    "Pipeline stage latency", ["stage"])
+STAGE_ERRORS = REGISTRY.counter(
+    "ficr_stage_errors_total",
+    "Pipeline runs that failed, by stage", ["stage"])
+LLM_REQUESTS = REGISTRY.counter(
+    "ficr_llm_requests_total",
+    "LLM calls by provider and outcome", ["provider", "outcome"])
+LLM_SECONDS = REGISTRY.histogram(
+    "ficr_llm_request_duration_seconds",
+    "Total LLM call / stream duration", ["provider"])
+LLM_TTFT = REGISTRY.histogram(
+    "ficr_llm_time_to_first_token_seconds",
+    "Delay until the first streamed LLM chunk", ["provider"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "ficr_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)", ["cache", "result"])
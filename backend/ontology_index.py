@@ -0,0 +1,195 @@
+"""ontology_index.py — Precomputed JSON index of the FiCR TBox.
+
+The Documentation page used to download the TBox Turtle and parse it in
+the browser.  This module does that work once on the server: it reads
+references/ficr_tbox.ttl with rdflib and produces the same structure as
+src/utils/ttlParser.ts (classes, objectProperties, datatypeProperties,
+metadata) plus
+
+  hierarchy — subclass / subproperty children per parent URI
+  search    — token → ids, where id i is the i-th entry of
+              classes + objectProperties + datatypeProperties
+
+The serialised body, its gzip encoding and ETag are prepared up front.
+
+Usage:
+    python ontology_index.py references/ficr_tbox.ttl -o ontology_index.json
+"""
+
+import re
+import gzip
+import json
+import argparse
+from pathlib import Path
+
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import RDF, RDFS, OWL, SKOS, DCTERMS
+
+from sample_catalog import etag_for
+
+INDEX_VERSION = 1
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+# Words too common in labels/comments to be worth indexing.
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or "
+    "that the this to which with".split())
+
+
+def local_name(uri: str) -> str:
+    return re.split(r"[#/]", uri)[-1] or uri
+
+
+def tokens(*texts: str) -> set[str]:
+    """Lower-case search tokens; camelCase names are split into words."""
+    out = set()
+    for text in texts:
+        if not text:
+            continue
+        text = _CAMEL_RE.sub(" ", text)
+        out.update(w for w in _WORD_RE.findall(text.lower())
+                   if w not in _STOPWORDS and len(w) > 1)
+    return out
+
+
+def _text(g: Graph, s, p) -> str:
+    """Preferred literal: English, then untagged, then any."""
+    values = [o for o in g.objects(s, p) if isinstance(o, Literal)]
+    for lang in ("en", None):
+        for o in values:
+            if o.language == lang:
+                return str(o)
+    return str(values[0]) if values else ""
+
+
+def _uris(g: Graph, s, p) -> list[str]:
+    return sorted(str(o) for o in g.objects(s, p) if isinstance(o, URIRef))
+
+
+def _entries(g: Graph, rdf_type, kind: str) -> list[dict]:
+    out = []
+    for s in set(g.subjects(RDF.type, rdf_type)):
+        if not isinstance(s, URIRef):
+            continue
+        uri = str(s)
+        entry = {
+            "uri": uri,
+            "label": _text(g, s, RDFS.label) or local_name(uri),
+            "comment": _text(g, s, RDFS.comment),
+        }
+        if kind == "Class":
+            entry["subClassOf"] = _uris(g, s, RDFS.subClassOf)
+            entry["disjointWith"] = _uris(g, s, OWL.disjointWith)
+            entry["equivalentClass"] = _uris(g, s, OWL.equivalentClass)
+            entry["examples"] = sorted(str(o) for o in g.objects(s, SKOS.example))
+        else:
+            entry["domain"] = _uris(g, s, RDFS.domain)
+            entry["range"] = _uris(g, s, RDFS.range)
+            entry["subPropertyOf"] = _uris(g, s, RDFS.subPropertyOf)
+            entry["inverseOf"] = _uris(g, s, OWL.inverseOf)
+        entry["type"] = kind
+        out.append(entry)
+    return sorted(out, key=lambda e: (e["label"].casefold(), e["uri"]))
+
+
+def _metadata(g: Graph) -> dict:
+    onto = next(iter(g.subjects(RDF.type, OWL.Ontology)), None)
+    if onto is None:
+        return {"title": "Ontology", "description": "", "version": "",
+                "namespace": ""}
+    return {
+        "title": _text(g, onto, DCTERMS.title) or "Ontology",
+        "description": (_text(g, onto, DCTERMS.description)
+                        or _text(g, onto, RDFS.comment)),
+        "version": _text(g, onto, OWL.versionInfo),
+        "namespace": str(onto),
+    }
+
+
+def build_index(tbox_path: str | Path) -> dict:
+    """Parse the TBox and return the index dict."""
+    g = Graph()
+    g.parse(str(tbox_path), format="turtle")
+
+    classes = _entries(g, OWL.Class, "Class")
+    object_props = _entries(g, OWL.ObjectProperty, "ObjectProperty")
+    datatype_props = _entries(g, OWL.DatatypeProperty, "DatatypeProperty")
+
+    hierarchy: dict[str, list[str]] = {}
+    for e in classes:
+        for parent in e["subClassOf"]:
+            hierarchy.setdefault(parent, []).append(e["uri"])
+    for e in object_props + datatype_props:
+        for parent in e["subPropertyOf"]:
+            hierarchy.setdefault(parent, []).append(e["uri"])
+
+    search: dict[str, list[int]] = {}
+    for i, e in enumerate(classes + object_props + datatype_props):
+        for tok in tokens(e["label"], local_name(e["uri"]), e["comment"]):
+            search.setdefault(tok, []).append(i)
+
+    return {
+        "version": INDEX_VERSION,
+        "metadata": _metadata(g),
+        "classes": classes,
+        "objectProperties": object_props,
+        "datatypeProperties": datatype_props,
+        "hierarchy": {k: sorted(v) for k, v in sorted(hierarchy.items())},
+        "search": dict(sorted(search.items())),
+    }
+
+
+class OntologyIndex:
+    """The built index with its serialised, gzipped and ETag'd forms."""
+
+    def __init__(self, tbox_path: str | Path):
+        self.data = build_index(tbox_path)
+        self.body = json.dumps(self.data, ensure_ascii=False,
+                               separators=(",", ":")).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = etag_for(self.body)
+        self._entries = (self.data["classes"] + self.data["objectProperties"]
+                         + self.data["datatypeProperties"])
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Entries matching every query word (prefix match on the last)."""
+        words = [w for w in _WORD_RE.findall(query.lower())]
+        if not words:
+            return []
+        index = self.data["search"]
+        hits = None
+        for n, w in enumerate(words):
+            if n == len(words) - 1:
+                ids = {i for tok, v in index.items() if tok.startswith(w)
+                       for i in v}
+            else:
+                ids = set(index.get(w, ()))
+            hits = ids if hits is None else hits & ids
+            if not hits:
+                return []
+        return [{"uri": e["uri"], "label": e["label"], "type": e["type"]}
+                for e in (self._entries[i] for i in sorted(hits)[:limit])]
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="FiCR ontology index — TBox Turtle → compact JSON")
+    ap.add_argument("tbox", help="TBox Turtle file (ficr_tbox.ttl)")
+    ap.add_argument("-o", "--output", default=None, help="Output JSON path")
+    args = ap.parse_args()
+
+    idx = OntologyIndex(args.tbox)
+    if args.output:
+        Path(args.output).write_bytes(idx.body)
+        print(f"Index written to {args.output}")
+    d = idx.data
+    print(f"  Classes            : {len(d['classes'])}")
+    print(f"  Object properties  : {len(d['objectProperties'])}")
+    print(f"  Datatype properties: {len(d['datatypeProperties'])}")
+    print(f"  Search tokens      : {len(d['search'])}")
+    print(f"  JSON {len(idx.body)} bytes, gzip {len(idx.gzip_body)} bytes")
+
+
+if __name__ == "__main__":
+    main()
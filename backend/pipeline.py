@@ -21,6 +21,12 @@ import os
 import re
 import sys
 import argparse
+import importlib
+import copy
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from jsonschema import validate, ValidationError, Draft202012Validator
 
@@ -33,6 +39,16 @@ except ImportError:
 
 import ficr_json_to_rdf
 import ficr_sparql_runner
+import ficr_abox_patch
+import ficr_report_prompt
+import ficr_report_sections
+import ficr_survey_repair
+import ficr_survey_stream
+from llm_hedge import HedgedLLM, parse_backup
+from llm_scheduler import LLMScheduler, parse_limits
+from stage_graph import StageGraph
+import llm_mock
+from metrics import CACHE_REQUESTS, LLM_REQUESTS, LLM_SECONDS
 
 # ── Paths ────────────────────────────────────────────────────────────────
 _HERE = Path(__file__).resolve().parent
@@ -45,6 +61,17 @@ OUTPUT_DIR = _HERE / "output"
 
 MAX_VALIDATION_RETRIES = 2
 
+# Most recently converted ABox graphs, by project slug, kept so that
+# stage_patch() can apply re-survey deltas without a full rebuild
+# (0 disables the cache, and the survey copy made for it).
+ABOX_CACHE_SIZE = int(os.environ.get("FICR_ABOX_CACHE_SIZE", "16"))
+_abox_cache: "OrderedDict[str, tuple[dict, object]]" = OrderedDict()
+_abox_cache_lock = threading.Lock()
+
+# Base ontology graph and prepared CQ queries, see get_query_context().
+_query_context = None
+_query_context_lock = threading.Lock()
+
 # ── LLM Report Prompt (LLM #2) ──────────────────────────────────────────
 REPORT_SYSTEM_PROMPT = """\
 You are a fire compliance report writer. You will receive structured SPARQL
@@ -81,6 +108,165 @@ element IDs and values from the data.
 """
 
 
+# How SPARQL results are encoded for LLM #2: "compact" per-query tables
+# (ficr_report_prompt) or the original pretty-printed "json".
+REPORT_INPUT_FORMAT = os.environ.get("FICR_REPORT_INPUT", "compact")
+
+# Write the six report sections as concurrent LLM#2 calls, each given only
+# the CQ results it needs (ficr_report_sections), instead of one long call.
+REPORT_SECTIONS = os.environ.get("FICR_REPORT_SECTIONS", "0") != "0"
+
+# Report mode: "llm" writes every section with LLM#2, "hybrid" renders the
+# overview, inventory and compliance sections from the query rows and
+# leaves risk, evidence and recommendations to the LLM, "template" renders
+# everything it can locally and makes no LLM call.
+REPORT_MODES = ("template", "hybrid", "llm")
+REPORT_MODE = os.environ.get("FICR_REPORT_MODE", "llm")
+TEMPLATE_SECTIONS = {"template": (1, 2, 3, 4, 5), "hybrid": (1, 2, 3),
+                     "llm": ()}
+
+# Hedged LLM calls (stages 1 and 4): if the primary has streamed nothing
+# after FICR_HEDGE_DELAY_S, the request also goes to FICR_HEDGE_BACKUP
+# ("provider:model"); the first to stream wins.  Empty disables hedging.
+HEDGE_BACKUP = os.environ.get("FICR_HEDGE_BACKUP", "")
+HEDGE_DELAY_S = float(os.environ.get("FICR_HEDGE_DELAY_S", "3"))
+
+# Provider rate limits as "provider=rpm/tpm,..." (0 or omitted = no limit).
+# Calls wait for budget in arrival order; 429 / 5xx / connection errors
+# are retried up to FICR_LLM_RETRIES times with jittered backoff.
+LLM_LIMITS = os.environ.get("FICR_LLM_LIMITS", "")
+LLM_RETRIES = int(os.environ.get("FICR_LLM_RETRIES", "4"))
+LLM_BACKOFF_S = float(os.environ.get("FICR_LLM_BACKOFF_S", "1"))
+LLM_BACKOFF_MAX_S = float(os.environ.get("FICR_LLM_BACKOFF_MAX_S", "30"))
+
+# Mock provider (llm_mock): model "replay" replays FICR_MOCK_CASSETTE, any
+# other model name is a cassette path.  Pacing overrides the recorded
+# timings when set (tokens/s of 0 = no delay).  FICR_MOCK_RECORD appends
+# every completed real-provider call to that cassette.
+MOCK_CASSETTE = os.environ.get("FICR_MOCK_CASSETTE", "")
+MOCK_TTFT_S = os.environ.get("FICR_MOCK_TTFT_S", "")
+MOCK_TOKENS_PER_S = os.environ.get("FICR_MOCK_TOKENS_PER_S", "")
+MOCK_RECORD = os.environ.get("FICR_MOCK_RECORD", "")
+
+
+# ═════════════════════════════════════════════════════════════════════════
+#  LLM client registry — one SDK client per (provider, api key, base_url)
+# ═════════════════════════════════════════════════════════════════════════
+
+# Idle keep-alive connections are held this long, so consecutive reports
+# reuse an open TLS connection instead of handshaking again.
+LLM_KEEPALIVE_S = 120.0
+LLM_MAX_CONNECTIONS = 100
+
+_clients: dict[tuple, object] = {}
+_clients_lock = threading.Lock()
+
+# One scheduler for every LLM call in the process: CLI stages, server
+# streams and background jobs share the provider budgets.  SDK clients
+# are built with max_retries=0 so that only the scheduler retries.
+SCHEDULER = LLMScheduler(parse_limits(LLM_LIMITS), retries=LLM_RETRIES,
+                         backoff_s=LLM_BACKOFF_S,
+                         backoff_max_s=LLM_BACKOFF_MAX_S)
+
+
+# HTTP package each SDK accepts for ``http_client=``, in preference order.
+# Anthropic SDK 1.x builds on the httpx2 fork and rejects httpx objects;
+# older releases (and the OpenAI SDK) use httpx itself.
+_HTTP_PACKAGES = {
+    "anthropic": ("httpx2", "httpx"),
+    "openai": ("httpx",),
+}
+
+
+def _keepalive_http_client(sdk: str, use_async: bool = False):
+    """Client with a longer keep-alive for *sdk*'s http_client=, if available.
+
+    Request timeouts are still set per call by the SDK.
+    """
+    for name in _HTTP_PACKAGES.get(sdk, ("httpx",)):
+        try:
+            http = importlib.import_module(name)
+        except ImportError:
+            continue
+        cls = http.AsyncClient if use_async else http.Client
+        return cls(follow_redirects=True, limits=http.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS // 5,
+            keepalive_expiry=LLM_KEEPALIVE_S))
+    return None
+
+
+def shared_client(provider: str, api_key: str, base_url: str | None,
+                  build):
+    """Return the process-wide client for this key, constructing it lazily."""
+    key = (provider, api_key, base_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = build()
+                _clients[key] = client
+    return client
+
+
+async def close_clients():
+    """Close pooled connections of every shared client (e.g. at shutdown)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                result = close()
+                if hasattr(result, "__await__"):
+                    await result
+            except Exception:
+                pass
+
+
+# OpenAI-compatible providers: (API key env var, default base URL)
+OPENAI_COMPAT_PROVIDERS = {
+    "openai": ("OPENAI_API_KEY", None),
+    "deepseek": ("DEEPSEEK_API_KEY", "https://api.deepseek.com/v1"),
+    "glm": ("GLM_API_KEY", "https://open.bigmodel.cn/api/paas/v4"),
+}
+
+# SDK module behind each provider; imported on first use, or ahead of time
+# by preimport_provider() so the first request doesn't pay for it.
+PROVIDER_SDKS = {
+    "claude": "anthropic",
+    "openai": "openai",
+    "deepseek": "openai",
+    "glm": "openai",
+    "gemini": "google.generativeai",
+    "mock": "llm_mock",
+}
+
+# Default model per provider
+DEFAULT_MODELS = {
+    "claude": "claude-sonnet-4-20250514",
+    "openai": "gpt-4o",
+    "gemini": "gemini-2.0-flash",
+    "deepseek": "deepseek-chat",
+    "glm": "glm-4-plus",
+    "mock": "replay",
+}
+
+# Cassette that real-provider calls are recorded into (None: not recording)
+RECORDER = llm_mock.Cassette(MOCK_RECORD) if MOCK_RECORD else None
+
+
+def preimport_provider(provider: str) -> bool:
+    """Import a provider's SDK now; False if it is not installed."""
+    try:
+        importlib.import_module(PROVIDER_SDKS[provider.lower()])
+        return True
+    except ImportError:
+        return False
+
+
 # ═════════════════════════════════════════════════════════════════════════
 #  LLM Adapter — unified interface for all providers
 # ═════════════════════════════════════════════════════════════════════════
@@ -110,56 +296,235 @@ class LLMAdapter:
         return key
 
     def _init_anthropic(self):
-        import anthropic
         key = self._get_api_key("ANTHROPIC_API_KEY")
-        self._client = anthropic.Anthropic(api_key=key)
+
+        def build():
+            import anthropic
+            kwargs = {"api_key": key, "max_retries": 0}
+            http = _keepalive_http_client("anthropic")
+            if http is not None:
+                kwargs["http_client"] = http
+            return anthropic.Anthropic(**kwargs)
+
+        self._client = shared_client(self.provider, key, None, build)
 
     def _init_openai_compat(self, env_var: str, base_url: str | None = None):
-        import openai
         key = self._get_api_key(env_var)
-        kwargs = {"api_key": key}
         url = self._base_url or base_url
-        if url:
-            kwargs["base_url"] = url
-        self._client = openai.OpenAI(**kwargs)
+
+        def build():
+            import openai
+            kwargs = {"api_key": key, "max_retries": 0}
+            if url:
+                kwargs["base_url"] = url
+            http = _keepalive_http_client("openai")
+            if http is not None:
+                kwargs["http_client"] = http
+            return openai.OpenAI(**kwargs)
+
+        self._client = shared_client(self.provider, key, url, build)
 
     def _init_gemini(self):
-        import google.generativeai as genai
         key = self._get_api_key("GOOGLE_API_KEY")
-        genai.configure(api_key=key)
-        self._client = genai
+
+        def build():
+            import google.generativeai as genai
+            genai.configure(api_key=key)
+            return genai
+
+        # google-generativeai has no per-key client, only the module-wide
+        # genai.configure(): Gemini uses one key per process, the first
+        # one configured, so the entry is keyed by provider alone.
+        self._client = shared_client(self.provider, "", None, build)
+
+    def _init_mock(self):
+        path = MOCK_CASSETTE if self.model == "replay" else self.model
+        if not path or not Path(path).exists():
+            raise FileNotFoundError(
+                f"Mock cassette not found: {path or '(unset)'}. Set "
+                f"FICR_MOCK_CASSETTE or pass the cassette path as the model.")
+        cassette = shared_client("mock", str(Path(path).resolve()), None,
+                                 lambda: llm_mock.Cassette(path))
+        self._client = llm_mock.MockProvider(
+            cassette,
+            ttft_s=float(MOCK_TTFT_S) if MOCK_TTFT_S else None,
+            tokens_per_s=float(MOCK_TOKENS_PER_S) if MOCK_TOKENS_PER_S else None)
 
     def _ensure_client(self):
         if self._client is not None:
             return
-        if self.provider == "claude":
+        if self.provider == "mock":
+            self._init_mock()
+        elif self.provider == "claude":
             self._init_anthropic()
-        elif self.provider == "openai":
-            self._init_openai_compat("OPENAI_API_KEY")
-        elif self.provider == "deepseek":
-            self._init_openai_compat(
-                "DEEPSEEK_API_KEY",
-                "https://api.deepseek.com/v1")
-        elif self.provider == "glm":
-            self._init_openai_compat(
-                "GLM_API_KEY",
-                "https://open.bigmodel.cn/api/paas/v4")
+        elif self.provider in OPENAI_COMPAT_PROVIDERS:
+            self._init_openai_compat(*OPENAI_COMPAT_PROVIDERS[self.provider])
         elif self.provider == "gemini":
             self._init_gemini()
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
+    def prepare(self, use_async: bool = False):
+        """Import the SDK and open the shared client ahead of the first call.
+
+        Lets the report connection be set up while earlier stages run;
+        *use_async* prepares the client the server streams through.
+        """
+        if use_async and self.provider in ("claude", *OPENAI_COMPAT_PROVIDERS):
+            self.async_client()
+        else:
+            self._ensure_client()
+
+    def async_client(self):
+        """Shared async SDK client (claude and OpenAI-compatible providers).
+
+        Gemini has no async client here; callers bridge its blocking
+        stream through a thread instead.
+        """
+        if self.provider == "claude":
+            key = self._get_api_key("ANTHROPIC_API_KEY")
+
+            def build():
+                import anthropic
+                kwargs = {"api_key": key, "max_retries": 0}
+                http = _keepalive_http_client("anthropic", use_async=True)
+                if http is not None:
+                    kwargs["http_client"] = http
+                return anthropic.AsyncAnthropic(**kwargs)
+
+            return shared_client("claude:async", key, None, build)
+
+        if self.provider in OPENAI_COMPAT_PROVIDERS:
+            env_var, base_url = OPENAI_COMPAT_PROVIDERS[self.provider]
+            key = self._get_api_key(env_var)
+            url = self._base_url or base_url
+
+            def build():
+                import openai
+                kwargs = {"api_key": key, "max_retries": 0}
+                if url:
+                    kwargs["base_url"] = url
+                http = _keepalive_http_client("openai", use_async=True)
+                if http is not None:
+                    kwargs["http_client"] = http
+                return openai.AsyncOpenAI(**kwargs)
+
+            return shared_client(f"{self.provider}:async", key, url, build)
+
+        raise ValueError(f"No async client for provider: {self.provider}")
+
+    def _input_tokens(self, system: str, user: str) -> int:
+        return (ficr_report_prompt.estimate_tokens(system)
+                + ficr_report_prompt.estimate_tokens(user))
+
     def chat(self, system: str, user: str) -> str:
-        """Send a system+user prompt and return the assistant's text."""
+        """Send a system+user prompt and return the assistant's text.
+
+        The call waits for provider budget and is retried on rate limits
+        and transient errors (see SCHEDULER).
+        """
         self._ensure_client()
 
-        if self.provider == "claude":
-            return self._chat_anthropic(system, user)
+        if self.provider == "mock":
+            call = self._client.chat
+        elif self.provider == "claude":
+            call = self._chat_anthropic
         elif self.provider == "gemini":
-            return self._chat_gemini(system, user)
+            call = self._chat_gemini
         else:
             # openai / deepseek / glm all use OpenAI-compatible API
-            return self._chat_openai(system, user)
+            call = self._chat_openai
+        t0 = time.perf_counter()
+        try:
+            text = SCHEDULER.call(self.provider, self._input_tokens(system, user),
+                                  lambda: call(system, user))
+            SCHEDULER.charge(self.provider,
+                             ficr_report_prompt.estimate_tokens(text or ""))
+        except Exception:
+            LLM_REQUESTS.inc(self.provider, "error")
+            raise
+        LLM_REQUESTS.inc(self.provider, "ok")
+        seconds = time.perf_counter() - t0
+        LLM_SECONDS.observe(seconds, self.provider)
+        if RECORDER is not None and self.provider != "mock":
+            # Not streamed: the whole reply arrived at once
+            RECORDER.record(system, user, text, self.provider, self.model,
+                            seconds, seconds)
+        return text
+
+    def stream(self, system: str, user: str):
+        """Yield the assistant's text in chunks as the provider streams it.
+
+        Closing the generator early closes the underlying HTTP stream.
+        """
+        self._ensure_client()
+
+        if self.provider == "mock":
+            start = self._client.stream
+        elif self.provider == "claude":
+            start = self._stream_anthropic
+        elif self.provider == "gemini":
+            start = self._stream_gemini
+        else:
+            start = self._stream_openai
+        t0 = time.perf_counter()
+        chunks = SCHEDULER.stream(self.provider,
+                                  self._input_tokens(system, user),
+                                  lambda: start(system, user))
+        if RECORDER is not None and self.provider != "mock":
+            chunks = llm_mock.record_stream(RECORDER, self.provider,
+                                            self.model, system, user, chunks)
+        try:
+            yield from chunks
+        except Exception:
+            LLM_REQUESTS.inc(self.provider, "error")
+            raise
+        except GeneratorExit:
+            LLM_REQUESTS.inc(self.provider, "cancelled")
+            raise
+        LLM_REQUESTS.inc(self.provider, "ok")
+        LLM_SECONDS.observe(time.perf_counter() - t0, self.provider)
+
+    def _stream_anthropic(self, system: str, user: str):
+        with self._client.messages.stream(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            system=system,
+            messages=[{"role": "user", "content": user}],
+        ) as stream:
+            yield from stream.text_stream
+
+    def _stream_openai(self, system: str, user: str):
+        resp = self._client.chat.completions.create(
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+        )
+        try:
+            for chunk in resp:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            resp.close()
+
+    def _stream_gemini(self, system: str, user: str):
+        model = self._client.GenerativeModel(
+            model_name=self.model,
+            system_instruction=system,
+            generation_config=self._client.types.GenerationConfig(
+                temperature=self.temperature,
+                max_output_tokens=self.max_tokens,
+            ),
+        )
+        for chunk in model.generate_content(user, stream=True):
+            if chunk.text:
+                yield chunk.text
 
     def _chat_anthropic(self, system: str, user: str) -> str:
         resp = self._client.messages.create(
@@ -196,6 +561,216 @@ class LLMAdapter:
         return resp.text
 
 
+def hedge_llm(llm: LLMAdapter, backup: str | None = None,
+              delay_s: float | None = None):
+    """*llm* hedged with a backup provider:model, or *llm* itself if none.
+
+    Defaults come from FICR_HEDGE_BACKUP / FICR_HEDGE_DELAY_S.
+    """
+    backup = HEDGE_BACKUP if backup is None else backup
+    if not backup:
+        return llm
+    provider, model = parse_backup(backup)
+    if (provider, model) == (llm.provider, llm.model):
+        return llm
+    second = LLMAdapter(provider=provider, model=model,
+                        temperature=llm.temperature, max_tokens=llm.max_tokens)
+    return HedgedLLM(llm, [second],
+                     HEDGE_DELAY_S if delay_s is None else delay_s)
+
+
+# ═════════════════════════════════════════════════════════════════════════
+#  Template report sections — Markdown rendered from SPARQL rows, no LLM
+# ═════════════════════════════════════════════════════════════════════════
+
+def _cell_md(v) -> str:
+    if v is None or v == "":
+        return "—"
+    if isinstance(v, float):
+        return f"{v:g}"
+    return str(v).replace("|", "\\|").replace("\n", " ")
+
+
+def _md_table(headers: list[str], rows: list[list]) -> list[str]:
+    out = ["| " + " | ".join(headers) + " |",
+           "|" + "|".join("---" for _ in headers) + "|"]
+    out += ["| " + " | ".join(_cell_md(v) for v in row) + " |" for row in rows]
+    return out
+
+
+def _rows(sparql_results: dict, qid: str) -> list[dict] | None:
+    """Rows of a query, or None if it errored or its probe failed."""
+    res = sparql_results.get("results", {}).get(qid)
+    if res is None or "error" in res:
+        return None
+    if not sparql_results.get("probes", {}).get(qid, {}).get("pass", True):
+        return None
+    return res.get("rows") or []
+
+
+def _no_data(qid: str) -> str:
+    return f"_No data for {qid} (query failed or precondition not met)._"
+
+
+def _render_overview(r: dict) -> list[str]:
+    out = []
+    storeys = _rows(r, "A1")
+    if storeys is None:
+        out.append(_no_data("A1"))
+    else:
+        storeys = sorted(storeys, key=lambda x: (x.get("elevation_m") is None,
+                                                 x.get("elevation_m") or 0))
+        buildings = sorted({x["buildingID"] for x in storeys
+                            if x.get("buildingID")})
+        spaces = sum(x.get("spaceCount") or 0 for x in storeys)
+        out.append(f"- **Building:** {', '.join(buildings) or '—'}")
+        out.append(f"- **Storeys:** {len(storeys)}")
+        out.append(f"- **Spaces:** {spaces}")
+        out.append("")
+        out += _md_table(
+            ["Storey", "Type", "Elevation (m)", "Height (m)", "Spaces"],
+            [[x.get("storeyLabel"), x.get("storeyType"), x.get("elevation_m"),
+              x.get("storeyHeight_m"), x.get("spaceCount")] for x in storeys])
+    out += ["", "**Space usage**", ""]
+    usage = _rows(r, "A3")
+    out += (_no_data("A3") if usage is None else
+            _md_table(["Usage", "Spaces"],
+                      [[x.get("usageType"), x.get("count")] for x in usage]))
+    out += ["", "**Spaces**", ""]
+    spaces = _rows(r, "A2")
+    out += (_no_data("A2") if spaces is None else
+            _md_table(["Storey", "Space", "Usage", "Area (m²)", "Adjacent"],
+                      [[x.get("storeyLabel"), x.get("spaceLabel"),
+                        x.get("usageLabel"), x.get("areaM2"),
+                        x.get("adjacentSpaces")] for x in spaces]))
+    return out
+
+
+def _render_inventory(r: dict) -> list[str]:
+    out = []
+    counts = _rows(r, "A4")
+    out += (_no_data("A4") if counts is None else
+            _md_table(["Element type", "Count"],
+                      [[x.get("elementType"), x.get("count")] for x in counts]))
+    out += ["", "**Elements per space**", ""]
+    per_space = _rows(r, "A5")
+    if per_space is None:
+        out.append(_no_data("A5"))
+        return out
+    types = sorted({x.get("elemType") for x in per_space if x.get("elemType")})
+    table: dict[str, dict[str, int]] = {}
+    for x in per_space:
+        cell = table.setdefault(x.get("spaceLabel") or "—", {})
+        cell[x.get("elemType")] = cell.get(x.get("elemType"), 0) + 1
+    out += _md_table(["Space"] + types,
+                     [[space] + [table[space].get(t, 0) for t in types]
+                      for space in sorted(table)])
+    return out
+
+
+def _render_compliance(r: dict) -> list[str]:
+    out = []
+    health = _rows(r, "B1")
+    out += (_no_data("B1") if health is None else
+            _md_table(["Category", "Status", "Count"],
+                      [[x.get("category"), x.get("status"), x.get("count")]
+                       for x in health]))
+    detail = _rows(r, "B2")
+    out.append("")
+    if detail is None:
+        out.append(_no_data("B2"))
+        return out
+    failing = [x for x in detail if x.get("complianceStatus") != "Compliant"]
+    out.append(f"**{len(detail) - len(failing)} of {len(detail)}** checked "
+               f"elements meet their requirement; **{len(failing)}** do not.")
+    if not failing:
+        return out
+    out += ["", "**Non-compliant elements**", ""]
+    failing.sort(key=lambda x: (x.get("issue") or "", x.get("spaceLabel") or "",
+                                x.get("elementLabel") or ""))
+    out += _md_table(
+        ["Element", "Type", "Space", "Direction", "Issue",
+         "Actual REI", "Required REI"],
+        [[x.get("elementLabel"), x.get("assetType"), x.get("spaceLabel"),
+          x.get("direction"), x.get("issue"), x.get("actualREI"),
+          x.get("requiredREI")] for x in failing])
+    return out
+
+
+def _render_risk(r: dict) -> list[str]:
+    out = []
+    units = _rows(r, "C1")
+    out += (_no_data("C1") if units is None else
+            _md_table(["Risk unit", "Spaces", "Sprinklers", "Alarm",
+                       "Declared exposure (GBP)"],
+                      [[x.get("ruLabel"), x.get("spacesCovered"),
+                        x.get("installStatus"), x.get("alarmStatus"),
+                        x.get("declaredExposure_GBP")] for x in units]))
+    out += ["", "**Boundary assumptions (worst first)**", ""]
+    conf = _rows(r, "C7")
+    out += (_no_data("C7") if conf is None else
+            _md_table(["Risk unit", "Assumptions", "Unknown", "Compromised",
+                       "Evidence gaps"],
+                      [[x.get("ruLabel"), x.get("totalAssumptions"),
+                        x.get("unknownCount"), x.get("compromisedCount"),
+                        x.get("evidenceGapCount")] for x in conf]))
+    states = _rows(r, "C3")
+    flagged = [x for x in states or []
+               if x.get("conditionState") in ("Unknown", "Compromised")]
+    if flagged:
+        out += ["", "Requires further investigation:"]
+        out += [f"- {x.get('ruLabel')}: {x.get('count')} assumption(s) "
+                f"{x.get('conditionState')}" for x in flagged]
+    return out
+
+
+def _render_evidence(r: dict) -> list[str]:
+    out = []
+    evidence = _rows(r, "C6")
+    out += (_no_data("C6") if evidence is None else
+            _md_table(["Risk unit", "Assumption", "Evidence", "Document"],
+                      [[x.get("ruLabel"), x.get("assumptionLabel"),
+                        x.get("evidenceType"), x.get("docTitle")]
+                       for x in evidence]))
+    gaps = _rows(r, "C4")
+    if gaps:
+        out += ["", "**Evidence gaps** (Unknown assumptions with no evidence)", ""]
+        out += [f"- {x.get('ruLabel')}: {x.get('assumptionLabel')}"
+                for x in gaps]
+    return out
+
+
+_TEMPLATE_RENDERERS = {
+    1: _render_overview,
+    2: _render_inventory,
+    3: _render_compliance,
+    4: _render_risk,
+    5: _render_evidence,
+}
+
+
+def render_template_sections(sparql_results: dict,
+                             numbers: tuple[int, ...] = TEMPLATE_SECTIONS["template"]
+                             ) -> list[str]:
+    """Markdown for the given report sections, built from the query rows."""
+    out = []
+    for section in ficr_report_sections.SECTIONS:
+        if section.number in numbers:
+            body = _TEMPLATE_RENDERERS[section.number](sparql_results)
+            out.append("\n".join([section.heading, ""] + body))
+    return out
+
+
+def report_llm_sections(mode: str, sections: bool
+                        ) -> tuple[ficr_report_sections.Section, ...] | None:
+    """Sections LLM#2 writes in *mode*; None means one whole-report call."""
+    if mode == "llm" and not sections:
+        return None
+    return tuple(s for s in ficr_report_sections.SECTIONS
+                 if s.number not in TEMPLATE_SECTIONS[mode]
+                 and mode != "template")
+
+
 # ═════════════════════════════════════════════════════════════════════════
 #  Pipeline stages
 # ═════════════════════════════════════════════════════════════════════════
@@ -229,48 +804,317 @@ def extract_json(text: str) -> dict:
     raise ValueError("No JSON object found in LLM response.")
 
 
-def validate_survey(survey: dict, schema: dict) -> list[str]:
+# Reference fields checked by the ID-index pass: (field, target kinds).
+_REFERENCE_FIELDS = {
+    "storeys": [("building_ref", ("building",))],
+    "spaces": [("storey_ref", ("storey",)),
+               ("adjacent_elements", ("element",))],
+    "risk_units": [("covers_spaces", ("space",)),
+                   ("is_exposed_to", ("risk_unit",))],
+    "boundary_assumptions": [("applies_to_risk_unit", ("risk_unit",)),
+                             ("about_element", ("element",)),
+                             ("supported_by_evidence", ("evidence",))],
+}
+
+# Top-level arrays whose records define ids, and the kind they define.
+_ID_SECTIONS = {
+    "storeys": "storey",
+    "spaces": "space",
+    "elements": "element",
+    "risk_units": "risk_unit",
+    "boundary_assumptions": "boundary_assumption",
+    "evidence_log": "evidence",
+}
+
+
+class SurveyValidator:
+    """Survey validator compiled once from the schema.
+
+    Combines JSON Schema validation with a single O(n) pass over the
+    survey that indexes every id and reports duplicate ids and dangling
+    or repeated cross-references, which JSON Schema cannot express.
+
+    If fastjsonschema is installed, the schema is also compiled to Python
+    code and used as a fast path for valid surveys; the jsonschema
+    validator is only consulted to collect error messages.
+    """
+
+    # (field, target kinds) per section, and the kind of id each section defines
+    reference_fields = _REFERENCE_FIELDS
+    id_sections = _ID_SECTIONS
+
+    def __init__(self, schema: dict | None = None):
+        self.schema = schema if schema is not None else load_schema()
+        self._validator = Draft202012Validator(
+            self.schema, format_checker=Draft202012Validator.FORMAT_CHECKER)
+        self._fast = None
+        try:
+            import fastjsonschema
+            self._fast = fastjsonschema.compile(self.schema)
+        except Exception:
+            pass
+
+    def schema_valid(self, survey: dict) -> bool:
+        """Schema check only, on the compiled fast path when available."""
+        if self._fast is not None:
+            try:
+                self._fast(survey)
+                return True
+            except Exception:
+                return False
+        return self._validator.is_valid(survey)
+
+    def schema_errors(self, survey: dict) -> list[str]:
+        """JSON Schema errors as 'path: message' strings."""
+        if self._fast is not None and self.schema_valid(survey):
+            return []
+        errors = []
+        for err in self._validator.iter_errors(survey):
+            path = ".".join(str(p) for p in err.absolute_path) or "(root)"
+            errors.append(f"{path}: {err.message[:200]}")
+        return errors
+
+    def record_errors(self, section: str, index: int | None,
+                      record) -> list[str]:
+        """Schema errors of one top-level record, e.g. spaces[3] of a
+        survey still being streamed (index None: a whole top-level value)."""
+        schema = self.schema.get("properties", {}).get(section)
+        if schema is None:
+            return [f"{section}: unexpected top-level key"]
+        if index is not None:
+            schema = schema.get("items", {})
+        prefix = section if index is None else f"{section}.{index}"
+        return [".".join([prefix] + [str(p) for p in err.absolute_path])
+                + f": {err.message[:200]}"
+                for err in self._validator.descend(record, schema)]
+
+    def iter_schema_errors(self, survey: dict):
+        """Raw jsonschema ValidationErrors (used by ficr_survey_repair)."""
+        return self._validator.iter_errors(survey)
+
+    def reference_errors(self, survey: dict) -> list[str]:
+        """Duplicate ids and dangling/duplicate references, with JSON paths."""
+        if not isinstance(survey, dict):
+            return []
+        errors = []
+        index: dict[str, tuple[str, str]] = {}  # id → (kind, path)
+
+        def define(rid, kind, path):
+            if not isinstance(rid, str):
+                return
+            if rid in index:
+                errors.append(f"{path}: duplicate id '{rid}' "
+                              f"(first defined at {index[rid][1]})")
+            else:
+                index[rid] = (kind, path)
+
+        bld = survey.get("building")
+        if isinstance(bld, dict):
+            define(bld.get("id"), "building", "building.id")
+        for section, kind in _ID_SECTIONS.items():
+            records = survey.get(section)
+            if not isinstance(records, list):
+                continue
+            for i, rec in enumerate(records):
+                if isinstance(rec, dict):
+                    define(rec.get("id"), kind, f"{section}.{i}.id")
+
+        def resolve(ref, kinds, path):
+            if not isinstance(ref, str):
+                return
+            hit = index.get(ref)
+            if hit is None:
+                errors.append(f"{path}: dangling reference '{ref}' "
+                              f"(no {' or '.join(kinds)} with this id)")
+            elif hit[0] not in kinds:
+                errors.append(f"{path}: '{ref}' is a {hit[0]}, "
+                              f"expected {' or '.join(kinds)}")
+
+        for section, fields in _REFERENCE_FIELDS.items():
+            records = survey.get(section)
+            if not isinstance(records, list):
+                continue
+            for i, rec in enumerate(records):
+                if not isinstance(rec, dict):
+                    continue
+                for field, kinds in fields:
+                    value = rec.get(field)
+                    base = f"{section}.{i}.{field}"
+                    if isinstance(value, list):
+                        seen: dict[str, int] = {}
+                        for j, ref in enumerate(value):
+                            if not isinstance(ref, str):
+                                continue
+                            if ref in seen:
+                                errors.append(
+                                    f"{base}.{j}: duplicate reference "
+                                    f"'{ref}' (also at {base}.{seen[ref]})")
+                                continue
+                            seen[ref] = j
+                            resolve(ref, kinds, f"{base}.{j}")
+                    else:
+                        resolve(value, kinds, base)
+        return errors
+
+    def validate(self, survey: dict) -> list[str]:
+        """Schema errors followed by referential-integrity errors."""
+        return self.schema_errors(survey) + self.reference_errors(survey)
+
+
+# Compiled validators by schema content, LRU.  get_validator() with no
+# schema resolves to the default schema's key, so it shares the entry of
+# an explicit load_schema() (as passed by run_pipeline).
+VALIDATOR_CACHE_SIZE = 8
+_validators: "OrderedDict[str, SurveyValidator]" = OrderedDict()
+_validators_lock = threading.Lock()
+_default_schema_key: str | None = None
+
+
+def _schema_key(schema: dict | None) -> str:
+    global _default_schema_key
+    if schema is not None:
+        return json.dumps(schema, sort_keys=True)
+    if _default_schema_key is None:
+        _default_schema_key = json.dumps(load_schema(), sort_keys=True)
+    return _default_schema_key
+
+
+def get_validator(schema: dict | None = None) -> SurveyValidator:
+    """Return the compiled validator for *schema* (default: survey_schema.json).
+
+    Validators are cached by the schema's content, so a schema loaded
+    again (load_schema() returns a fresh dict) reuses the compiled one.
+    """
+    key = _schema_key(schema)
+    with _validators_lock:
+        validator = _validators.get(key)
+        if validator is not None:
+            _validators.move_to_end(key)
+            return validator
+    validator = SurveyValidator(schema)
+    with _validators_lock:
+        _validators[key] = validator
+        while len(_validators) > VALIDATOR_CACHE_SIZE:
+            _validators.popitem(last=False)
+    return validator
+
+
+def validate_survey(survey: dict, schema: dict | None = None) -> list[str]:
     """Validate survey against schema. Returns list of error messages (empty = OK)."""
-    validator = Draft202012Validator(schema,
-                                     format_checker=Draft202012Validator.FORMAT_CHECKER)
-    errors = []
-    for err in validator.iter_errors(survey):
-        path = ".".join(str(p) for p in err.absolute_path) or "(root)"
-        errors.append(f"{path}: {err.message[:200]}")
-    return errors
+    return get_validator(schema).validate(survey)
+
+
+def _stream_llm1(llm: LLMAdapter, prompt: str, message: str,
+                 validator: SurveyValidator, converter=None) -> dict:
+    """One full LLM#1 generation, streamed and checked record by record.
+
+    Each record is schema-checked, and queued to *converter* (stage 2,
+    converting on its own thread), as soon as it is complete.  A structural error aborts the generation
+    at once with ficr_survey_stream.StructuralError; the stream is also
+    closed as soon as the document's closing brace arrives.
+    """
+    stream = ficr_survey_stream.SurveyStream()
+    if converter is not None:
+        converter.reset()
+    chunks = llm.stream(prompt, message)
+    t0 = time.perf_counter()
+    first = None
+    invalid = 0
+    try:
+        for chunk in chunks:
+            for section, index, record in stream.feed(chunk):
+                if first is None:
+                    first = time.perf_counter() - t0
+                if validator.record_errors(section, index, record):
+                    invalid += 1
+                if converter is not None:
+                    converter.add(section, record)
+            if stream.complete:
+                break
+    except ficr_survey_stream.StructuralError:
+        print(f"  [LLM#1] Generation aborted after {stream.received} chars "
+              f"({time.perf_counter() - t0:.1f}s)")
+        raise
+    finally:
+        chunks.close()
+        if converter is not None:
+            converter.finish()
+    records = sum(stream.counts.values())
+    print(f"  [LLM#1] Streamed {records} record(s) in "
+          f"{time.perf_counter() - t0:.1f}s (first after "
+          f"{first or 0:.1f}s), {invalid} with schema errors")
+    return stream.document()
 
 
 def stage_llm1(llm: LLMAdapter, user_input: str,
                schema: dict,
-               system_prompt: str | None = None) -> dict:
-    """Stage 1: Call LLM#1 to produce survey JSON with validation retries."""
+               system_prompt: str | None = None,
+               converter=None) -> dict:
+    """Stage 1: Call LLM#1 to produce survey JSON with validation retries.
+
+    Full generations are streamed (_stream_llm1): records are validated,
+    and converted by *converter* (a ficr_json_to_rdf.IncrementalConverter)
+    while the model is still writing, and a structurally broken reply is
+    abandoned as soon as it goes wrong.
+
+    Validation errors are first repaired locally (ficr_survey_repair).
+    Only errors that remain cost another LLM call, which asks for a JSON
+    Patch of the failing records instead of the whole document; a reply
+    that cannot be parsed or applied is regenerated in full.
+    """
     prompt = system_prompt or load_system_prompt()
+    validator = get_validator(schema)
 
+    survey = None
     last_errors = []
     for attempt in range(1 + MAX_VALIDATION_RETRIES):
-        if attempt == 0:
-            message = user_input
+        counter = f"Attempt {attempt + 1}/{1 + MAX_VALIDATION_RETRIES}"
+        if survey is None:
+            if attempt == 0:
+                message = user_input
+            else:
+                err_text = "\n".join(f"  - {e}" for e in last_errors)
+                message = (
+                    f"Your previous JSON had {len(last_errors)} validation error(s):\n"
+                    f"{err_text}\n\n"
+                    f"Please fix these errors and regenerate the complete JSON. "
+                    f"Original description:\n{user_input}"
+                )
+            print(f"  [LLM#1] {counter} … calling {llm.provider}/{llm.model}")
+
+            try:
+                survey = _stream_llm1(llm, prompt, message, validator,
+                                      converter)
+            except (json.JSONDecodeError, ValueError) as e:
+                last_errors = [f"JSON parse error: {e}"]
+                print(f"  [LLM#1] JSON extraction failed: {e}")
+                continue
         else:
-            err_text = "\n".join(f"  - {e}" for e in last_errors)
-            message = (
-                f"Your previous JSON had {len(last_errors)} validation error(s):\n"
-                f"{err_text}\n\n"
-                f"Please fix these errors and regenerate the complete JSON. "
-                f"Original description:\n{user_input}"
-            )
-
-        print(f"  [LLM#1] Attempt {attempt + 1}/{1 + MAX_VALIDATION_RETRIES} "
-              f"… calling {llm.provider}/{llm.model}")
-
-        raw = llm.chat(prompt, message)
-        try:
-            survey = extract_json(raw)
-        except (json.JSONDecodeError, ValueError) as e:
-            last_errors = [f"JSON parse error: {e}"]
-            print(f"  [LLM#1] JSON extraction failed: {e}")
-            continue
-
-        errors = validate_survey(survey, schema)
+            print(f"  [LLM#1] {counter} … requesting a JSON Patch for "
+                  f"{len(last_errors)} error(s) from {llm.provider}/{llm.model}")
+            raw = llm.chat(ficr_survey_repair.PATCH_SYSTEM_PROMPT,
+                           ficr_survey_repair.patch_request(
+                               survey, last_errors, user_input))
+            try:
+                patch = ficr_survey_repair.extract_patch(raw)
+                survey = ficr_abox_patch.apply_json_patch(survey, patch)
+                print(f"  [LLM#1] Applied {len(patch)} patch operation(s)")
+            except (json.JSONDecodeError, ValueError, KeyError, IndexError,
+                    TypeError) as e:
+                print(f"  [LLM#1] Patch rejected ({e}); regenerating")
+                survey = None
+                continue
+
+        errors = validator.validate(survey)
+        if errors:
+            t0 = time.perf_counter()
+            repaired, fixes = ficr_survey_repair.repair(survey, validator)
+            if fixes:
+                survey, before = repaired, len(errors)
+                errors = validator.validate(survey)
+                print(f"  [LLM#1] Local repair: {len(fixes)} fix(es), "
+                      f"{before} → {len(errors)} error(s) in "
+                      f"{(time.perf_counter() - t0) * 1000:.1f} ms")
         if not errors:
             print(f"  [LLM#1] Validation passed on attempt {attempt + 1}")
             return survey
@@ -287,31 +1131,146 @@ def stage_llm1(llm: LLMAdapter, user_input: str,
         f"Last errors:\n" + "\n".join(last_errors))
 
 
-def stage_convert(survey: dict) -> str:
-    """Stage 2: Convert survey JSON to RDF/Turtle ABox."""
-    g = ficr_json_to_rdf.convert(survey)
-    slug = survey["meta"]["project_slug"]
+def _cache_abox(slug: str, survey: dict, g) -> None:
+    if ABOX_CACHE_SIZE <= 0:
+        return
+    with _abox_cache_lock:
+        _abox_cache[slug] = (survey, g)
+        _abox_cache.move_to_end(slug)
+        while len(_abox_cache) > ABOX_CACHE_SIZE:
+            _abox_cache.popitem(last=False)
+
 
+def _write_abox(g, slug: str) -> Path:
     # Create project-specific directory
     project_dir = OUTPUT_DIR / slug
     project_dir.mkdir(parents=True, exist_ok=True)
-    
+
+    # Write beside the target and rename, so readers never see a torn file
     out_path = project_dir / "abox.ttl"
-    g.serialize(destination=str(out_path), format="turtle")
+    tmp_path = project_dir / f".abox.{os.getpid()}.{id(g):x}.tmp"
+    g.serialize(destination=str(tmp_path), format="turtle")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def stage_convert(survey: dict, store=None, converter=None):
+    """Stage 2: Convert survey JSON to RDF/Turtle ABox.
+
+    Without *store*, writes output/<slug>/abox.ttl and returns its path.
+    With an ArtifactStore, returns a request-scoped, pinned Artifact
+    instead; the caller must release it once stage 3 is done.
+    *converter* is the IncrementalConverter that already converted the
+    records LLM#1 streamed; only changes made since are applied.
+    """
+    if converter is not None:
+        g = converter.convert(survey)
+        print(f"  [RDF]   {converter.reused} record(s) converted while "
+              f"LLM#1 was streaming")
+    else:
+        g = ficr_json_to_rdf.convert(survey)
+    slug = survey["meta"]["project_slug"]
+
+    if store is not None:
+        art = store.put(slug, g)
+        where = art.path.name if art.path is not None else "memory"
+        print(f"  [RDF]   {len(g)} triples → {where}")
+        return art
+
+    if ABOX_CACHE_SIZE > 0:
+        _cache_abox(slug, copy.deepcopy(survey), g)
+    out_path = _write_abox(g, slug)
     print(f"  [RDF]   {len(g)} triples → {out_path.relative_to(_HERE)}")
     return str(out_path)
 
 
-def stage_sparql(abox_path: str,
+def stage_patch(previous: dict, new: dict | None = None,
+                patch: list[dict] | None = None) -> tuple[dict, str]:
+    """Stage 2 (incremental): update the ABox for a re-surveyed building.
+
+    Takes the previously converted survey plus either the full new
+    survey or an RFC 6902 JSON Patch against it, applies only the triple
+    delta to the cached graph, and rewrites the on-disk ABox.
+
+    Returns (new_survey, abox_path).
+    """
+    if (new is None) == (patch is None):
+        raise ValueError("stage_patch needs exactly one of 'new' or 'patch'")
+
+    scope = None
+    if patch is not None:
+        new = ficr_abox_patch.apply_json_patch(previous, patch)
+        scope = ficr_abox_patch.patch_scope(patch)
+
+    slug = previous["meta"]["project_slug"]
+    new_slug = new["meta"]["project_slug"]
+    with _abox_cache_lock:
+        cached = _abox_cache.pop(slug, None)
+    if new_slug != slug:
+        # Every instance IRI changes with the slug — rebuild.
+        g = ficr_json_to_rdf.convert(new)
+        added, removed = set(g), set()
+    else:
+        if cached is None or (cached[0] is not previous
+                              and cached[0] != previous):
+            # Nothing usable cached for this survey — build the base once.
+            CACHE_REQUESTS.inc("abox", "miss")
+            g = ficr_json_to_rdf.convert(previous)
+        else:
+            CACHE_REQUESTS.inc("abox", "hit")
+            g = cached[1]
+        added, removed = ficr_abox_patch.diff_surveys(previous, new, scope)
+        ficr_abox_patch.apply_delta(g, added, removed)
+
+    # The cache holds a reference: callers must treat the returned survey
+    # as immutable and pass it back unchanged as the next 'previous'.
+    _cache_abox(new_slug, new, g)
+
+    out_path = _write_abox(g, new_slug)
+    print(f"  [RDF]   +{len(added)}/-{len(removed)} triples "
+          f"({len(g)} total) → {out_path.relative_to(_HERE)}")
+    return new, str(out_path)
+
+
+def get_query_context() -> ficr_sparql_runner.QueryContext:
+    """Process-wide TBox + regulatory graph and prepared queries, loaded once."""
+    global _query_context
+    if _query_context is None:
+        with _query_context_lock:
+            if _query_context is None:
+                _query_context = ficr_sparql_runner.QueryContext(
+                    str(TBOX_PATH), str(REG_PATH), str(SPARQL_PATH))
+    return _query_context
+
+
+def prepare_queries() -> ficr_sparql_runner.QueryContext:
+    """Load the ontology and have a prepared query set ready for stage 3.
+
+    Meant to run on another thread while stage 1 and 2 are in progress;
+    the thread that later runs stage 3 adopts the prepared set.
+    """
+    ctx = get_query_context()
+    ctx.prepare()
+    return ctx
+
+
+def stage_sparql(abox_path,
                  tbox_path: str | None = None,
                  reg_path: str | None = None,
                  sparql_path: str | None = None) -> dict:
-    """Stage 3: Run SPARQL queries on merged graph."""
-    tb = tbox_path or str(TBOX_PATH)
-    rg = reg_path or str(REG_PATH)
-    sq = sparql_path or str(SPARQL_PATH)
+    """Stage 3: Run SPARQL queries on merged graph.
 
-    data = ficr_sparql_runner.run(tb, rg, abox_path, sq)
+    *abox_path* is a Turtle path or an in-memory ABox Graph.  With the
+    default ontology and query files the shared, preloaded QueryContext
+    is used; custom paths are loaded for this call only.
+    """
+    if tbox_path is None and reg_path is None and sparql_path is None:
+        data = get_query_context().run(abox_path)
+    else:
+        tb = tbox_path or str(TBOX_PATH)
+        rg = reg_path or str(REG_PATH)
+        sq = sparql_path or str(SPARQL_PATH)
+        data = ficr_sparql_runner.run(tb, rg, abox_path, sq)
     m = data["meta"]
     print(f"  [SPARQL] {m['total_triples']} triples, "
           f"{m['query_count']} queries executed")
@@ -320,9 +1279,38 @@ def stage_sparql(abox_path: str,
     return data
 
 
-def stage_llm2(llm: LLMAdapter, sparql_results: dict) -> str:
-    """Stage 4 (optional): Call LLM#2 to produce a human-readable report."""
-    user_msg = json.dumps(sparql_results, indent=2, ensure_ascii=False)
+def stage_llm2(llm: LLMAdapter | None, sparql_results: dict,
+               fmt: str | None = None, sections: bool | None = None,
+               mode: str | None = None) -> str:
+    """Stage 4 (optional): Call LLM#2 to produce a human-readable report.
+
+    With *sections* the report is written section by section in parallel
+    and joined in section order.  In "hybrid" and "template" *mode* the
+    tabular sections are rendered locally (llm may be None for template).
+    """
+    fmt = fmt or REPORT_INPUT_FORMAT
+    mode = mode or REPORT_MODE
+    if mode not in REPORT_MODES:
+        raise ValueError(f"Unknown report mode: {mode}")
+    if sections is None:
+        sections = REPORT_SECTIONS
+    llm_sections = report_llm_sections(mode, sections)
+    if llm_sections is not None:
+        t0 = time.perf_counter()
+        rendered = render_template_sections(sparql_results,
+                                            TEMPLATE_SECTIONS[mode])
+        if rendered:
+            print(f"  [LLM#2] {len(rendered)} template section(s) rendered "
+                  f"in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        written = (_stage_llm2_sections(llm, sparql_results, fmt, llm_sections)
+                   if llm_sections else [])
+        report = ficr_report_sections.join_sections(rendered + written)
+        print(f"  [LLM#2] Report assembled ({len(report)} chars, {mode})")
+        return report
+    user_msg = ficr_report_prompt.report_input(sparql_results, fmt)
+    stats = ficr_report_prompt.token_stats(sparql_results, user_msg)
+    print(f"  [LLM#2] Input: {stats['prompt_tokens']} tokens ({fmt}), "
+          f"{stats['json_tokens']} as JSON (-{stats['saved_pct']}%)")
 
     print(f"  [LLM#2] Generating report … {llm.provider}/{llm.model}")
     report = llm.chat(REPORT_SYSTEM_PROMPT, user_msg)
@@ -330,6 +1318,27 @@ def stage_llm2(llm: LLMAdapter, sparql_results: dict) -> str:
     return report
 
 
+def _stage_llm2_sections(llm: LLMAdapter, sparql_results: dict, fmt: str,
+                         sections: tuple) -> list[str]:
+    messages = ficr_report_sections.section_messages(sparql_results, fmt,
+                                                     sections)
+    tokens = sum(ficr_report_prompt.estimate_tokens(m) for _, _, m in messages)
+    print(f"  [LLM#2] Input: {tokens} tokens ({fmt}) over "
+          f"{len(messages)} sections")
+    print(f"  [LLM#2] Generating {len(messages)} sections in parallel … "
+          f"{llm.provider}/{llm.model}")
+
+    def write(section, system, user_msg):
+        t0 = time.perf_counter()
+        text = llm.chat(system, user_msg)
+        print(f"  [LLM#2] {section.heading} "
+              f"({len(text)} chars, {time.perf_counter() - t0:.1f}s)")
+        return text
+
+    with ThreadPoolExecutor(max_workers=len(messages)) as pool:
+        return list(pool.map(lambda m: write(*m), messages))
+
+
 # ═════════════════════════════════════════════════════════════════════════
 #  Full pipeline
 # ═════════════════════════════════════════════════════════════════════════
@@ -346,32 +1355,34 @@ def run_pipeline(
     report_provider: str | None = None,
     report_model: str | None = None,
     report_api_key: str | None = None,
+    report_sections: bool | None = None,
+    report_mode: str | None = None,
+    hedge_backup: str | None = None,
+    hedge_delay_s: float | None = None,
 ) -> dict:
     """Run the full FiCR pipeline and return a result dict.
 
+    The stages run as a dependency graph: loading the ontology and
+    preparing the queries, and opening the report provider's client,
+    start alongside stage 1 rather than after the stages before them.
+    The critical path of the run is printed and returned.
+
     Returns:
         {
             "survey": <dict>,            # validated survey JSON
             "abox_path": <str>,           # path to generated .ttl
             "sparql_results": <dict>,     # structured query results
             "report": <str|None>,         # markdown report (if generated)
+            "schedule": <dict>,           # critical path and stage timings
         }
     """
-    # Default models per provider
-    default_models = {
-        "claude": "claude-sonnet-4-20250514",
-        "openai": "gpt-4o",
-        "gemini": "gemini-2.0-flash",
-        "deepseek": "deepseek-chat",
-        "glm": "glm-4-plus",
-    }
-
     provider = provider.lower()
-    model = model or default_models.get(provider, "")
+    model = model or DEFAULT_MODELS.get(provider, "")
 
     llm = LLMAdapter(provider=provider, model=model,
                       api_key=api_key, base_url=base_url,
                       temperature=temperature, max_tokens=max_tokens)
+    llm = hedge_llm(llm, hedge_backup, hedge_delay_s)
 
     schema = load_schema()
 
@@ -379,44 +1390,77 @@ def run_pipeline(
     print(f"  FiCR Pipeline — {provider}/{model}")
     print(f"{'='*60}\n")
 
+    graph = StageGraph()
+    # Preparation: independent of the stage chain, overlaps stage 1
+    graph.add("ontology", prepare_queries, optional=True)
+
     # Stage 1: LLM#1 → Survey JSON
-    print("── Stage 1: NL → Survey JSON ──")
-    survey = stage_llm1(llm, user_input, schema)
-    print()
+    # Records are converted to RDF as LLM#1 streams them (stage 2 overlap)
+    converter = ficr_json_to_rdf.IncrementalConverter()
+
+    def llm1():
+        print("── Stage 1: NL → Survey JSON ──")
+        survey = stage_llm1(llm, user_input, schema, converter=converter)
+        print()
+        return survey
 
     # Stage 2: JSON → RDF
-    print("── Stage 2: Survey JSON → RDF ──")
-    abox_path = stage_convert(survey)
-    print()
+    def convert(survey):
+        print("── Stage 2: Survey JSON → RDF ──")
+        abox_path = stage_convert(survey, converter=converter)
+        print()
+        return abox_path
 
-    # Stage 3: SPARQL queries
-    print("── Stage 3: SPARQL Queries ──")
-    sparql_results = stage_sparql(abox_path)
-    print()
+    # Stage 3: SPARQL queries (after the ontology is loaded)
+    def sparql(abox_path, _ctx):
+        print("── Stage 3: SPARQL Queries ──")
+        sparql_results = stage_sparql(abox_path)
+        print()
+        return sparql_results
+
+    graph.add("llm1", llm1)
+    graph.add("convert", convert, after=["llm1"])
+    graph.add("sparql", sparql, after=["convert", "ontology"])
 
     # Stage 4: Report (optional)
-    report = None
     if generate_report:
-        print("── Stage 4: SPARQL → Report ──")
         r_provider = report_provider or provider
-        r_model = report_model or default_models.get(r_provider, model)
+        r_model = report_model or DEFAULT_MODELS.get(r_provider, model)
+        if r_provider == "mock" == provider and not report_model:
+            r_model = model     # one cassette holds both stages
         r_key = report_api_key or api_key
 
         llm2 = LLMAdapter(provider=r_provider, model=r_model,
                            api_key=r_key, base_url=base_url,
                            temperature=0.3, max_tokens=8192)
-        report = stage_llm2(llm2, sparql_results)
-        print()
+        llm2 = hedge_llm(llm2, hedge_backup, hedge_delay_s)
 
+        def report(sparql_results, _client):
+            print("── Stage 4: SPARQL → Report ──")
+            text = stage_llm2(llm2, sparql_results, sections=report_sections,
+                              mode=report_mode)
+            print()
+            return text
+
+        after = ["sparql"]
+        if (report_mode or REPORT_MODE) != "template":
+            graph.add("report_client", llm2.prepare, optional=True)
+            after.append("report_client")
+        graph.add("report", report, after=after)
+
+    results = graph.run()
+
+    print(graph.summary())
     print(f"{'='*60}")
     print(f"  Pipeline complete")
     print(f"{'='*60}\n")
 
     return {
-        "survey": survey,
-        "abox_path": abox_path,
-        "sparql_results": sparql_results,
-        "report": report,
+        "survey": results["llm1"],
+        "abox_path": results["convert"],
+        "sparql_results": results["sparql"],
+        "report": results.get("report"),
+        "schedule": graph.timings(),
     }
 
 
@@ -434,11 +1478,14 @@ Examples:
   python pipeline.py --provider openai --model gpt-4o --user-file desc.txt
   python pipeline.py --provider deepseek --no-report --user "…"
   python pipeline.py --provider claude --report-provider openai -o result.json
+  python pipeline.py --survey-json survey.json --report-mode template
+  python pipeline.py --provider claude --record-cassette run.jsonl --user "…"
+  python pipeline.py --provider mock --model run.jsonl --user "…"
 """)
 
     # Provider
     ap.add_argument("--provider", default="claude",
-                    choices=["claude", "openai", "gemini", "deepseek", "glm"],
+                    choices=list(DEFAULT_MODELS),
                     help="LLM provider for stage 1 (default: claude)")
     ap.add_argument("--model", default=None,
                     help="Model name (default: provider-specific)")
@@ -460,10 +1507,31 @@ Examples:
     ap.add_argument("--no-report", action="store_true",
                     help="Skip LLM#2 report generation")
     ap.add_argument("--report-provider", default=None,
-                    choices=["claude", "openai", "gemini", "deepseek", "glm"],
+                    choices=list(DEFAULT_MODELS),
                     help="Separate LLM provider for report stage")
     ap.add_argument("--report-model", default=None,
                     help="Model for report stage")
+    ap.add_argument("--report-sections", action="store_true", default=None,
+                    help="Write report sections concurrently "
+                         "(default: FICR_REPORT_SECTIONS)")
+    ap.add_argument("--report-mode", default=None, choices=REPORT_MODES,
+                    help="template: render tables only, no LLM; hybrid: "
+                         "tables rendered, narrative by LLM; llm: all by "
+                         "LLM (default: FICR_REPORT_MODE or llm)")
+
+    # Hedging
+    ap.add_argument("--hedge-backup", default=None, metavar="PROVIDER:MODEL",
+                    help="Also send LLM calls here if the primary is slow "
+                         "(default: FICR_HEDGE_BACKUP)")
+    ap.add_argument("--hedge-delay", type=float, default=None, metavar="SECONDS",
+                    help="Wait this long for a first token before hedging "
+                         "(default: FICR_HEDGE_DELAY_S or 3)")
+
+    # Record / replay
+    ap.add_argument("--record-cassette", default=None, metavar="PATH",
+                    help="Append every completed LLM call to this cassette, "
+                         "for replay with --provider mock "
+                         "(default: FICR_MOCK_RECORD)")
 
     # Generation params
     ap.add_argument("--temperature", type=float, default=0.2)
@@ -479,6 +1547,10 @@ Examples:
 
     args = ap.parse_args()
 
+    if args.record_cassette:
+        global RECORDER
+        RECORDER = llm_mock.Cassette(args.record_cassette)
+
     # ── Get user input ──
     if args.survey_json:
         # Shortcut: skip LLM#1, load existing survey
@@ -507,20 +1579,19 @@ Examples:
 
         report = None
         if not args.no_report:
-            default_models = {
-                "claude": "claude-sonnet-4-20250514",
-                "openai": "gpt-4o",
-                "gemini": "gemini-2.0-flash",
-                "deepseek": "deepseek-chat",
-                "glm": "glm-4-plus",
-            }
             print("── Stage 4: SPARQL → Report ──")
             r_prov = args.report_provider or args.provider
-            r_model = args.report_model or default_models.get(r_prov, "")
+            r_model = args.report_model or DEFAULT_MODELS.get(r_prov, "")
+            if r_prov == "mock" == args.provider and args.model \
+                    and not args.report_model:
+                r_model = args.model
             llm2 = LLMAdapter(provider=r_prov, model=r_model,
                                api_key=args.api_key, base_url=args.base_url,
                                temperature=0.3, max_tokens=8192)
-            report = stage_llm2(llm2, sparql_results)
+            llm2 = hedge_llm(llm2, args.hedge_backup, args.hedge_delay)
+            report = stage_llm2(llm2, sparql_results,
+                                sections=args.report_sections,
+                                mode=args.report_mode)
             print()
 
         result = {
@@ -546,6 +1617,10 @@ Examples:
             generate_report=not args.no_report,
             report_provider=args.report_provider,
             report_model=args.report_model,
+            report_sections=args.report_sections,
+            report_mode=args.report_mode,
+            hedge_backup=args.hedge_backup,
+            hedge_delay_s=args.hedge_delay,
         )
 
     # ── Save outputs ──
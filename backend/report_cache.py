@@ -0,0 +1,88 @@
+"""report_cache.py — In-memory cache of finished LLM reports.
+
+Stage 4 dominates both latency and cost, and identical SPARQL results
+sent to the same provider/model with the same system prompt yield
+equivalent reports.  Reports are keyed by a hash of the canonical
+results, the prompt, the provider and the model, expire after a TTL and
+are evicted least-recently-used once the cache exceeds its size budget.
+
+Usage:
+    cache = ReportCache(max_bytes=32 << 20, ttl_s=86400)
+    key = report_key(sparql_results, REPORT_SYSTEM_PROMPT, "claude", model)
+    text = cache.get(key)            # None on miss
+    cache.put(key, report)
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from result_store import results_hash
+
+
+def report_key(sparql_results: dict, system_prompt: str,
+               provider: str, model: str, input_format: str = "compact") -> str:
+    """Cache key for one report request."""
+    h = hashlib.sha256()
+    for part in (results_hash(sparql_results), system_prompt, provider, model,
+                 input_format):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def replay_chunks(text: str, size: int = 64):
+    """Split a cached report into stream-sized pieces."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+class ReportCache:
+    """Thread-safe LRU of report texts with TTL and a byte budget."""
+
+    def __init__(self, max_bytes: int = 32 << 20, ttl_s: float = 86400.0):
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        # key -> (created, text, size)
+        self._items: "OrderedDict[str, tuple[float, str, int]]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if time.time() - item[0] > self.ttl_s:
+                self._drop_locked(key)
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key: str, text: str):
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._drop_locked(key)
+            self._items[key] = (time.time(), text, size)
+            self._total += size
+            while self._total > self.max_bytes:
+                self._drop_locked(next(iter(self._items)))
+
+    def _drop_locked(self, key: str):
+        self._total -= self._items.pop(key)[2]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._total = 0
@@ -0,0 +1,192 @@
+"""result_store.py — SQLite persistence of pipeline results.
+
+Each finished run is stored with its survey, ABox digest, SPARQL results,
+per-stage timings and report text, indexed by survey content hash and
+project slug, so repeat views are a single indexed read instead of a
+pipeline execution.  The database runs in WAL mode and every thread
+reads through its own connection, so reads do not wait for a write (or
+for each other); writes share one connection behind a lock.
+
+Retention is bounded: each insert prunes runs beyond *max_rows* and
+runs older than *max_age_s*.
+
+Usage:
+    store = ResultStore("output/results.sqlite3", max_rows=10_000)
+    run_id = store.save(survey, abox_digest=..., sparql_results=..., ...)
+    store.latest_by_hash(survey_hash(survey))
+    store.recent(limit=20)
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS runs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    survey_hash     TEXT    NOT NULL,
+    slug            TEXT    NOT NULL,
+    created         REAL    NOT NULL,
+    status          TEXT    NOT NULL,
+    provider        TEXT,
+    model           TEXT,
+    abox_digest     TEXT,
+    total_triples   INTEGER,
+    survey          TEXT    NOT NULL,
+    sparql_results  TEXT,
+    timings         TEXT,
+    report          TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_hash ON runs (survey_hash, created);
+CREATE INDEX IF NOT EXISTS runs_by_slug ON runs (slug, created);
+CREATE INDEX IF NOT EXISTS runs_by_created ON runs (created);
+"""
+
+# Columns returned by listings (no large JSON/text blobs).
+_SUMMARY_COLS = ("id", "survey_hash", "slug", "created", "status",
+                 "provider", "model", "abox_digest", "total_triples")
+_JSON_COLS = ("survey", "sparql_results", "timings")
+
+
+def canonical_json(obj) -> str:
+    """Key-sorted, whitespace-free JSON used for content hashing."""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False)
+
+
+def survey_hash(survey: dict) -> str:
+    """SHA-256 of the canonical survey JSON."""
+    return hashlib.sha256(canonical_json(survey).encode("utf-8")).hexdigest()
+
+
+def results_hash(sparql_results: dict) -> str:
+    """SHA-256 of canonical SPARQL results, ignoring the file-path meta."""
+    content = {
+        "meta": {k: sparql_results["meta"][k]
+                 for k in ("total_triples", "query_count", "probes_failed")},
+        "probes": sparql_results.get("probes"),
+        "results": sparql_results.get("results"),
+    }
+    return hashlib.sha256(canonical_json(content).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """Thread-safe SQLite store of pipeline runs.
+
+    max_rows / max_age_s of 0 disable that limit.
+    """
+
+    def __init__(self, path: str | Path, max_rows: int = 10_000,
+                 max_age_s: float = 0.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_rows = max_rows
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """The calling thread's read connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            for conn in [self._conn] + self._readers:
+                conn.close()
+            self._readers.clear()
+
+    def _prune_locked(self):
+        if self.max_age_s > 0:
+            self._conn.execute("DELETE FROM runs WHERE created < ?",
+                               (time.time() - self.max_age_s,))
+        if self.max_rows > 0:
+            self._conn.execute(
+                "DELETE FROM runs WHERE id <= (SELECT id FROM runs "
+                "ORDER BY id DESC LIMIT 1 OFFSET ?)", (self.max_rows,))
+
+    def save(self, survey: dict, *, status: str = "complete",
+             provider: str | None = None, model: str | None = None,
+             abox_digest: str | None = None,
+             sparql_results: dict | None = None,
+             timings: dict | None = None,
+             report: str | None = None) -> int:
+        """Insert a run and return its id."""
+        total = (sparql_results or {}).get("meta", {}).get("total_triples")
+        row = (
+            survey_hash(survey), survey["meta"]["project_slug"], time.time(),
+            status, provider, model, abox_digest, total,
+            json.dumps(survey, ensure_ascii=False),
+            json.dumps(sparql_results, ensure_ascii=False)
+            if sparql_results is not None else None,
+            json.dumps(timings) if timings is not None else None,
+            report,
+        )
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO runs (survey_hash, slug, created, status, "
+                "provider, model, abox_digest, total_triples, survey, "
+                "sparql_results, timings, report) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            self._prune_locked()
+            return cur.lastrowid
+
+    @staticmethod
+    def _full(row: sqlite3.Row | None) -> dict | None:
+        if row is None:
+            return None
+        out = dict(row)
+        for col in _JSON_COLS:
+            if out.get(col) is not None:
+                out[col] = json.loads(out[col])
+        return out
+
+    def get(self, run_id: int) -> dict | None:
+        """Return a full run record by id."""
+        row = self._reader().execute(
+            "SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._full(row)
+
+    def latest_by_hash(self, digest: str, status: str | None = "complete",
+                       provider: str | None = None,
+                       model: str | None = None) -> dict | None:
+        """Return the newest run for a survey hash, optionally filtered."""
+        sql = "SELECT * FROM runs WHERE survey_hash = ?"
+        args: list = [digest]
+        for col, val in (("status", status), ("provider", provider),
+                         ("model", model)):
+            if val is not None:
+                sql += f" AND {col} = ?"
+                args.append(val)
+        sql += " ORDER BY created DESC LIMIT 1"
+        row = self._reader().execute(sql, args).fetchone()
+        return self._full(row)
+
+    def recent(self, limit: int = 20, slug: str | None = None) -> list[dict]:
+        """Return summaries of the most recent runs, newest first."""
+        cols = ", ".join(_SUMMARY_COLS)
+        if slug is None:
+            sql, args = (f"SELECT {cols} FROM runs "
+                         f"ORDER BY created DESC LIMIT ?", (limit,))
+        else:
+            sql, args = (f"SELECT {cols} FROM runs WHERE slug = ? "
+                         f"ORDER BY created DESC LIMIT ?", (slug, limit))
+        rows = self._reader().execute(sql, args).fetchall()
+        return [dict(r) for r in rows]
@@ -0,0 +1,122 @@
+"""sample_catalog.py — In-memory catalog of the bundled sample surveys.
+
+The catalog parses every references/*_survey.json once, indexes it by
+project slug and keeps the serialised response body and its ETag, so
+the sample endpoints answer from memory.  The directory is re-stat'ed
+at most once per poll interval; files that were added, removed or
+modified since the last scan are (re)loaded, everything else is kept.
+
+Usage:
+    catalog = SampleCatalog("references", poll_s=2.0)
+    entry = catalog.get("duplex_a")       # .survey, .body, .etag
+    body, etag = catalog.listing()
+"""
+
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+SAMPLE_GLOB = "*_survey.json"
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class SampleEntry:
+    """One parsed sample survey and its pre-serialised response."""
+
+    def __init__(self, path: Path, stamp: tuple, survey: dict):
+        self.path = path
+        self.stamp = stamp              # (mtime_ns, size) at load time
+        self.survey = survey
+        self.slug = survey["meta"]["project_slug"]
+        self.summary = {
+            "slug": self.slug,
+            "building_name": survey["meta"].get(
+                "building_name", survey["building"].get("label", path.stem)),
+            "filename": path.name,
+        }
+        self.body = _dumps(survey)
+        self.etag = etag_for(self.body)
+
+
+class SampleCatalog:
+    """Slug-indexed sample surveys, refreshed when the files change."""
+
+    def __init__(self, refs_dir: str | Path, poll_s: float = 2.0):
+        self.refs_dir = Path(refs_dir)
+        self.poll_s = poll_s
+        self._by_file: dict[Path, SampleEntry] = {}
+        self._by_slug: dict[str, SampleEntry] = {}
+        self._listing = b"[]"
+        self._listing_etag = etag_for(self._listing)
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _scan(self) -> dict[Path, tuple]:
+        stamps = {}
+        for f in self.refs_dir.glob(SAMPLE_GLOB):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            stamps[f] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def refresh(self) -> bool:
+        """Rescan the directory now; returns True if anything changed."""
+        stamps = self._scan()
+        with self._lock:
+            self._checked = time.monotonic()
+            changed = stamps.keys() != self._by_file.keys()
+            by_file = {}
+            for f, stamp in stamps.items():
+                old = self._by_file.get(f)
+                if old is not None and old.stamp == stamp:
+                    by_file[f] = old
+                    continue
+                changed = True
+                try:
+                    with open(f, encoding="utf-8") as fh:
+                        by_file[f] = SampleEntry(f, stamp, json.load(fh))
+                except Exception:
+                    # Unreadable or half-written: keep the previous version
+                    # (its stale stamp makes the next scan retry the file).
+                    if old is not None:
+                        by_file[f] = old
+            if not changed:
+                return False
+            self._by_file = by_file
+            # Sorted by filename, first file wins on a duplicate slug.
+            self._by_slug = {}
+            for f in sorted(by_file):
+                self._by_slug.setdefault(by_file[f].slug, by_file[f])
+            self._listing = _dumps([by_file[f].summary
+                                    for f in sorted(by_file)])
+            self._listing_etag = etag_for(self._listing)
+            return True
+
+    def _maybe_refresh(self):
+        if time.monotonic() - self._checked >= self.poll_s:
+            self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._by_slug)
+
+    def get(self, slug: str) -> SampleEntry | None:
+        self._maybe_refresh()
+        return self._by_slug.get(slug)
+
+    def listing(self) -> tuple[bytes, str]:
+        """Serialised sample list and its ETag."""
+        self._maybe_refresh()
+        return self._listing, self._listing_etag
@@ -10,15 +10,20 @@ Usage:
 import json
 import os
 import sys
+import time
+import zlib
+import urllib.parse
 import asyncio
 import traceback
+import threading
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncContextManager, AsyncGenerator, Callable, Literal
+from contextlib import asynccontextmanager, nullcontext
 from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 # Ensure pipeline modules are importable
@@ -26,15 +31,97 @@ _HERE = Path(__file__).resolve().parent
 sys.path.insert(0, str(_HERE))
 
 from pipeline import (
-    validate_survey, load_schema, stage_convert, stage_sparql,
-    LLMAdapter, REPORT_SYSTEM_PROMPT,
-    TBOX_PATH, REG_PATH, SPARQL_PATH,
+    SurveyValidator, load_schema, stage_convert, stage_sparql,
+    LLMAdapter, REPORT_SYSTEM_PROMPT, REPORT_INPUT_FORMAT, REPORT_SECTIONS,
+    REPORT_MODE, REPORT_MODES, TEMPLATE_SECTIONS, render_template_sections,
+    report_llm_sections, close_clients, HEDGE_BACKUP, HEDGE_DELAY_S,
+    SCHEDULER, RECORDER,
+    get_query_context, prepare_queries, preimport_provider,
+    TBOX_PATH, REG_PATH, SPARQL_PATH, OUTPUT_DIR,
+)
+from jobs import JobManager, QueueFull
+from llm_hedge import hedged_stream, parse_backup
+import llm_mock
+from result_store import ResultStore, survey_hash, results_hash
+from artifact_store import ArtifactStore
+from sparql_pool import SparqlPool
+from sample_catalog import SampleCatalog
+from ontology_index import OntologyIndex
+from report_cache import ReportCache, report_key, replay_chunks
+from ficr_report_prompt import report_input, token_stats, estimate_tokens
+import ficr_report_sections
+from sparql_endpoint import (
+    SparqlEndpoint, QueryTimeout, NTRIPLES, TURTLE,
+)
+from metrics import (
+    REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, STAGE_SECONDS,
+    STAGE_ERRORS, LLM_REQUESTS, LLM_SECONDS, LLM_TTFT, CACHE_REQUESTS,
 )
 
 # ── App setup ────────────────────────────────────────────────────────
 
-app = FastAPI(title="FiCR Chatbot API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: load the ontology and pre-import provider SDKs before the
+    # first request needs them ("blocking" waits, "background" doesn't).
+    warmup = None
+    if WARMUP_MODE == "blocking":
+        await _warmup()
+    elif WARMUP_MODE == "background":
+        warmup = asyncio.create_task(_warmup())
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    # Shutdown: drop pooled LLM connections and worker processes
+    await close_clients()
+    if SPARQL_POOL is not None:
+        SPARQL_POOL.shutdown()
+
+
+app = FastAPI(title="FiCR Chatbot API", version="1.0.0", lifespan=lifespan)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "ficr_http_requests_total", "HTTP requests by route and status",
+    ["method", "route", "status"])
+HTTP_SECONDS = REGISTRY.histogram(
+    "ficr_http_request_duration_seconds",
+    "HTTP request duration until the response body ends", ["route"])
+REPORT_INPUT_TOKENS = REGISTRY.counter(
+    "ficr_report_input_tokens_total",
+    "Report prompt input tokens: as pretty JSON vs. actually sent",
+    ["encoding"])
+JOB_QUEUE_WAIT = REGISTRY.histogram(
+    "ficr_job_queue_wait_seconds", "Time jobs spend queued before a worker")
+
+
+class MetricsMiddleware:
+    """Count requests and time them per route template (plain ASGI)."""
 
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = route.path if route is not None else "(unmatched)"
+            HTTP_REQUESTS.inc(scope["method"], path, str(status))
+            HTTP_SECONDS.observe(time.perf_counter() - t0, path)
+
+
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -43,6 +130,179 @@ app.add_middleware(
 )
 
 SCHEMA = load_schema()
+VALIDATOR = SurveyValidator(SCHEMA)
+
+# ── Background job pool ─────────────────────────────────────────────
+
+JOB_WORKERS = int(os.environ.get("FICR_JOB_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.environ.get("FICR_JOB_MAX_QUEUED", "16"))
+JOB_RETRY_AFTER_S = 5
+
+JOBS = JobManager(
+    workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED,
+    on_start=lambda job: JOB_QUEUE_WAIT.observe(time.time() - job.created),
+)
+
+# ── Request-scoped ABox artifacts ────────────────────────────────────
+
+ARTIFACT_MODE = os.environ.get("FICR_ARTIFACT_MODE", "memory")
+ARTIFACTS = ArtifactStore(
+    mode=ARTIFACT_MODE,
+    root=os.environ.get("FICR_ARTIFACT_DIR", str(OUTPUT_DIR / "artifacts")),
+    max_bytes=int(os.environ.get("FICR_ARTIFACT_MAX_MB", "256")) << 20,
+    max_age_s=float(os.environ.get("FICR_ARTIFACT_MAX_AGE_S", "3600")),
+)
+
+# ── Stage 2-3 executor ───────────────────────────────────────────────
+# "thread" runs stages 2-3 via asyncio.to_thread; "process" uses a pool of
+# warm worker processes so concurrent SPARQL evaluation can use all cores.
+
+STAGE_EXECUTOR = os.environ.get("FICR_STAGE_EXECUTOR", "thread")
+SPARQL_POOL = None
+if STAGE_EXECUTOR == "process":
+    SPARQL_POOL = SparqlPool(
+        TBOX_PATH, REG_PATH, SPARQL_PATH,
+        workers=int(os.environ.get("FICR_PROCESS_WORKERS", "0")) or None,
+        max_tasks_per_child=int(os.environ.get("FICR_PROCESS_MAX_TASKS", "200")),
+    )
+
+# ── Persistent result store ─────────────────────────────────────────
+
+# Runs beyond the row limit or older than the age limit are pruned on
+# insert (0 disables a limit).
+RESULTS = ResultStore(
+    os.environ.get("FICR_RESULTS_DB", str(OUTPUT_DIR / "results.sqlite3")),
+    max_rows=int(os.environ.get("FICR_RESULTS_MAX_ROWS", "10000")),
+    max_age_s=float(os.environ.get("FICR_RESULTS_MAX_AGE_DAYS", "90")) * 86400,
+)
+
+# ── SSE streaming ────────────────────────────────────────────────────
+# Compact streams coalesce report tokens into one frame per window or
+# size limit, and may be gzip-compressed (flushed per frame).
+
+SSE_FLUSH_S = float(os.environ.get("FICR_SSE_FLUSH_MS", "50")) / 1000
+SSE_FLUSH_CHARS = int(os.environ.get("FICR_SSE_FLUSH_CHARS", "512"))
+SSE_GZIP = os.environ.get("FICR_SSE_GZIP", "1") != "0"
+
+# ── Sample survey catalog ───────────────────────────────────────────
+
+SAMPLES = SampleCatalog(
+    _HERE / "references",
+    poll_s=float(os.environ.get("FICR_SAMPLES_POLL_S", "2")),
+)
+
+# ── Ontology index ───────────────────────────────────────────────────
+# Built once (during warmup, or on first request) from the TBox so the
+# Documentation page does not have to parse Turtle in the browser.
+
+_ontology_index: OntologyIndex | None = None
+_ontology_index_lock = threading.Lock()
+
+
+def get_ontology_index() -> OntologyIndex:
+    global _ontology_index
+    if _ontology_index is None:
+        with _ontology_index_lock:
+            if _ontology_index is None:
+                _ontology_index = OntologyIndex(TBOX_PATH)
+    return _ontology_index
+
+
+# ── Report cache ─────────────────────────────────────────────────────
+# FICR_REPORT_CACHE_MB=0 disables caching of LLM reports.
+
+REPORT_CACHE_MB = int(os.environ.get("FICR_REPORT_CACHE_MB", "32"))
+REPORTS = ReportCache(
+    max_bytes=REPORT_CACHE_MB << 20,
+    ttl_s=float(os.environ.get("FICR_REPORT_CACHE_TTL_S", "86400")),
+)
+
+# ── Startup warmup ───────────────────────────────────────────────────
+# FICR_WARMUP: "background" (default), "blocking" or "off".
+# FICR_PREIMPORT_PROVIDERS=0 skips importing SDKs of configured providers.
+
+WARMUP_MODE = os.environ.get("FICR_WARMUP", "background")
+PREIMPORT_PROVIDERS = os.environ.get("FICR_PREIMPORT_PROVIDERS", "1") != "0"
+
+# component -> {"status": pending|running|ready|failed|skipped, ...}
+WARMUP_STATUS: dict[str, dict] = {
+    "schema": {"status": "ready"},      # compiled at import (VALIDATOR)
+    "query_context": {"status": "pending"},
+    "ontology_index": {"status": "pending"},
+}
+# Components that must be ready before /ready reports 200.
+_REQUIRED_WARMUP = ("schema", "query_context")
+
+
+async def _warm(component: str, fn, *args):
+    entry = WARMUP_STATUS.setdefault(component, {})
+    entry.update(status="running")
+    t0 = time.perf_counter()
+    try:
+        ok = await asyncio.to_thread(fn, *args)
+    except Exception as e:
+        entry.update(status="failed", error=str(e))
+        return
+    entry.update(status="ready" if ok is not False else "failed",
+                 seconds=round(time.perf_counter() - t0, 3))
+    if ok is False:
+        entry["error"] = "not installed"
+
+
+async def _warmup():
+    """Preload the base graph / prepared queries, then provider SDKs."""
+    if SPARQL_POOL is not None:
+        await _warm("query_context", SPARQL_POOL.warmup)
+    else:
+        await _warm("query_context", get_query_context)
+    await _warm("ontology_index", get_ontology_index)
+    if not PREIMPORT_PROVIDERS:
+        return
+    for pid, cfg in PROVIDER_CONFIG.items():
+        if os.environ.get(cfg["env_var"]):
+            await _warm(f"provider:{pid}", preimport_provider, pid)
+
+
+def warmup_ready() -> bool:
+    return all(WARMUP_STATUS[c]["status"] == "ready" for c in _REQUIRED_WARMUP)
+
+
+# ── Batch runs ───────────────────────────────────────────────────────
+# Per-batch caps; a request may ask for fewer workers, never more.
+
+BATCH_MAX_SURVEYS = int(os.environ.get("FICR_BATCH_MAX_SURVEYS", "100"))
+BATCH_WORKERS = int(os.environ.get("FICR_BATCH_WORKERS", "4"))
+BATCH_REPORT_MAX = int(os.environ.get("FICR_BATCH_REPORT_CONCURRENCY", "2"))
+BATCH_REPORT_INTERVAL_S = float(
+    os.environ.get("FICR_BATCH_REPORT_INTERVAL_S", "1.0"))
+
+# ── Local SPARQL endpoint ────────────────────────────────────────────
+
+SPARQL_ENDPOINT = SparqlEndpoint(
+    get_query_context,
+    max_graphs=int(os.environ.get("FICR_SPARQL_GRAPHS", "8")),
+    max_results=int(os.environ.get("FICR_SPARQL_RESULT_CACHE", "256")),
+    timeout_s=float(os.environ.get("FICR_SPARQL_TIMEOUT_S", "10")),
+)
+SPARQL_MAX_TIMEOUT_S = 60.0
+
+# ── Scrape-time gauges ───────────────────────────────────────────────
+
+REGISTRY.gauge("ficr_jobs_queued", "Jobs waiting for a worker",
+               lambda: JOBS.queue_depth)
+REGISTRY.gauge("ficr_jobs_running", "Jobs currently running",
+               lambda: JOBS.running)
+REGISTRY.gauge("ficr_artifacts", "ABox artifacts held", lambda: len(ARTIFACTS))
+REGISTRY.gauge("ficr_artifact_bytes", "Approximate bytes of held artifacts",
+               lambda: ARTIFACTS.total_bytes)
+REGISTRY.gauge("ficr_sample_surveys", "Sample surveys in the catalog",
+               lambda: len(SAMPLES))
+REGISTRY.gauge("ficr_report_cache_entries", "Reports held in the report cache",
+               lambda: len(REPORTS))
+REGISTRY.gauge("ficr_report_cache_bytes", "Bytes held in the report cache",
+               lambda: REPORTS.total_bytes)
+REGISTRY.gauge("ficr_llm_queued", "LLM calls waiting for rate-limit budget",
+               SCHEDULER.queued)
 
 # ── LLM provider registry ───────────────────────────────────────────
 
@@ -81,33 +341,42 @@ PROVIDER_CONFIG = {
         "default": "glm-4-plus",
         "label": "Zhipu GLM",
     },
+    # Offline replay of recorded completions (llm_mock); "replay" is the
+    # FICR_MOCK_CASSETTE file.
+    "mock": {
+        "env_var": "FICR_MOCK_CASSETTE",
+        "models": ["replay"],
+        "default": "replay",
+        "label": "Mock (recorded replay)",
+    },
 }
 
 
-def _sse(event: str, data: dict) -> str:
+def _sse(event: str, data: dict, event_id: int | None = None) -> str:
     """Format a Server-Sent Event message."""
     payload = json.dumps(data, ensure_ascii=False)
-    return f"event: {event}\ndata: {payload}\n\n"
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {payload}\n\n"
 
 
 # ── Streaming LLM helpers ───────────────────────────────────────────
 
-def _stream_anthropic(client, model: str, system: str, user: str):
-    """Yield text chunks from Anthropic streaming API."""
-    with client.messages.stream(
+async def _astream_anthropic(client, model: str, system: str, user: str):
+    """Yield text chunks from the Anthropic async streaming API."""
+    async with client.messages.stream(
         model=model,
         max_tokens=8192,
         temperature=0.3,
         system=system,
         messages=[{"role": "user", "content": user}],
     ) as stream:
-        for text in stream.text_stream:
+        async for text in stream.text_stream:
             yield text
 
 
-def _stream_openai(client, model: str, system: str, user: str):
-    """Yield text chunks from OpenAI-compatible streaming API."""
-    resp = client.chat.completions.create(
+async def _astream_openai(client, model: str, system: str, user: str):
+    """Yield text chunks from an OpenAI-compatible async streaming API."""
+    resp = await client.chat.completions.create(
         model=model,
         temperature=0.3,
         max_tokens=8192,
@@ -117,9 +386,12 @@ def _stream_openai(client, model: str, system: str, user: str):
             {"role": "user", "content": user},
         ],
     )
-    for chunk in resp:
-        if chunk.choices and chunk.choices[0].delta.content:
-            yield chunk.choices[0].delta.content
+    try:
+        async for chunk in resp:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await resp.close()   # client went away: drop the HTTP stream now
 
 
 def _stream_gemini(client, model_name: str, system: str, user: str):
@@ -138,28 +410,20 @@ def _stream_gemini(client, model_name: str, system: str, user: str):
             yield chunk.text
 
 
+# Gemini's SDK only streams synchronously, so it alone is bridged
+# through threads; the other providers stream on the event loop.
 _executor = ThreadPoolExecutor(max_workers=4)
 
 _SENTINEL = object()
 
 
-def _run_stream_to_queue(queue: asyncio.Queue, loop: asyncio.AbstractEventLoop,
-                         provider: str, model: str, sparql_results: dict):
-    """Run blocking LLM stream in a thread; push chunks into an asyncio Queue."""
+def _run_gemini_to_queue(queue: asyncio.Queue, loop: asyncio.AbstractEventLoop,
+                         adapter: LLMAdapter, system: str, user_msg: str):
+    """Run blocking Gemini stream in a thread; push chunks into an asyncio Queue."""
     try:
-        adapter = LLMAdapter(provider=provider, model=model,
-                             temperature=0.3, max_tokens=8192)
         adapter._ensure_client()
-        user_msg = json.dumps(sparql_results, indent=2, ensure_ascii=False)
-
-        if provider == "claude":
-            gen = _stream_anthropic(adapter._client, model, REPORT_SYSTEM_PROMPT, user_msg)
-        elif provider == "gemini":
-            gen = _stream_gemini(adapter._client, model, REPORT_SYSTEM_PROMPT, user_msg)
-        else:
-            gen = _stream_openai(adapter._client, model, REPORT_SYSTEM_PROMPT, user_msg)
-
-        for chunk in gen:
+        for chunk in _stream_gemini(adapter._client, adapter.model,
+                                    system, user_msg):
             loop.call_soon_threadsafe(queue.put_nowait, chunk)
     except Exception as e:
         loop.call_soon_threadsafe(queue.put_nowait, e)
@@ -167,28 +431,155 @@ def _run_stream_to_queue(queue: asyncio.Queue, loop: asyncio.AbstractEventLoop,
         loop.call_soon_threadsafe(queue.put_nowait, _SENTINEL)
 
 
-async def stream_report_async(provider: str, model: str, sparql_results: dict):
-    """Async generator that yields text chunks from LLM without blocking the event loop."""
-    loop = asyncio.get_running_loop()
-    queue: asyncio.Queue = asyncio.Queue()
-    loop.run_in_executor(
-        _executor, _run_stream_to_queue, queue, loop, provider, model, sparql_results
-    )
-    while True:
-        item = await queue.get()
-        if item is _SENTINEL:
-            break
-        if isinstance(item, Exception):
-            raise item
-        yield item
+async def _metered_report(provider: str, model: str, system: str,
+                          user_msg: str):
+    """_stream_report() with request / TTFT / duration metrics."""
+    t0 = time.perf_counter()
+    first = True
+    try:
+        async for chunk in _stream_report(provider, model, system, user_msg):
+            if first:
+                LLM_TTFT.observe(time.perf_counter() - t0, provider)
+                first = False
+            yield chunk
+    except (GeneratorExit, asyncio.CancelledError):
+        LLM_REQUESTS.inc(provider, "cancelled")     # lost a hedge
+        raise
+    except Exception:
+        LLM_REQUESTS.inc(provider, "error")
+        raise
+    LLM_REQUESTS.inc(provider, "ok")
+    LLM_SECONDS.observe(time.perf_counter() - t0, provider)
+
+
+async def stream_report_async(provider: str, model: str, sparql_results: dict,
+                              user_msg: str | None = None,
+                              system: str = REPORT_SYSTEM_PROMPT,
+                              on_winner=None):
+    """Async generator that yields text chunks from LLM without blocking the event loop.
+
+    With FICR_HEDGE_BACKUP set, a primary that has not streamed within
+    FICR_HEDGE_DELAY_S is hedged with the backup; the first to stream wins.
+    *on_winner*, if given, is called with the (provider, model) that
+    writes the report.
+    """
+    if user_msg is None:
+        user_msg = report_input(sparql_results, REPORT_INPUT_FORMAT)
+    backup = parse_backup(HEDGE_BACKUP) if HEDGE_BACKUP else None
+    if backup is None or backup == (provider, model):
+        if on_winner is not None:
+            on_winner((provider, model))
+        async for chunk in _metered_report(provider, model, system, user_msg):
+            yield chunk
+        return
+    candidates = [
+        (f"{provider}:{model}",
+         lambda: _metered_report(provider, model, system, user_msg)),
+        (":".join(backup), lambda: _metered_report(*backup, system, user_msg)),
+    ]
+    winner = None if on_winner is None else (
+        lambda label: on_winner(tuple(label.split(":", 1))))
+    async for chunk in hedged_stream(candidates, HEDGE_DELAY_S, winner):
+        yield chunk
+
+
+async def _static(text: str):
+    yield text
+
+
+def stream_sections_async(provider: str, model: str, messages: list[tuple],
+                          rendered: list[str] = (), on_winner=None):
+    """Stream report sections in section order.
+
+    *rendered* template sections come first and are sent at once; the
+    LLM sections in *messages* are generated concurrently (*on_winner*
+    is called for each, see stream_report_async).
+    """
+    return ficr_report_sections.ordered_merge(
+        [_static(text) for text in rendered]
+        + [stream_report_async(provider, model, None, user_msg, system,
+                               on_winner)
+           for _, system, user_msg in messages])
+
+
+async def _stream_report(provider: str, model: str, system: str,
+                         user_msg: str):
+    """Report stream within the provider's rate-limit budget, with retries."""
+    tokens = estimate_tokens(system) + estimate_tokens(user_msg)
+    chunks = SCHEDULER.astream(
+        provider, tokens,
+        lambda: _open_report(provider, model, system, user_msg))
+    if RECORDER is not None and provider != "mock":
+        chunks = llm_mock.arecord_stream(RECORDER, provider, model, system,
+                                         user_msg, chunks)
+    async for chunk in chunks:
+        yield chunk
+
+
+async def _open_report(provider: str, model: str, system: str,
+                       user_msg: str):
+    adapter = LLMAdapter(provider=provider, model=model,
+                         temperature=0.3, max_tokens=8192)
+
+    if provider == "mock":
+        adapter._ensure_client()
+        async for chunk in adapter._client.astream(system, user_msg):
+            yield chunk
+        return
+
+    if provider == "gemini":
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        loop.run_in_executor(
+            _executor, _run_gemini_to_queue, queue, loop, adapter, system,
+            user_msg
+        )
+        while True:
+            item = await queue.get()
+            if item is _SENTINEL:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        return
+
+    client = adapter.async_client()
+    if provider == "claude":
+        gen = _astream_anthropic(client, model, system, user_msg)
+    else:
+        gen = _astream_openai(client, model, system, user_msg)
+    async for chunk in gen:
+        yield chunk
 
 
 # ── Request models ───────────────────────────────────────────────────
 
+class BatchRequest(BaseModel):
+    surveys: list[dict]
+    provider: str = "claude"
+    model: str | None = None
+    report: bool = False
+    # Parallel stage 2-3 runs, and report streams in flight at once
+    workers: int | None = None
+    report_concurrency: int = 2
+    report_cache: bool = True
+    report_mode: Literal[REPORT_MODES] | None = None
+
+
 class PipelineRequest(BaseModel):
     survey: dict
     provider: str = "claude"
     model: str | None = None
+    # Compact streaming: coalesced report chunks, no full_report echo, and
+    # SPARQL results omitted when they match the client's known digest.
+    compact: bool = False
+    known_results: str | None = None
+    # False forces a fresh LLM report (the result still refreshes the cache).
+    report_cache: bool = True
+    # Write report sections concurrently (default: FICR_REPORT_SECTIONS).
+    sections: bool | None = None
+    # "template", "hybrid" or "llm" (default: FICR_REPORT_MODE).
+    report_mode: Literal[REPORT_MODES] | None = None
 
 
 # ── Endpoints ────────────────────────────────────────────────────────
@@ -198,6 +589,28 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready():
+    """Warmup status; 503 until the schema and base graph are loaded."""
+    body = {"ready": warmup_ready(), "mode": WARMUP_MODE,
+            "components": WARMUP_STATUS}
+    if WARMUP_MODE == "off":
+        body["ready"] = True
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of the in-process metrics registry."""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/llm/limits")
+def llm_limits():
+    """Per-provider rate limits, queued calls and remaining budget."""
+    return {"retries": SCHEDULER.retries, "providers": SCHEDULER.snapshot()}
+
+
 @app.get("/providers")
 def get_providers():
     """Return available LLM providers (only those with API keys configured)."""
@@ -213,134 +626,693 @@ def get_providers():
     return available
 
 
+def _cached_json(request: Request, body: bytes, etag: str,
+                 gzip_body: bytes | None = None) -> Response:
+    """JSON response with an ETag; 304 when the client already has it.
+
+    gzip_body, if given, is the pre-compressed body sent to clients that
+    accept gzip.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if gzip_body is not None:
+        headers["Vary"] = "Accept-Encoding"
+    inm = request.headers.get("if-none-match", "")
+    if etag in (t.strip().removeprefix("W/") for t in inm.split(",")) \
+            or inm.strip() == "*":
+        CACHE_REQUESTS.inc("http_etag", "hit")
+        return Response(status_code=304, headers=headers)
+    if inm:
+        CACHE_REQUESTS.inc("http_etag", "miss")
+    if gzip_body is not None and \
+            "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_body
+    return Response(content=body, media_type="application/json",
+                    headers=headers)
+
+
 @app.get("/sample-surveys")
-def list_samples():
+def list_samples(request: Request):
     """Return metadata for available sample survey files."""
-    refs_dir = _HERE / "references"
-    samples = []
-    for f in sorted(refs_dir.glob("*_survey.json")):
-        try:
-            with open(f, encoding="utf-8") as fh:
-                data = json.load(fh)
-            samples.append({
-                "slug": data["meta"]["project_slug"],
-                "building_name": data["meta"].get("building_name",
-                                                   data["building"].get("label", f.stem)),
-                "filename": f.name,
-            })
-        except Exception:
-            continue
-    return samples
+    body, etag = SAMPLES.listing()
+    return _cached_json(request, body, etag)
 
 
 @app.get("/sample-surveys/{slug}")
-def get_sample(slug: str):
+def get_sample(slug: str, request: Request):
     """Return the full survey JSON for a sample by slug."""
-    refs_dir = _HERE / "references"
-    for f in refs_dir.glob("*_survey.json"):
-        try:
-            with open(f, encoding="utf-8") as fh:
-                data = json.load(fh)
-            if data["meta"]["project_slug"] == slug:
-                return data
-        except Exception:
-            continue
-    raise HTTPException(status_code=404, detail=f"Sample '{slug}' not found")
+    entry = SAMPLES.get(slug)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Sample '{slug}' not found")
+    return _cached_json(request, entry.body, entry.etag)
 
 
-@app.post("/run-pipeline")
-async def run_pipeline_sse(req: PipelineRequest):
-    """Run pipeline stages 2-4 with SSE streaming."""
-    provider = req.provider.lower()
-    model = req.model or PROVIDER_CONFIG.get(provider, {}).get("default", "")
+@app.get("/ontology/index")
+def ontology_index(request: Request):
+    """Return the precomputed TBox index (classes, properties, search)."""
+    idx = get_ontology_index()
+    return _cached_json(request, idx.body, idx.etag, idx.gzip_body)
 
-    async def event_stream() -> AsyncGenerator[str, None]:
-        # Stage 1: Validate survey JSON
+
+@app.get("/ontology/search")
+def ontology_search(q: str, limit: int = 20):
+    """Look up classes and properties by label / name / comment words."""
+    return {"query": q, "matches": get_ontology_index().search(q, limit)}
+
+
+def _sparql_event(sparql_results: dict, compact: bool = False,
+                  known_results: str | None = None) -> dict:
+    meta = sparql_results["meta"]
+    data = {
+        "status": "complete",
+        "total_triples": meta["total_triples"],
+        "query_count": meta["query_count"],
+        "probes_failed": meta["probes_failed"],
+    }
+    if not compact:
+        data["results"] = sparql_results
+        return data
+    # Compact: send the results once; a client that already holds this
+    # digest (known_results) gets only the reference.
+    digest = results_hash(sparql_results)
+    data["results_digest"] = digest
+    if digest != known_results:
+        data["results"] = sparql_results
+    if known_results is not None:
+        CACHE_REQUESTS.inc("client_results",
+                           "hit" if digest == known_results else "miss")
+    return data
+
+
+async def _replay(text: str) -> AsyncGenerator[str, None]:
+    for chunk in replay_chunks(text):
+        yield chunk
+
+
+async def _coalesce(chunks: AsyncGenerator[str, None],
+                    window_s: float, max_chars: int
+                    ) -> AsyncGenerator[str, None]:
+    """Merge streamed text into pieces of up to *window_s* or *max_chars*."""
+    buf: list[str] = []
+    size = 0
+    started = 0.0
+    async for chunk in chunks:
+        if not buf:
+            started = time.monotonic()
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= max_chars or time.monotonic() - started >= window_s:
+            yield "".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+async def pipeline_events(survey: dict, provider: str, model: str,
+                          compact: bool = False,
+                          known_results: str | None = None,
+                          use_cache: bool = True, *,
+                          report: bool = True,
+                          report_slot: Callable[[], AsyncContextManager] | None = None,
+                          sections: bool | None = None,
+                          report_mode: str | None = None
+                          ) -> AsyncGenerator[tuple[str, dict], None]:
+    """Run pipeline stages 2-4, yielding (event, data) pairs as they complete.
+
+    With report=False the run ends after SPARQL; report_slot, if given,
+    is entered around stage 4 (used to rate-limit batch reports).
+    sections writes the report section-wise in parallel and report_mode
+    picks template / hybrid / llm rendering (None: server defaults).
+    """
+    timings: dict[str, float] = {}
+    if sections is None:
+        sections = REPORT_SECTIONS
+    try:
+        async for event, data in _pipeline_stages(
+                survey, provider, model, compact, known_results, use_cache,
+                report, report_slot, sections, report_mode or REPORT_MODE,
+                timings):
+            if event == "error":
+                STAGE_ERRORS.inc(data.get("stage", "unknown"))
+            yield event, data
+    finally:
+        for stage, seconds in timings.items():
+            STAGE_SECONDS.observe(seconds, stage)
+
+
+# Preparation tasks still running after their request finished
+_PREPARING: set[asyncio.Task] = set()
+
+
+def _prepare(name: str, timings: dict[str, float] | None, fn, *args
+             ) -> asyncio.Task:
+    """Run optional preparation *fn* in a thread, overlapping the stages.
+
+    A failure is logged and ignored: the stage that needs the prepared
+    resource builds it itself.  Its duration goes into *timings*.
+    """
+    async def run():
+        t0 = time.perf_counter()
         try:
-            errors = validate_survey(req.survey, SCHEMA)
-            if errors:
-                yield _sse("validation", {
-                    "status": "fail",
-                    "errors": errors[:10],
-                })
-                yield _sse("error", {
-                    "stage": "validation",
-                    "message": f"Survey JSON has {len(errors)} validation error(s)",
-                })
-                return
-            yield _sse("validation", {
-                "status": "pass",
-                "message": "Survey JSON is valid (ficr-survey-v1)",
-            })
+            await asyncio.to_thread(fn, *args)
         except Exception as e:
-            yield _sse("error", {"stage": "validation",
-                                  "message": f"{e}\n{traceback.format_exc()}"})
+            print(f"  [schedule] {name} failed, continuing without it: {e}")
+        if timings is not None:
+            timings[f"prepare_{name}"] = time.perf_counter() - t0
+
+    task = asyncio.create_task(run())
+    _PREPARING.add(task)
+    task.add_done_callback(_PREPARING.discard)
+    return task
+
+
+async def _pipeline_stages(survey: dict, provider: str, model: str,
+                           compact: bool, known_results: str | None,
+                           use_cache: bool, report: bool, report_slot,
+                           sections: bool, report_mode: str,
+                           timings: dict[str, float]
+                           ) -> AsyncGenerator[tuple[str, dict], None]:
+    # Independent of the survey: prepare a query set for the thread that
+    # will run stage 3 and open the report client while stages 1-3 run
+    if SPARQL_POOL is None:
+        _prepare("queries", None, prepare_queries)
+    report_client = None
+    if report and report_mode != "template":
+        report_client = _prepare(
+            "report_client", timings,
+            LLMAdapter(provider=provider, model=model).prepare, True)
+
+    # Stage 1: Validate survey JSON
+    try:
+        t0 = time.perf_counter()
+        errors = VALIDATOR.validate(survey)
+        if errors:
+            yield "validation", {
+                "status": "fail",
+                "errors": errors[:10],
+            }
+            yield "error", {
+                "stage": "validation",
+                "message": f"Survey JSON has {len(errors)} validation error(s)",
+            }
             return
+        timings["validation"] = time.perf_counter() - t0
+        yield "validation", {
+            "status": "pass",
+            "message": "Survey JSON is valid (ficr-survey-v1)",
+        }
+    except Exception as e:
+        yield "error", {"stage": "validation",
+                        "message": f"{e}\n{traceback.format_exc()}"}
+        return
 
-        # Stage 2: JSON → RDF
+    if SPARQL_POOL is not None:
+        # Stages 2-3 together in a warm worker process
         try:
-            abox_path = await asyncio.to_thread(stage_convert, req.survey)
-            from rdflib import Graph as RDFGraph
-            g = RDFGraph()
-            g.parse(abox_path, format="turtle")
-            triple_count = len(g)
-            yield _sse("rdf", {
+            out = await SPARQL_POOL.run(survey)
+        except Exception as e:
+            out = {"error": {"stage": "rdf",
+                             "message": f"{e}\n{traceback.format_exc()}"}}
+        if "error" in out:
+            yield "error", out["error"]
+            return
+        timings.update(out["timings"])
+        sparql_results = out["sparql_results"]
+        abox_digest = out["abox_digest"]
+        yield "rdf", {
+            "status": "complete",
+            "triple_count": out["triple_count"],
+            "abox_path": None,
+        }
+        yield "sparql", _sparql_event(sparql_results, compact, known_results)
+    else:
+        # Stage 2: JSON → RDF (request-scoped artifact, released after stage 3)
+        try:
+            t0 = time.perf_counter()
+            artifact = await asyncio.to_thread(stage_convert, survey, ARTIFACTS)
+            timings["rdf"] = time.perf_counter() - t0
+            yield "rdf", {
                 "status": "complete",
-                "triple_count": triple_count,
-                "abox_path": abox_path,
-            })
+                "triple_count": artifact.triple_count,
+                "abox_path": str(artifact.path) if artifact.path else None,
+                "artifact_id": artifact.key,
+            }
         except Exception as e:
-            yield _sse("error", {"stage": "rdf",
-                                  "message": f"{e}\n{traceback.format_exc()}"})
+            yield "error", {"stage": "rdf",
+                            "message": f"{e}\n{traceback.format_exc()}"}
             return
 
         # Stage 3: SPARQL queries
         try:
-            sparql_results = await asyncio.to_thread(stage_sparql, abox_path)
-            meta = sparql_results["meta"]
-            yield _sse("sparql", {
-                "status": "complete",
-                "total_triples": meta["total_triples"],
-                "query_count": meta["query_count"],
-                "probes_failed": meta["probes_failed"],
-                "results": sparql_results,
-            })
+            t0 = time.perf_counter()
+            sparql_results = await asyncio.to_thread(stage_sparql, artifact.source)
+            timings["sparql"] = time.perf_counter() - t0
+            abox_digest = await asyncio.to_thread(artifact.digest)
+            yield "sparql", _sparql_event(sparql_results, compact, known_results)
         except Exception as e:
-            yield _sse("error", {"stage": "sparql",
-                                  "message": f"{e}\n{traceback.format_exc()}"})
+            yield "error", {"stage": "sparql",
+                            "message": f"{e}\n{traceback.format_exc()}"}
             return
+        finally:
+            ARTIFACTS.release(artifact)
 
-        # Stage 4: LLM Report (streamed without blocking event loop)
+    async def record(status: str, report: str | None,
+                     author: tuple[str, str] = (provider, model)
+                     ) -> int | None:
         try:
-            yield _sse("report_start", {
+            return await asyncio.to_thread(
+                RESULTS.save, survey, status=status,
+                provider=author[0], model=author[1], abox_digest=abox_digest,
+                sparql_results=sparql_results, timings=timings,
+                report=report)
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    if not report:
+        run_id = await record("results_only", None)
+        yield "done", {
+            "message": "Pipeline complete (no report)",
+            "run_id": run_id,
+            "survey_hash": survey_hash(survey),
+        }
+        return
+
+    if report_client is not None:
+        await report_client     # normally finished during stages 1-3
+
+    # Stage 4: LLM Report (streamed without blocking event loop), or a
+    # replay of the cached report for identical results and model
+    slot = report_slot() if report_slot is not None else nullcontext()
+    try:
+        async with slot:
+            t0 = time.perf_counter()
+            rendered = render_template_sections(
+                sparql_results, TEMPLATE_SECTIONS[report_mode])
+            llm_sections = report_llm_sections(report_mode, sections)
+            cache_key = cached = None
+            if llm_sections is None:
+                system = REPORT_SYSTEM_PROMPT
+            else:
+                system = report_mode + ficr_report_sections.prompt_id(llm_sections)
+            if REPORT_CACHE_MB > 0 and llm_sections != ():
+                cache_key = report_key(sparql_results, system,
+                                       provider, model, REPORT_INPUT_FORMAT)
+                if use_cache:
+                    cached = REPORTS.get(cache_key)
+                    CACHE_REQUESTS.inc("report",
+                                       "miss" if cached is None else "hit")
+                else:
+                    CACHE_REQUESTS.inc("report", "bypass")
+            start = {
                 "provider": provider,
                 "model": model,
-            })
-            full_report = ""
-            async for chunk in stream_report_async(provider, model, sparql_results):
-                full_report += chunk
-                yield _sse("report_chunk", {"text": chunk})
-
-            yield _sse("report_done", {
-                "full_report": full_report,
-                "char_count": len(full_report),
-            })
+                "cached": cached is not None,
+                "sections": sections,
+                "mode": report_mode,
+            }
+            if cached is None and llm_sections != ():
+                if llm_sections:
+                    messages = ficr_report_sections.section_messages(
+                        sparql_results, REPORT_INPUT_FORMAT, llm_sections)
+                    user_msg = "\n".join(m for _, _, m in messages)
+                else:
+                    user_msg = report_input(sparql_results, REPORT_INPUT_FORMAT)
+                stats = await asyncio.to_thread(token_stats, sparql_results,
+                                                user_msg)
+                REPORT_INPUT_TOKENS.inc("json", amount=stats["json_tokens"])
+                REPORT_INPUT_TOKENS.inc("sent", amount=stats["prompt_tokens"])
+                start["input_tokens"] = stats
+            yield "report_start", start
+            parts: list[str] = []
+            # Who wrote the report: a hedge backup may win over the primary
+            authors: set[tuple[str, str]] = set()
+            if cached is not None:
+                chunks = _replay(cached)
+            elif llm_sections is not None:
+                chunks = stream_sections_async(
+                    provider, model, messages if llm_sections else [],
+                    rendered, authors.add)
+            else:
+                chunks = stream_report_async(provider, model, sparql_results,
+                                             user_msg, on_winner=authors.add)
+            if compact:
+                chunks = _coalesce(chunks, SSE_FLUSH_S, SSE_FLUSH_CHARS)
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield "report_chunk", {"text": chunk}
+            full_report = "".join(parts)
+            timings["report"] = time.perf_counter() - t0
+            author = (provider, model)
+            if len(authors) == 1:
+                author = authors.pop()
+            elif authors:
+                cache_key = None    # sections by different models
+            if cache_key is not None and cached is None:
+                if author != (provider, model):
+                    cache_key = report_key(sparql_results, system, *author,
+                                           REPORT_INPUT_FORMAT)
+                REPORTS.put(cache_key, full_report)
+            run_id = await record("complete", full_report, author)
+
+            done = {"char_count": len(full_report)}
+            if not compact:
+                done["full_report"] = full_report
+            yield "report_done", done
+    except Exception as e:
+        tb = traceback.format_exc()
+        await record("report_failed", None)
+        yield "error", {"stage": "report", "message": f"{e}\n{tb}"}
+        return
+
+    yield "done", {
+        "message": "Pipeline complete",
+        "run_id": run_id,
+        "survey_hash": survey_hash(survey),
+    }
+
+
+def _resolve_model(req: PipelineRequest) -> tuple[str, str]:
+    provider = req.provider.lower()
+    model = req.model or PROVIDER_CONFIG.get(provider, {}).get("default", "")
+    return provider, model
+
+
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+
+async def _gzip_frames(frames: AsyncGenerator[str, None]
+                       ) -> AsyncGenerator[bytes, None]:
+    """Gzip an SSE stream, sync-flushing after each frame so none is held back."""
+    z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for frame in frames:
+        yield z.compress(frame.encode("utf-8")) + z.flush(zlib.Z_SYNC_FLUSH)
+    yield z.flush()
+
+
+def _sse_response(request: Request, frames: AsyncGenerator[str, None],
+                  compress: bool) -> StreamingResponse:
+    """SSE response, gzip-encoded when asked for and the client accepts it."""
+    headers = dict(_SSE_HEADERS)
+    if compress and SSE_GZIP and \
+            "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        frames = _gzip_frames(frames)
+    return StreamingResponse(frames, media_type="text/event-stream",
+                             headers=headers)
+
+
+@app.post("/run-pipeline")
+async def run_pipeline_sse(req: PipelineRequest, request: Request):
+    """Run pipeline stages 2-4 with SSE streaming."""
+    provider, model = _resolve_model(req)
+
+    async def event_stream() -> AsyncGenerator[str, None]:
+        async for event, data in pipeline_events(
+                req.survey, provider, model, req.compact, req.known_results,
+                req.report_cache, sections=req.sections,
+                report_mode=req.report_mode):
+            yield _sse(event, data)
+
+    return _sse_response(request, event_stream(), req.compact)
+
+
+# ── Batch runs ───────────────────────────────────────────────────────
+
+class _ReportLimiter:
+    """At most *concurrency* reports at once, started *interval_s* apart."""
+
+    def __init__(self, concurrency: int, interval_s: float):
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._interval_s = interval_s
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._sem:
+            async with self._lock:
+                delay = self._next_start - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_start = time.monotonic() + self._interval_s
+            yield
+
+
+async def batch_lines(req: BatchRequest, provider: str, model: str
+                      ) -> AsyncGenerator[dict, None]:
+    """Run every survey of a batch, yielding one record per stage event."""
+    workers = max(1, min(req.workers or BATCH_WORKERS, BATCH_WORKERS))
+    sem = asyncio.Semaphore(workers)
+    limiter = _ReportLimiter(min(req.report_concurrency, BATCH_REPORT_MAX),
+                             BATCH_REPORT_INTERVAL_S)
+    queue: asyncio.Queue = asyncio.Queue()
+    t_start = time.perf_counter()
+
+    async def run_one(index: int, survey: dict):
+        slug = (survey.get("meta") or {}).get("project_slug")
+        failed = False
+        try:
+            async with sem:
+                async for event, data in pipeline_events(
+                        survey, provider, model, use_cache=req.report_cache,
+                        report=req.report, report_slot=limiter.slot,
+                        report_mode=req.report_mode):
+                    if event == "report_chunk":
+                        continue    # report_done carries the full text
+                    failed = failed or event == "error"
+                    await queue.put({"index": index, "slug": slug,
+                                     "event": event, "data": data})
         except Exception as e:
-            tb = traceback.format_exc()
-            yield _sse("error", {"stage": "report", "message": f"{e}\n{tb}"})
-            return
+            failed = True
+            await queue.put({"index": index, "slug": slug, "event": "error",
+                             "data": {"stage": "batch", "message": str(e)}})
+        finally:
+            await queue.put(("finished", failed))
 
-        yield _sse("done", {"message": "Pipeline complete"})
+    tasks = [asyncio.create_task(run_one(i, s))
+             for i, s in enumerate(req.surveys)]
+    remaining, failed = len(tasks), 0
+    try:
+        while remaining:
+            item = await queue.get()
+            if isinstance(item, tuple):
+                remaining -= 1
+                failed += item[1]
+                continue
+            yield item
+    finally:
+        for t in tasks:
+            t.cancel()
+    yield {"event": "batch_done",
+           "data": {"count": len(tasks), "failed": failed,
+                    "seconds": round(time.perf_counter() - t_start, 3)}}
 
-    return StreamingResponse(
-        event_stream(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+
+@app.post("/run-batch")
+async def run_batch(req: BatchRequest):
+    """Run many surveys concurrently, streaming NDJSON lines per stage."""
+    if not req.surveys:
+        raise HTTPException(status_code=422, detail="No surveys given")
+    if len(req.surveys) > BATCH_MAX_SURVEYS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_MAX_SURVEYS} surveys per batch")
+    provider = req.provider.lower()
+    model = req.model or PROVIDER_CONFIG.get(provider, {}).get("default", "")
+
+    async def lines() -> AsyncGenerator[str, None]:
+        async for rec in batch_lines(req, provider, model):
+            yield json.dumps(rec, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache",
+                                      "X-Accel-Buffering": "no"})
+
+
+# ── SPARQL 1.1 Protocol (query only) ─────────────────────────────────
+
+def _project_survey(project: str | None, run_id: int | None) -> dict | None:
+    """Survey whose ABox a query should see: a stored run, or a project's
+    newest stored run, or a bundled sample; None means base graph only."""
+    if run_id is not None:
+        run = RESULTS.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+        return run["survey"]
+    if not project:
+        return None
+    latest = RESULTS.recent(limit=1, slug=project)
+    if latest:
+        return RESULTS.get(latest[0]["id"])["survey"]
+    sample = SAMPLES.get(project)
+    if sample is not None:
+        return sample.survey
+    raise HTTPException(status_code=404, detail=f"Project '{project}' not found")
+
+
+async def _sparql_response(request: Request, query: str | None,
+                           project: str | None, run_id: int | None,
+                           timeout: float | None) -> Response:
+    if not query:
+        raise HTTPException(status_code=400, detail="Missing 'query' parameter")
+    survey = await asyncio.to_thread(_project_survey, project, run_id)
+    accept = request.headers.get("accept", "")
+    graph_format = NTRIPLES if NTRIPLES in accept else TURTLE
+    if timeout is not None:
+        timeout = max(0.1, min(timeout, SPARQL_MAX_TIMEOUT_S))
+    try:
+        body, ctype = await asyncio.to_thread(
+            SPARQL_ENDPOINT.query, query, survey, graph_format, timeout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueryTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return Response(content=body, media_type=ctype)
+
+
+@app.get("/sparql")
+async def sparql_get(request: Request, query: str | None = None,
+                     project: str | None = None, run_id: int | None = None,
+                     timeout: float | None = None):
+    """SPARQL query via GET over the base graph plus a project's ABox."""
+    return await _sparql_response(request, query, project, run_id, timeout)
+
+
+def _form_value(form: dict, name: str, cast):
+    """Optional numeric form field; 400 if present but unparseable."""
+    value = form.get(name, [None])[0]
+    if value is None:
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise HTTPException(status_code=400,
+                            detail=f"Invalid '{name}' parameter: {value!r}")
+
+
+@app.post("/sparql")
+async def sparql_post(request: Request, project: str | None = None,
+                      run_id: int | None = None, timeout: float | None = None):
+    """SPARQL query via POST (sparql-query body or urlencoded form).
+
+    Form fields (project, run_id, timeout) apply when the query string
+    does not set them.
+    """
+    ctype = request.headers.get("content-type", "").split(";")[0].strip()
+    try:
+        raw = (await request.body()).decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400,
+                            detail="Request body is not valid UTF-8")
+    if ctype == "application/sparql-query":
+        query = raw
+    elif ctype == "application/x-www-form-urlencoded":
+        form = urllib.parse.parse_qs(raw)
+        query = form.get("query", [None])[0]
+        project = project or form.get("project", [None])[0]
+        if run_id is None:
+            run_id = _form_value(form, "run_id", int)
+        if timeout is None:
+            timeout = _form_value(form, "timeout", float)
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Use application/sparql-query or "
+                   "application/x-www-form-urlencoded")
+    return await _sparql_response(request, query, project, run_id, timeout)
+
+
+# ── Stored results ───────────────────────────────────────────────────
+
+@app.get("/results")
+def list_results(limit: int = 20, slug: str | None = None):
+    """Return summaries of recent pipeline runs, newest first."""
+    return RESULTS.recent(limit=max(1, min(limit, 200)), slug=slug)
+
+
+@app.get("/results/by-hash/{digest}")
+def get_result_by_hash(digest: str, provider: str | None = None,
+                       model: str | None = None):
+    """Return the newest complete run for a survey content hash."""
+    run = RESULTS.latest_by_hash(digest, provider=provider, model=model)
+    CACHE_REQUESTS.inc("results", "miss" if run is None else "hit")
+    if run is None:
+        raise HTTPException(status_code=404,
+                            detail=f"No stored result for survey '{digest}'")
+    return run
+
+
+@app.post("/results/lookup")
+def lookup_result(req: PipelineRequest):
+    """Return the newest complete run for a survey body, if one is stored."""
+    provider, model = _resolve_model(req)
+    run = RESULTS.latest_by_hash(survey_hash(req.survey),
+                                 provider=provider, model=model)
+    CACHE_REQUESTS.inc("results", "miss" if run is None else "hit")
+    if run is None:
+        raise HTTPException(status_code=404, detail="No stored result")
+    return run
+
+
+@app.get("/results/{run_id}")
+def get_result(run_id: int):
+    """Return a stored pipeline run by id."""
+    run = RESULTS.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    return run
+
+
+# ── Background jobs ──────────────────────────────────────────────────
+
+@app.post("/jobs", status_code=202)
+async def submit_job(req: PipelineRequest):
+    """Queue a pipeline run; progress is read from /jobs/{id}/events."""
+    provider, model = _resolve_model(req)
+    try:
+        job = JOBS.submit(lambda: pipeline_events(
+            req.survey, provider, model, req.compact, req.known_results,
+            req.report_cache, sections=req.sections,
+            report_mode=req.report_mode))
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(JOB_RETRY_AFTER_S)})
+    return {**job.summary(), "events_url": f"/jobs/{job.id}/events"}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Return the status of a queued, running or finished job."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.summary()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request,
+                     last_event_id: int | None = None,
+                     compress: bool = False):
+    """Stream a job's events as SSE, replaying everything after Last-Event-ID."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    header = request.headers.get("last-event-id", "")
+    start = last_event_id if last_event_id is not None else (
+        int(header) if header.isdigit() else 0)
+
+    async def event_stream() -> AsyncGenerator[str, None]:
+        async for event_id, event, data in job.stream(start):
+            yield _sse(event, data, event_id)
+
+    return _sse_response(request, event_stream(), compress)
 
 
 if __name__ == "__main__":
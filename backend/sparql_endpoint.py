@@ -0,0 +1,184 @@
+"""sparql_endpoint.py — Local SPARQL 1.1 query service over project graphs.
+
+Queries run against the preloaded TBox + regulatory base graph merged
+with one project's ABox, so the Query Lab can explore what the pipeline
+just produced without a round trip to GraphDB.  Three caches keep
+interactive use cheap:
+
+  project graphs   — merged graphs by survey content hash (LRU)
+  prepared queries — parsed algebra per query text, per thread (rdflib
+                     prepared queries are not safe to share across threads)
+  results          — serialised responses by (graph, query, format) (LRU)
+
+Each query gets a deadline; evaluation is aborted from inside the
+graph's triples() calls once it passes.  Queries only see the local
+graphs: SERVICE clauses and FROM / FROM NAMED dataset clauses (which
+would make the server fetch arbitrary URLs) are rejected.
+
+Usage:
+    endpoint = SparqlEndpoint(get_query_context, timeout_s=10)
+    body, ctype = endpoint.query("SELECT * WHERE { ?s ?p ?o } LIMIT 5",
+                                 survey=survey)
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from rdflib import Graph
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.parserutils import CompValue
+
+import ficr_json_to_rdf
+from result_store import survey_hash
+from metrics import CACHE_REQUESTS
+
+RESULTS_JSON = "application/sparql-results+json"
+TURTLE = "text/turtle"
+NTRIPLES = "application/n-triples"
+
+
+class QueryTimeout(Exception):
+    """The query ran past its deadline."""
+
+
+class _DeadlineGraph(Graph):
+    """View of a graph's store whose triples() stops at a deadline."""
+
+    def __init__(self, graph: Graph, deadline: float):
+        super().__init__(store=graph.store, identifier=graph.identifier,
+                         namespace_manager=graph.namespace_manager)
+        self._deadline = deadline
+
+    def triples(self, triple):
+        if time.monotonic() > self._deadline:
+            raise QueryTimeout("Query exceeded its time limit")
+        return super().triples(triple)
+
+
+def _check_local(node):
+    """ValueError if the query algebra would fetch anything remote."""
+    if isinstance(node, CompValue):
+        if node.name == "ServiceGraphPattern":
+            raise ValueError("SERVICE clauses are not allowed")
+        if dict.get(node, "datasetClause"):
+            raise ValueError("FROM / FROM NAMED clauses are not allowed")
+        for value in node.values():
+            _check_local(value)
+    elif isinstance(node, (list, tuple)):
+        for value in node:
+            _check_local(value)
+
+
+class _LRU:
+    """Small thread-safe LRU mapping."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SparqlEndpoint:
+    """Evaluate SPARQL queries over base + project graphs with caching."""
+
+    def __init__(self, context: Callable, max_graphs: int = 8,
+                 max_results: int = 256, max_prepared: int = 128,
+                 timeout_s: float = 10.0):
+        self._context = context         # () -> ficr_sparql_runner.QueryContext
+        self.timeout_s = timeout_s
+        self.max_prepared = max_prepared
+        self._graphs = _LRU(max_graphs)
+        self._results = _LRU(max_results)
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+
+    # ── Graphs ────────────────────────────────────────────────────────
+
+    def graph(self, survey: dict | None) -> tuple[str, Graph]:
+        """(cache key, merged graph) for a survey; base graph if None."""
+        if survey is None:
+            return "base", self._context().base
+        key = survey_hash(survey)
+        g = self._graphs.get(key)
+        CACHE_REQUESTS.inc("project_graph", "miss" if g is None else "hit")
+        if g is None:
+            with self._build_lock:     # one build per graph, not per request
+                g = self._graphs.get(key)
+                if g is None:
+                    abox = ficr_json_to_rdf.convert(survey)
+                    g = self._context().merged(abox)
+                    self._graphs.put(key, g)
+        return key, g
+
+    # ── Queries ───────────────────────────────────────────────────────
+
+    def _prepared(self, text: str):
+        cache = getattr(self._local, "prepared", None)
+        if cache is None:
+            cache = self._local.prepared = OrderedDict()
+        q = cache.get(text)
+        if q is not None:
+            cache.move_to_end(text)
+            return q
+        try:
+            q = prepareQuery(text)
+        except Exception as e:
+            raise ValueError(f"Malformed query: {e}") from e
+        _check_local(q.algebra)
+        cache[text] = q
+        while len(cache) > self.max_prepared:
+            cache.popitem(last=False)
+        return q
+
+    def query(self, text: str, survey: dict | None = None,
+              graph_format: str = TURTLE,
+              timeout_s: float | None = None) -> tuple[bytes, str]:
+        """Run a query; returns (body, content type).
+
+        Raises QueryTimeout, or ValueError for unparsable, non-local or
+        failing queries.
+        """
+        key, g = self.graph(survey)
+        cache_key = (key, text, graph_format)
+        hit = self._results.get(cache_key)
+        CACHE_REQUESTS.inc("sparql_result", "miss" if hit is None else "hit")
+        if hit is not None:
+            return hit
+
+        prepared = self._prepared(text)
+
+        deadline = time.monotonic() + (timeout_s or self.timeout_s)
+        try:
+            result = _DeadlineGraph(g, deadline).query(prepared)
+            if result.type in ("SELECT", "ASK"):
+                out = (result.serialize(format="json"), RESULTS_JSON)
+            else:
+                fmt = "nt" if graph_format == NTRIPLES else "turtle"
+                out = (result.serialize(format=fmt), graph_format)
+        except QueryTimeout:
+            raise
+        except Exception as e:
+            raise ValueError(f"Query failed: {e}") from e
+        self._results.put(cache_key, out)
+        return out
@@ -0,0 +1,94 @@
+"""sparql_pool.py — Warm process pool for pipeline stages 2-3.
+
+rdflib query evaluation is pure Python and CPU-bound, so running the
+SPARQL stage in threads makes concurrent requests contend for the GIL.
+This pool runs JSON → RDF conversion and the CQ queries in separate
+processes.  Each worker loads the TBox, regulatory config and prepared
+queries once at spawn time (ficr_sparql_runner.QueryContext) and is
+recycled after a fixed number of jobs to bound memory growth.
+
+Usage:
+    pool = SparqlPool(workers=4, max_tasks_per_child=200)
+    out = await pool.run(survey)   # {"triple_count", "sparql_results", ...}
+"""
+
+import sys
+import time
+import asyncio
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import ficr_json_to_rdf
+import ficr_sparql_runner
+from artifact_store import graph_digest
+
+# Per-process state, set by _init_worker in each pool worker.
+_context: ficr_sparql_runner.QueryContext | None = None
+
+
+def _init_worker(tbox_path: str, reg_path: str, sparql_path: str):
+    global _context
+    _context = ficr_sparql_runner.QueryContext(tbox_path, reg_path, sparql_path)
+
+
+def _ping() -> bool:
+    return _context is not None
+
+
+def _convert_and_query(survey: dict) -> dict:
+    """Stages 2-3 inside a worker. Errors are returned, tagged by stage."""
+    timings = {}
+    try:
+        t0 = time.perf_counter()
+        g = ficr_json_to_rdf.convert(survey)
+        timings["rdf"] = time.perf_counter() - t0
+    except Exception as e:
+        return {"error": {"stage": "rdf",
+                          "message": f"{e}\n{traceback.format_exc()}"}}
+    try:
+        t0 = time.perf_counter()
+        sparql_results = _context.run(g)
+        timings["sparql"] = time.perf_counter() - t0
+        digest = graph_digest(g)
+    except Exception as e:
+        return {"error": {"stage": "sparql",
+                          "message": f"{e}\n{traceback.format_exc()}"}}
+    return {
+        "triple_count": len(g),
+        "abox_digest": digest,
+        "sparql_results": sparql_results,
+        "timings": timings,
+    }
+
+
+class SparqlPool:
+    """Process pool whose workers hold a preloaded QueryContext."""
+
+    def __init__(self, tbox_path: str, reg_path: str, sparql_path: str,
+                 workers: int | None = None,
+                 max_tasks_per_child: int | None = 200):
+        self.workers = workers or multiprocessing.cpu_count()
+        kwargs = {
+            "max_workers": self.workers,
+            # spawn: workers must not inherit the server's event loop/threads
+            "mp_context": multiprocessing.get_context("spawn"),
+            "initializer": _init_worker,
+            "initargs": (str(tbox_path), str(reg_path), str(sparql_path)),
+        }
+        if max_tasks_per_child and sys.version_info >= (3, 11):
+            kwargs["max_tasks_per_child"] = max_tasks_per_child
+        self._executor = ProcessPoolExecutor(**kwargs)
+
+    def warmup(self):
+        """Start every worker now instead of on the first requests."""
+        futures = [self._executor.submit(_ping) for _ in range(self.workers)]
+        return all(f.result() for f in futures)
+
+    async def run(self, survey: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, _convert_and_query, survey)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,153 @@
+"""stage_graph.py — Run pipeline stages as a small dependency graph.
+
+The pipeline stages form a chain (LLM#1 → convert → SPARQL → LLM#2), but
+much of what they need does not depend on the chain: loading the
+ontology, preparing the SPARQL queries, importing a provider SDK and
+opening its connection.  StageGraph starts every task as soon as the
+tasks it depends on have finished, so that preparation overlaps stage 1
+instead of waiting behind it, and records when each task ran so the
+critical path of the run can be reported.
+
+A task's function receives the results of its dependencies, in order.
+Optional tasks (preparation) may fail: their result is None and the
+dependent stage does the work itself.  Any other failure stops the run
+and is re-raised once the tasks already running have finished.
+
+Usage:
+    graph = StageGraph()
+    graph.add("ontology", get_query_context, optional=True)
+    graph.add("llm1", lambda: stage_llm1(llm, text, schema))
+    graph.add("convert", stage_convert, after=["llm1"])
+    graph.add("sparql", lambda abox, _: stage_sparql(abox),
+              after=["convert", "ontology"])
+    results = graph.run()
+    print(graph.summary())
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable
+
+
+class Task:
+    """One node of the graph, with its timings once it has run."""
+
+    def __init__(self, name: str, fn: Callable, after: tuple[str, ...] = (),
+                 optional: bool = False):
+        self.name = name
+        self.fn = fn
+        self.after = after
+        self.optional = optional
+        self.start: float | None = None     # seconds since the run started
+        self.end: float | None = None
+        self.error: Exception | None = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.end or 0.0) - (self.start or 0.0)
+
+
+class StageGraph:
+    """Tasks with dependencies, run on a thread pool as soon as ready."""
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers
+        self.tasks: dict[str, Task] = {}
+        self.wall_s = 0.0
+
+    def add(self, name: str, fn: Callable, after=(), optional: bool = False):
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        missing = [d for d in after if d not in self.tasks]
+        if missing:     # adding in dependency order also rules out cycles
+            raise ValueError(f"Task {name!r} depends on unknown {missing}")
+        self.tasks[name] = Task(name, fn, tuple(after), optional)
+
+    def run(self) -> dict[str, object]:
+        """Run every task; {name: result}."""
+        results: dict[str, object] = {}
+        waiting = dict(self.tasks)
+        running = {}
+        failure = None
+        t0 = time.perf_counter()
+
+        def call(task: Task, args: list):
+            task.start = time.perf_counter() - t0
+            try:
+                return task.fn(*args)
+            finally:
+                task.end = time.perf_counter() - t0
+
+        workers = self.max_workers or max(len(self.tasks), 1)
+        pool = ThreadPoolExecutor(max_workers=workers,
+                                  thread_name_prefix="stage")
+        try:
+            while waiting or running:
+                if failure is None:
+                    for name, task in list(waiting.items()):
+                        if all(d in results for d in task.after):
+                            del waiting[name]
+                            args = [results[d] for d in task.after]
+                            running[pool.submit(call, task, args)] = task
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        results[task.name] = future.result()
+                    except Exception as e:
+                        task.error = e
+                        if task.optional:
+                            print(f"  [schedule] {task.name} failed, "
+                                  f"continuing without it: {e}")
+                            results[task.name] = None
+                        elif failure is None:
+                            failure = e
+        finally:
+            pool.shutdown(wait=True)
+            self.wall_s = time.perf_counter() - t0
+        if failure is not None:
+            raise failure
+        return results
+
+    def critical_path(self) -> list[Task]:
+        """The chain of tasks that set the run's wall time.
+
+        Walks back from the task that finished last, each time through
+        the dependency that finished last.
+        """
+        ran = [t for t in self.tasks.values() if t.end is not None]
+        if not ran:
+            return []
+        task = max(ran, key=lambda t: t.end)
+        path = [task]
+        while task.after:
+            task = max((self.tasks[d] for d in task.after),
+                       key=lambda t: t.end or 0.0)
+            path.append(task)
+        return path[::-1]
+
+    def timings(self) -> dict:
+        """JSON-friendly schedule: wall time, critical path, per-task times."""
+        return {
+            "wall_s": round(self.wall_s, 3),
+            "critical_path": [t.name for t in self.critical_path()],
+            "tasks": {t.name: {"start_s": round(t.start, 3),
+                               "seconds": round(t.seconds, 3)}
+                      for t in self.tasks.values() if t.start is not None},
+        }
+
+    def summary(self) -> str:
+        """Critical path and the work that overlapped it, for the log."""
+        path = self.critical_path()
+        on_path = {t.name for t in path}
+        lines = ["  [schedule] critical path: "
+                 + " → ".join(f"{t.name} {t.seconds:.2f}s" for t in path)
+                 + f" ({self.wall_s:.2f}s wall)"]
+        hidden = [t for t in self.tasks.values()
+                  if t.name not in on_path and t.end is not None]
+        if hidden:
+            lines.append("  [schedule] overlapped: " + ", ".join(
+                f"{t.name} {t.seconds:.2f}s" for t in hidden))
+        return "\n".join(lines)
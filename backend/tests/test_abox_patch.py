@@ -0,0 +1,161 @@
+"""test_abox_patch.py — Incremental ABox patches must equal a full rebuild."""
+
+import json
+import copy
+import sys
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ficr_json_to_rdf import convert
+from ficr_abox_patch import (
+    apply_json_patch, patch_scope, diff_surveys, apply_delta,
+)
+
+
+def load_json(path):
+    with open(ROOT / path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check(label, old, new, scope=None):
+    """Patch convert(old) towards new and compare with convert(new)."""
+    added, removed = diff_surveys(old, new, scope)
+    patched = apply_delta(convert(old), added, removed)
+    expected = convert(new)
+    ok = set(patched) == set(expected)
+    icon = "PASS" if ok else "FAIL"
+    detail = f"  (+{len(added)}/-{len(removed)})"
+    if not ok:
+        detail += (f"  missing {len(set(expected) - set(patched))}, "
+                   f"extra {len(set(patched) - set(expected))}")
+    print(f"  [{icon}] {label}{detail}")
+    return ok
+
+
+def main():
+    survey = load_json("references/duplex_a_survey.json")
+
+    passed = 0
+    failed = 0
+
+    def run(label, new, scope=None):
+        nonlocal passed, failed
+        if check(label, survey, new, scope):
+            passed += 1
+        else:
+            failed += 1
+
+    print("\n=== SURVEY DIFFS ===")
+
+    run("No change", copy.deepcopy(survey))
+
+    d = copy.deepcopy(survey)
+    for e in d["elements"]:
+        if e["type"] == "ficr:Wall":
+            e["rei"] = 120
+            break
+    run("Wall REI changed", d)
+
+    d = copy.deepcopy(survey)
+    d["elements"].pop()
+    run("Element removed", d)
+
+    d = copy.deepcopy(survey)
+    d["storeys"][2]["elevation_m"] = 3.5
+    run("Storey elevation changed (storey height / order)", d)
+
+    d = copy.deepcopy(survey)
+    d["storeys"].append({"id": "S-L3", "label": "Level 3",
+                         "type": "ficr:GroundAndAboveStorey",
+                         "elevation_m": 9.0, "building_ref": "BLD-DA"})
+    run("Storey added", d)
+
+    d = copy.deepcopy(survey)
+    d["building"]["id"] = "BLD-X"
+    run("Building id changed", d)
+
+    d = copy.deepcopy(survey)
+    doors = [r for r in d["spaces"][0]["adjacent_elements"] if r.startswith("D-")]
+    d["spaces"][0]["adjacent_elements"] = [
+        r for r in d["spaces"][0]["adjacent_elements"] if r != doors[0]]
+    run("Doorset detached from space (adjacentZone)", d)
+
+    d = copy.deepcopy(survey)
+    d["spaces"][1]["adjacent_elements"].append(doors[0])
+    run("Doorset attached to another space (adjacentZone)", d)
+
+    d = copy.deepcopy(survey)
+    d["spaces"].pop(0)
+    run("Space removed", d)
+
+    d = copy.deepcopy(survey)
+    d["boundary_assumptions"][0]["condition_state"] = "ficr:Effective"
+    d["boundary_assumptions"][0]["supported_by_evidence"] = ["EV-002"]
+    run("Boundary assumption updated", d)
+
+    d = copy.deepcopy(survey)
+    d["meta"]["project_slug"] = "duplex_b"
+    run("Project slug changed (full rebuild)", d)
+
+    print("\n=== JSON PATCHES ===")
+
+    ops = [{"op": "replace", "path": "/spaces/0/area_m2", "value": 20.5},
+           {"op": "add", "path": "/spaces/0/adjacent_elements/-",
+            "value": "D-010"}]
+    run("replace + append", apply_json_patch(survey, ops), patch_scope(ops))
+
+    ops = [{"op": "remove", "path": "/elements/3"},
+           {"op": "move", "from": "/evidence_log/0", "path": "/evidence_log/-"}]
+    run("remove + move", apply_json_patch(survey, ops), patch_scope(ops))
+
+    ops = [{"op": "test", "path": "/meta/project_slug", "value": "duplex_a"},
+           {"op": "copy", "from": "/risk_units/0/covers_spaces",
+            "path": "/risk_units/1/covers_spaces"}]
+    run("test + copy", apply_json_patch(survey, ops), patch_scope(ops))
+
+    before = copy.deepcopy(survey)
+    apply_json_patch(survey, [{"op": "replace", "path": "/storeys/0/label",
+                               "value": "Foundation"}])
+    ok = survey == before
+    print(f"  [{'PASS' if ok else 'FAIL'}] Input document left untouched")
+    passed, failed = passed + ok, failed + (not ok)
+
+    try:
+        apply_json_patch(survey, [{"op": "test", "path": "/meta/project_slug",
+                                   "value": "other"}])
+        ok = False
+    except ValueError:
+        ok = True
+    print(f"  [{'PASS' if ok else 'FAIL'}] Failing 'test' op rejected")
+    passed, failed = passed + ok, failed + (not ok)
+
+    bad = 0
+    for op in ("replace", {"op": "add", "path": "/meta/project_slug/x",
+                           "value": 1},
+               {"op": "replace", "path": "/spaces/0"},
+               {"op": "move", "path": "/meta/x"}):
+        try:
+            apply_json_patch(survey, [op])
+        except ValueError:
+            bad += 1
+    ok = bad == 4
+    print(f"  [{'PASS' if ok else 'FAIL'}] Malformed ops raise ValueError")
+    passed, failed = passed + ok, failed + (not ok)
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
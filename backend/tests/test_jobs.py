@@ -0,0 +1,119 @@
+"""test_jobs.py — Background job queue: bounded queue, 429, event replay."""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from jobs import JobManager, QueueFull
+
+
+async def events(n, gate=None, fail=False):
+    """Scripted job: *n* progress events, optionally waiting on *gate*."""
+    for i in range(n):
+        if gate is not None:
+            await gate.wait()
+        yield "progress", {"step": i}
+    if fail:
+        raise RuntimeError("stage blew up")
+    yield "done", {}
+
+
+async def collect(job, last_event_id=0):
+    return [e async for e in job.stream(last_event_id)]
+
+
+async def scenarios(report):
+    # ── Bounded queue ─────────────────────────────────────────────
+    gate = asyncio.Event()
+    manager = JobManager(workers=1, max_queued=1)
+    running = manager.submit(lambda: events(2, gate))
+    await asyncio.sleep(0.01)               # worker picks the first job up
+    queued = manager.submit(lambda: events(1))
+    try:
+        manager.submit(lambda: events(1))
+        ok = False
+    except QueueFull:
+        ok = True
+    report("Submit beyond max_queued raises QueueFull",
+           ok and running.status == "running" and queued.status == "queued"
+           and manager.queue_depth == 1)
+
+    # ── Replay ────────────────────────────────────────────────────
+    live = asyncio.ensure_future(collect(running))
+    gate.set()
+    got = await asyncio.wait_for(live, 1)
+    report("Live subscriber receives every event in order",
+           [(i, e) for i, e, _ in got]
+           == [(1, "progress"), (2, "progress"), (3, "done")]
+           and running.status == "done")
+    replay = await collect(running, last_event_id=1)
+    report("Reconnect replays only events after Last-Event-ID",
+           [i for i, _, _ in replay] == [2, 3])
+    await asyncio.wait_for(collect(queued), 1)
+    report("Queued job runs once the worker is free",
+           queued.status == "done" and manager.queue_depth == 0)
+
+    failing = manager.submit(lambda: events(1, fail=True))
+    got = await asyncio.wait_for(collect(failing), 1)
+    report("Exception in a job ends it as failed with an error event",
+           failing.status == "failed" and got[-1][1] == "error"
+           and got[-1][2]["message"] == "stage blew up")
+
+    # ── Retention ─────────────────────────────────────────────────
+    manager = JobManager(workers=1, max_queued=4, max_retained=2)
+    jobs = []
+    for _ in range(3):
+        jobs.append(manager.submit(lambda: events(0)))
+        await asyncio.wait_for(collect(jobs[-1]), 1)
+    manager.submit(lambda: events(0))
+    report("Oldest finished jobs evicted beyond max_retained",
+           manager.get(jobs[0].id) is None
+           and manager.get(jobs[2].id) is not None)
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    asyncio.run(scenarios(report))
+
+    # ── /jobs endpoint ────────────────────────────────────────────
+    from fastapi.testclient import TestClient
+    import server
+
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    server.JOBS = JobManager(workers=0, max_queued=1)     # nothing drains it
+    with TestClient(server.app) as client:     # one event loop for both
+        first = client.post("/jobs", json={"survey": survey})
+        second = client.post("/jobs", json={"survey": survey})
+    report("POST /jobs queues, then answers 429 with Retry-After when full",
+           first.status_code == 202 and first.json()["status"] == "queued"
+           and second.status_code == 429
+           and second.headers.get("retry-after")
+           == str(server.JOB_RETRY_AFTER_S))
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""test_llm_hedge.py — Hedged LLM calls against scripted mock providers."""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from llm_hedge import HedgedLLM, hedged_stream, parse_backup
+
+
+class ScriptedLLM:
+    """Mock provider: waits *ttft* s, then streams *chunks* every *gap* s."""
+
+    def __init__(self, name, ttft, chunks=("a", "b", "c"), gap=0.01,
+                 fail=None):
+        self.provider, self.model = name, "mock"
+        self.ttft, self.chunks, self.gap, self.fail = ttft, chunks, gap, fail
+        self.started = self.closed = False
+
+    def stream(self, system, user):
+        self.started = True
+        try:
+            time.sleep(self.ttft)
+            if self.fail:
+                raise RuntimeError(self.fail)
+            for c in self.chunks:
+                yield f"{self.provider}:{c}"
+                time.sleep(self.gap)
+        finally:
+            self.closed = True
+
+    async def astream(self):
+        self.started = True
+        try:
+            await asyncio.sleep(self.ttft)
+            if self.fail:
+                raise RuntimeError(self.fail)
+            for c in self.chunks:
+                yield f"{self.provider}:{c}"
+                await asyncio.sleep(self.gap)
+        finally:
+            self.closed = True
+
+
+def run_sync(primary, backup, delay):
+    t0 = time.perf_counter()
+    text = HedgedLLM(primary, [backup], delay).chat("sys", "user")
+    return text, time.perf_counter() - t0
+
+
+def run_async(primary, backup, delay):
+    async def go():
+        winners = []
+        t0 = time.perf_counter()
+        parts = [c async for c in hedged_stream(
+            [(primary.provider, primary.astream),
+             (backup.provider, backup.astream)],
+            delay, winners.append)]
+        return "".join(parts), time.perf_counter() - t0, winners
+    return asyncio.run(go())
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    # ── Sync (CLI stages 1 and 4) ─────────────────────────────────
+    p, b = ScriptedLLM("p", 0.05), ScriptedLLM("b", 0.05)
+    text, dt = run_sync(p, b, 0.5)
+    report("Fast primary: no hedge fired",
+           text == "p:ap:bp:c" and not b.started, f"  ({dt:.2f}s)")
+
+    p, b = ScriptedLLM("p", 2.0), ScriptedLLM("b", 0.1)
+    text, dt = run_sync(p, b, 0.2)
+    report("Slow primary: backup wins after the hedge delay",
+           text == "b:ab:bb:c" and dt < 1.0, f"  ({dt:.2f}s)")
+
+    p, b = ScriptedLLM("p", 0.3), ScriptedLLM("b", 1.0)
+    text, dt = run_sync(p, b, 0.1)
+    report("Hedge fired but primary still first",
+           text == "p:ap:bp:c" and b.started and dt < 0.9, f"  ({dt:.2f}s)")
+
+    p, b = ScriptedLLM("p", 0.05, fail="429"), ScriptedLLM("b", 0.05)
+    text, dt = run_sync(p, b, 5.0)
+    report("Primary error starts the backup at once",
+           text == "b:ab:bb:c" and dt < 1.0, f"  ({dt:.2f}s)")
+
+    p, b = ScriptedLLM("p", 0.05, fail="down"), ScriptedLLM("b", 0.05, fail="down")
+    try:
+        run_sync(p, b, 0.1)
+        ok = False
+    except RuntimeError:
+        ok = True
+    report("All candidates failing raises", ok)
+
+    # ── Async (server stage 4) ────────────────────────────────────
+    p, b = ScriptedLLM("p", 2.0), ScriptedLLM("b", 0.1)
+    text, dt, winners = run_async(p, b, 0.2)
+    report("Async: backup wins, primary cancelled",
+           text == "b:ab:bb:c" and winners == ["b"] and p.closed and dt < 1.0,
+           f"  ({dt:.2f}s)")
+
+    p, b = ScriptedLLM("p", 0.05), ScriptedLLM("b", 0.05)
+    text, dt, winners = run_async(p, b, 0.5)
+    report("Async: fast primary, backup never started",
+           text == "p:ap:bp:c" and not b.started, f"  ({dt:.2f}s)")
+
+    p, b = ScriptedLLM("p", 0.05, fail="500"), ScriptedLLM("b", 0.05)
+    text, dt, winners = run_async(p, b, 5.0)
+    report("Async: primary error falls over to backup",
+           winners == ["b"] and dt < 1.0, f"  ({dt:.2f}s)")
+
+    report("Backup spec parsed",
+           parse_backup("OpenAI:gpt-4o-mini") == ("openai", "gpt-4o-mini"))
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
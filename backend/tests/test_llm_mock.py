@@ -0,0 +1,139 @@
+"""test_llm_mock.py — Record/replay mock provider and an offline pipeline run."""
+
+import sys
+import json
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from llm_mock import Cassette, MockProvider, MockMiss, record_stream
+from pipeline import (LLMAdapter, REPORT_SYSTEM_PROMPT, load_system_prompt,
+                      run_pipeline)
+
+
+def timed_stream(chunks):
+    """(seconds to first chunk, total seconds, text) of a chunk iterator."""
+    t0 = time.monotonic()
+    first, parts = None, []
+    for c in chunks:
+        if first is None:
+            first = time.monotonic() - t0
+        parts.append(c)
+    return first, time.monotonic() - t0, "".join(parts)
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    tmp = Path(tempfile.mkdtemp())
+    text = "x" * 2000                  # 500 tokens
+
+    # ── Cassettes ─────────────────────────────────────────────────
+    path = tmp / "unit.jsonl"
+    cassette = Cassette(path)
+    cassette.record("sys", "u1", "one", "claude", "m", 0.5, 1.0)
+    cassette.record("sys", "u2", "two", "claude", "m", 0.5, 1.0)
+    cassette.record("pace", "u", text, "claude", "m", 0.2, 0.7)
+    reloaded = Cassette(path)
+    report("Recordings survive a reload",
+           reloaded.lookup("sys", "u2")["text"] == "two"
+           and len(reloaded.entries) == 3)
+
+    fallback = {reloaded.lookup("sys", f"other {i}")["text"] for i in range(20)}
+    report("Unknown prompt falls back to a recording of its system prompt",
+           fallback <= {"one", "two"}
+           and reloaded.lookup("sys", "other 3") is reloaded.lookup("sys", "other 3"))
+
+    try:
+        reloaded.lookup("unknown system", "u1")
+        ok = False
+    except MockMiss:
+        ok = True
+    report("Unknown system prompt raises MockMiss", ok)
+
+    # ── Pacing ────────────────────────────────────────────────────
+    first, total, out = timed_stream(
+        MockProvider(reloaded, ttft_s=0.1, tokens_per_s=1000).stream("pace", "u"))
+    report("Configured TTFT and token rate",
+           out == text and 0.1 <= first < 0.15 and 0.55 < total < 0.7,
+           f"  (first {first:.2f}s, total {total:.2f}s)")
+
+    first, total, out = timed_stream(MockProvider(reloaded).stream("pace", "u"))
+    report("Recorded timings replayed by default",
+           0.2 <= first < 0.25 and 0.65 < total < 0.8,
+           f"  (first {first:.2f}s, total {total:.2f}s)")
+
+    first, total, out = timed_stream(
+        MockProvider(reloaded, ttft_s=0, tokens_per_s=0).stream("pace", "u"))
+    report("Zero pacing replays instantly", out == text and total < 0.02)
+
+    async def astream():
+        t0 = time.monotonic()
+        parts = [c async for c in MockProvider(
+            reloaded, ttft_s=0.1, tokens_per_s=2000).astream("pace", "u")]
+        return "".join(parts), time.monotonic() - t0
+    out, total = asyncio.run(astream())
+    report("Async replay paced the same way",
+           out == text and 0.3 < total < 0.45, f"  ({total:.2f}s)")
+
+    # ── Recording ─────────────────────────────────────────────────
+    def live():
+        time.sleep(0.05)
+        yield "hello "
+        yield "world"
+    rec = Cassette(tmp / "rec.jsonl")
+    out = "".join(record_stream(rec, "openai", "gpt", "s", "u", live()))
+    entry = Cassette(tmp / "rec.jsonl").lookup("s", "u")
+    report("Streamed session recorded with its timings",
+           out == entry["text"] == "hello world" and entry["ttft_s"] >= 0.05
+           and entry["provider"] == "openai")
+
+    # ── Offline end-to-end pipeline run ───────────────────────────
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    description = "A two-storey duplex with a shared party wall."
+    e2e = Cassette(tmp / "e2e.jsonl")
+    e2e.record(load_system_prompt(), description,
+               "```json\n" + json.dumps(survey) + "\n```",
+               "claude", "recorded", 0.0, 0.0)
+    e2e.record(REPORT_SYSTEM_PROMPT, "(results of another survey)",
+               "# Fire risk report\n\nReplayed.", "claude", "recorded",
+               0.0, 0.0)
+    llm = LLMAdapter(provider="mock", model=str(tmp / "e2e.jsonl"))
+    report("LLMAdapter chat() replays through the mock provider",
+           llm.chat(REPORT_SYSTEM_PROMPT, "x").startswith("# Fire risk"))
+    t0 = time.monotonic()
+    result = run_pipeline(description, provider="mock",
+                          model=str(tmp / "e2e.jsonl"),
+                          report_sections=False, report_mode="llm")
+    dt = time.monotonic() - t0
+    report("run_pipeline end to end with no network",
+           result["survey"] == survey
+           and result["report"].startswith("# Fire risk report")
+           and len(result["sparql_results"]) > 0, f"  ({dt:.2f}s)")
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
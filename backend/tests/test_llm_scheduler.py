@@ -0,0 +1,210 @@
+"""test_llm_scheduler.py — Rate limiting, fair queueing and retries."""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from llm_scheduler import LLMScheduler, parse_limits, retryable, QUEUE_WAIT
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class APIStatusError(Exception):
+    """Shaped like the anthropic / openai SDK status errors."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        headers = {"retry-after": str(retry_after)} if retry_after else {}
+        self.response = Response(status, headers)
+        self.status_code = status
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class Flaky:
+    """Fails with the scripted errors, then returns / streams "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = []
+
+    def __call__(self):
+        self.calls.append(time.monotonic())
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+    def stream(self, fail_after_first=False):
+        def gen():
+            self()
+            yield "o"
+            if fail_after_first:
+                raise APIStatusError(500)
+            yield "k"
+        return gen()
+
+    async def astream(self):
+        self()
+        yield "o"
+        await asyncio.sleep(0)
+        yield "k"
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    fast = dict(backoff_s=0.05, backoff_max_s=0.2)
+
+    # ── Budgets and fair queueing ─────────────────────────────────
+    sched = LLMScheduler({"p": (600, 0)}, burst_s=0.1, **fast)  # 10 req/s, burst 1
+    starts = {}
+
+    def worker(i):
+        sched.acquire("p", 10)
+        starts[i] = time.monotonic()
+
+    t0 = time.monotonic()
+    threads = []
+    for i in range(5):
+        threads.append(threading.Thread(target=worker, args=(i,)))
+        threads[-1].start()
+        time.sleep(0.005)       # fix the arrival order
+    for t in threads:
+        t.join()
+    order = sorted(starts, key=starts.get)
+    span = max(starts.values()) - t0
+    report("Request budget spaces calls, first come first served",
+           order == [0, 1, 2, 3, 4] and 0.35 < span < 0.6,
+           f"  ({span:.2f}s for 5 calls at 10/s)")
+
+    sched = LLMScheduler({"p": (0, 6000)}, burst_s=1.0, **fast)  # 100 tok/s
+    t0 = time.monotonic()
+    for _ in range(3):
+        sched.acquire("p", 50)
+    dt = time.monotonic() - t0
+    report("Token budget delays calls past the burst",
+           0.4 < dt < 0.7, f"  ({dt:.2f}s for 150 tokens, burst 100)")
+
+    sched.charge("p", 100)          # output tokens counted after the call
+    wait = sched.acquire("p", 1)
+    report("Output tokens charged after a call consume budget",
+           wait > 0.5, f"  (next call waited {wait:.2f}s)")
+
+    sched = LLMScheduler({}, **fast)
+    t0 = time.monotonic()
+    for _ in range(20):
+        sched.acquire("free", 10_000)
+    report("Unlisted provider is not throttled",
+           time.monotonic() - t0 < 0.05)
+
+    # ── Retries ───────────────────────────────────────────────────
+    fn = Flaky(APIStatusError(429, retry_after=0.2), APIStatusError(529))
+    t0 = time.monotonic()
+    result = LLMScheduler({}, **fast).call("p", 10, fn)
+    dt = time.monotonic() - t0
+    report("429 honours Retry-After, 529 retried, then succeeds",
+           result == "ok" and len(fn.calls) == 3 and dt >= 0.2,
+           f"  ({len(fn.calls)} attempts, {dt:.2f}s)")
+
+    fn = Flaky(APIStatusError(400))
+    try:
+        LLMScheduler({}, **fast).call("p", 10, fn)
+        ok = False
+    except APIStatusError:
+        ok = len(fn.calls) == 1
+    report("Non-retryable error raised without retry", ok)
+
+    fn = Flaky(*[APIConnectionError("reset")] * 5)
+    try:
+        LLMScheduler({}, retries=2, **fast).call("p", 10, fn)
+        ok = False
+    except APIConnectionError:
+        ok = len(fn.calls) == 3
+    report("Retries are bounded", ok, f"  ({len(fn.calls)} attempts)")
+
+    sched = LLMScheduler({}, **fast)
+    fn = Flaky(APIStatusError(429, retry_after=0.3))
+    other = Flaky()
+    t = threading.Thread(target=sched.call, args=("p", 10, fn))
+    t.start()
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    sched.call("p", 10, other)
+    t.join()
+    report("429 pauses other callers of the provider",
+           time.monotonic() - t0 >= 0.2)
+
+    # ── Streams ───────────────────────────────────────────────────
+    fn = Flaky(APIStatusError(503))
+    text = "".join(LLMScheduler({}, **fast).stream("p", 10, fn.stream))
+    report("Stream retried before its first chunk",
+           text == "ok" and len(fn.calls) == 2)
+
+    fn = Flaky()
+    chunks = []
+    try:
+        for c in LLMScheduler({}, **fast).stream(
+                "p", 10, lambda: fn.stream(fail_after_first=True)):
+            chunks.append(c)
+        ok = False
+    except APIStatusError:
+        ok = chunks == ["o"] and len(fn.calls) == 1
+    report("Stream not retried after output started", ok)
+
+    async def concurrent():
+        sched = LLMScheduler({"a": (1200, 0)}, burst_s=0.05, **fast)  # 20/s
+
+        async def one():
+            return "".join([c async for c in sched.astream(
+                "a", 10, Flaky().astream)])
+        before = QUEUE_WAIT.count("a")
+        t0 = time.monotonic()
+        texts = await asyncio.gather(*(one() for _ in range(4)))
+        return texts, time.monotonic() - t0, QUEUE_WAIT.count("a") - before
+
+    texts, dt, waits = asyncio.run(concurrent())
+    report("Async streams queue for budget and record queue wait",
+           texts == ["ok"] * 4 and 0.1 < dt < 0.4 and waits == 4,
+           f"  ({dt:.2f}s)")
+
+    # ── Helpers ───────────────────────────────────────────────────
+    report("Limits parsed",
+           parse_limits("Claude=50/40000, openai=500") ==
+           {"claude": (50.0, 40000.0), "openai": (500.0, 0.0)})
+    report("Retryable classification",
+           retryable(APIStatusError(429)) and retryable(ConnectionResetError())
+           and not retryable(APIStatusError(401))
+           and not retryable(ValueError("bad json")))
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""test_report_cache.py — Report cache: keys, TTL expiry, LRU size eviction."""
+
+import sys
+import copy
+import time
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from report_cache import ReportCache, report_key, replay_chunks
+
+RESULTS = {
+    "meta": {"total_triples": 10, "query_count": 1, "probes_failed": [],
+             "abox": "/tmp/a.ttl"},
+    "probes": {},
+    "results": {"Q1": {"rows": [{"x": 1}]}},
+}
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    # ── Keys ──────────────────────────────────────────────────────
+    key = report_key(RESULTS, "sys", "claude", "m")
+    moved = copy.deepcopy(RESULTS)
+    moved["meta"]["abox"] = "/elsewhere/b.ttl"
+    other_rows = copy.deepcopy(RESULTS)
+    other_rows["results"]["Q1"]["rows"][0]["x"] = 2
+    report("Key ignores file paths, not results, prompt or model",
+           report_key(moved, "sys", "claude", "m") == key
+           and len({key, report_key(other_rows, "sys", "claude", "m"),
+                    report_key(RESULTS, "sys2", "claude", "m"),
+                    report_key(RESULTS, "sys", "openai", "m"),
+                    report_key(RESULTS, "sys", "claude", "m2"),
+                    report_key(RESULTS, "sys", "claude", "m", "json")}) == 6)
+
+    report("Replay chunks rebuild the text",
+           "".join(replay_chunks("x" * 150, 64)) == "x" * 150
+           and len(list(replay_chunks("x" * 150, 64))) == 3)
+
+    # ── TTL ───────────────────────────────────────────────────────
+    cache = ReportCache(max_bytes=1000, ttl_s=0.2)
+    cache.put("a", "report a")
+    hit = cache.get("a")
+    time.sleep(0.25)
+    report("Entries expire after the TTL and free their bytes",
+           hit == "report a" and cache.get("a") is None
+           and len(cache) == 0 and cache.total_bytes == 0)
+
+    # ── Size budget ───────────────────────────────────────────────
+    cache = ReportCache(max_bytes=30, ttl_s=60)
+    cache.put("a", "a" * 10)
+    cache.put("b", "b" * 10)
+    cache.put("c", "c" * 10)
+    cache.get("a")                          # a is now most recently used
+    cache.put("d", "d" * 10)
+    report("Least recently used entry evicted over the byte budget",
+           cache.get("b") is None and cache.get("a") == "a" * 10
+           and cache.total_bytes == 30)
+
+    cache.put("a", "é" * 10)                # 20 bytes in UTF-8
+    report("Replacing a key recounts its UTF-8 size",
+           cache.get("a") == "é" * 10 and cache.total_bytes <= 30
+           and len(cache) == 2)
+
+    cache.put("huge", "x" * 31)
+    report("Report larger than the budget is not cached",
+           cache.get("huge") is None and cache.get("a") is not None)
+
+    cache.clear()
+    report("clear() empties the cache",
+           len(cache) == 0 and cache.total_bytes == 0)
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
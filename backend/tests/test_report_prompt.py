@@ -0,0 +1,101 @@
+"""test_report_prompt.py — Compact SPARQL results formatting for LLM#2."""
+
+import sys
+import json
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import ficr_json_to_rdf
+from ficr_report_prompt import (estimate_tokens, format_results, report_input,
+                                token_stats)
+from pipeline import get_query_context
+
+RESULTS = {
+    "meta": {"total_triples": 1234, "query_count": 3,
+             "probes_failed": ["Q2"]},
+    "probes": {"Q1": {"pass": True}, "Q2": {"pass": False}},
+    "results": {
+        "Q1": {"title": "Spaces", "row_count": 2,
+               "columns": ["space", "area", "sprinklered", "note"],
+               "rows": [{"space": "S-1", "area": 12.5, "sprinklered": True,
+                         "note": "two\tfields\nand lines"},
+                        {"space": "S-2", "area": 3, "sprinklered": False}]},
+        "Q2": {"title": "Doors", "row_count": 0, "columns": ["door"],
+               "rows": []},
+        "Q3": {"title": "Broken", "row_count": 0, "error": "timeout\nhere"},
+    },
+}
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    text = format_results(RESULTS)
+    lines = text.splitlines()
+
+    # ── Layout ────────────────────────────────────────────────────
+    report("Header states triples, queries and failed probes",
+           lines[0] == "FiCR SPARQL results: 1234 triples, 3 queries."
+           and "Precondition probes failed (data gap, expect empty "
+               "results): Q2" in lines)
+    q1 = lines.index("## Q1 Spaces (2 rows)")
+    report("Query section: header line, then one tab-separated line per row",
+           lines[q1 + 1] == "space\tarea\tsprinklered\tnote"
+           and lines[q1 + 2] == "S-1\t12.5\ttrue\ttwo fields and lines"
+           and lines[q1 + 3] == "S-2\t3\tfalse\t")
+    report("Empty and failed queries flagged, no column line",
+           "## Q2 Doors (0 rows) [probe failed]" in lines
+           and lines[lines.index("## Q2 Doors (0 rows) [probe failed]") + 1] == ""
+           and "error: timeout here" in lines)
+
+    # ── Formats ───────────────────────────────────────────────────
+    report("report_input selects compact or JSON",
+           report_input(RESULTS, "compact") == text
+           and json.loads(report_input(RESULTS, "json")) == RESULTS)
+    try:
+        report_input(RESULTS, "xml")
+        ok = False
+    except ValueError:
+        ok = True
+    report("Unknown format rejected", ok)
+
+    # ── Real results ──────────────────────────────────────────────
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    data = get_query_context().run(ficr_json_to_rdf.convert(survey))
+    compact = format_results(data)
+    rows = sum(len(r.get("rows") or []) for r in data["results"].values())
+    body = [l for l in compact.splitlines()
+            if l and not l.startswith(("## ", "FiCR ", "Each ", "per ",
+                                       "Precondition "))]
+    columns = sum(1 for r in data["results"].values()
+                  if r.get("columns") and r.get("rows"))
+    stats = token_stats(data, compact)
+    report("Every result row kept, far fewer tokens than JSON",
+           len(body) == rows + columns and stats["saved_pct"] > 50
+           and stats["prompt_tokens"] == estimate_tokens(compact),
+           f"  ({stats['prompt_tokens']} vs {stats['json_tokens']} tokens)")
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
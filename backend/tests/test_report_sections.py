@@ -0,0 +1,109 @@
+"""test_report_sections.py — Section prompts and ordered merging of section streams."""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ficr_report_sections import (SECTIONS, SEPARATOR, join_sections,
+                                  ordered_merge, section_messages,
+                                  section_results)
+
+
+async def paced(name, n, delay, log=None, fail_at=None):
+    """*n* chunks "<name><i>", one every *delay* seconds."""
+    try:
+        for i in range(n):
+            await asyncio.sleep(delay)
+            if i == fail_at:
+                raise RuntimeError(f"{name} failed")
+            yield f"{name}{i}"
+    finally:
+        if log is not None:
+            log.append(name)
+
+
+async def timed(stream):
+    t0 = time.monotonic()
+    return [(c, time.monotonic() - t0) async for c in stream]
+
+
+async def scenarios(report):
+    # Section 0 is the slowest; the later ones finish while it streams
+    got = await timed(ordered_merge([paced("a", 3, 0.1),
+                                     paced("b", 3, 0.02),
+                                     paced("c", 1, 0.01)]))
+    text = [c for c, _ in got]
+    report("Chunks come out in stream order with separators",
+           text == ["a0", "a1", "a2", SEPARATOR, "b0", "b1", "b2",
+                    SEPARATOR, "c0"])
+    report("First stream forwarded live, later ones buffered meanwhile",
+           got[0][1] < 0.15 and got[4][1] - got[2][1] < 0.02)
+    report("Streams generated concurrently (total ≈ slowest stream)",
+           got[-1][1] < 0.4, f"  ({got[-1][1]:.2f}s)")
+
+    closed = []
+    try:
+        await timed(ordered_merge([paced("a", 5, 0.1, closed),
+                                   paced("b", 3, 0.01, closed, fail_at=1)]))
+        ok = False
+    except RuntimeError as e:
+        ok = str(e) == "b failed"
+    report("Failure in a later stream surfaces at once, others cancelled",
+           ok and sorted(closed) == ["a", "b"])
+
+    report("No streams: nothing yielded", await timed(ordered_merge([])) == [])
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    asyncio.run(scenarios(report))
+
+    # ── Section inputs ────────────────────────────────────────────
+    results = {
+        "meta": {"total_triples": 10, "query_count": 4,
+                 "probes_failed": ["B1", "C4"]},
+        "probes": {q: {"pass": q not in ("B1", "C4")}
+                   for q in ("A1", "B1", "B2", "C4")},
+        "results": {q: {"title": q, "row_count": 0, "rows": []}
+                    for q in ("A1", "B1", "B2", "C4")},
+    }
+    compliance = section_results(results, SECTIONS[2])
+    report("Section sees only its queries, probes and failures",
+           list(compliance["results"]) == ["B1", "B2"]
+           and compliance["meta"]["query_count"] == 2
+           and compliance["meta"]["probes_failed"] == ["B1"]
+           and list(compliance["probes"]) == ["B1", "B2"])
+    messages = section_messages(results)
+    report("One prompt per section, headed by its heading",
+           [s.number for s, _, _ in messages] == [1, 2, 3, 4, 5, 6]
+           and all(s.heading in system for s, system, _ in messages)
+           and "## C4" in messages[5][2] and "## A1" not in messages[5][2])
+    report("join_sections trims and separates",
+           join_sections(["## 1\n\n", "\n## 2"]) == "## 1" + SEPARATOR + "## 2")
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
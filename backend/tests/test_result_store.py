@@ -0,0 +1,87 @@
+"""test_result_store.py — SQLite run store: lookups, per-thread readers, retention."""
+
+import sys
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from result_store import ResultStore, survey_hash
+
+
+def main():
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    tmp = Path(tempfile.mkdtemp())
+
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    # ── Lookups ───────────────────────────────────────────────────
+    store = ResultStore(tmp / "runs.sqlite3")
+    first = store.save(survey, provider="claude", model="a", report="A")
+    store.save(survey, status="report_failed", provider="claude", model="b")
+    run = store.latest_by_hash(survey_hash(survey))
+    report("Newest complete run by survey hash",
+           run["id"] == first and run["survey"] == survey
+           and run["report"] == "A")
+    report("Filtered lookup misses other models",
+           store.latest_by_hash(survey_hash(survey), model="b") is None
+           and store.latest_by_hash(survey_hash(survey), status=None,
+                                    model="b")["model"] == "b")
+
+    # ── Per-thread readers ────────────────────────────────────────
+    seen = []
+
+    def read():
+        seen.append((store.get(first)["id"], id(store._reader())))
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    report("Each thread reads through its own connection",
+           [s[0] for s in seen] == [first] * 4
+           and len({s[1] for s in seen}) == 4)
+    store.close()
+
+    # ── Retention ─────────────────────────────────────────────────
+    store = ResultStore(tmp / "capped.sqlite3", max_rows=3)
+    ids = [store.save(survey, model=str(i)) for i in range(5)]
+    report("Oldest runs pruned beyond max_rows",
+           [r["id"] for r in store.recent(limit=10)] == ids[:1:-1])
+    store.close()
+
+    store = ResultStore(tmp / "aged.sqlite3", max_age_s=0.2)
+    old = store.save(survey)
+    time.sleep(0.3)
+    new = store.save(survey)
+    report("Runs older than max_age_s pruned on insert",
+           store.get(old) is None and store.get(new) is not None)
+    store.close()
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""test_sample_catalog.py — Sample survey catalog: indexing, ETags, refresh."""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sample_catalog import SampleCatalog
+
+
+def write(path: Path, survey: dict, mtime_ns: int):
+    path.write_text(json.dumps(survey), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def main():
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    tmp = Path(tempfile.mkdtemp())
+
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    # ── Indexing ──────────────────────────────────────────────────
+    write(tmp / "a_survey.json", survey, 1_000_000_000)
+    (tmp / "notes.json").write_text("{}", encoding="utf-8")
+    catalog = SampleCatalog(tmp, poll_s=3600)
+    entry = catalog.get("duplex_a")
+    body, etag = catalog.listing()
+    report("Surveys indexed by slug, other files ignored",
+           len(catalog) == 1 and entry.survey == survey
+           and json.loads(entry.body) == survey
+           and [s["filename"] for s in json.loads(body)] == ["a_survey.json"])
+
+    # ── Refresh ───────────────────────────────────────────────────
+    report("Unchanged directory: refresh is a no-op, entries kept",
+           not catalog.refresh() and catalog.get("duplex_a") is entry)
+
+    other = json.loads(json.dumps(survey))
+    other["meta"]["project_slug"] = "duplex_b"
+    write(tmp / "b_survey.json", other, 1_000_000_000)
+    report("Added file appears only after the poll interval or refresh()",
+           catalog.get("duplex_b") is None
+           and catalog.refresh() and catalog.get("duplex_b") is not None
+           and catalog.get("duplex_a") is entry
+           and catalog.listing()[1] != etag)
+
+    changed = json.loads(json.dumps(survey))
+    changed["meta"]["building_name"] = "Renamed"
+    write(tmp / "a_survey.json", changed, 2_000_000_000)
+    catalog.refresh()
+    new = catalog.get("duplex_a")
+    report("Modified file reloaded with a new ETag",
+           new is not entry and new.survey == changed
+           and new.etag != entry.etag)
+
+    (tmp / "a_survey.json").write_text('{"meta": ', encoding="utf-8")
+    os.utime(tmp / "a_survey.json", ns=(3_000_000_000, 3_000_000_000))
+    catalog.refresh()
+    report("Half-written file keeps the previous version",
+           catalog.get("duplex_a") is new)
+
+    (tmp / "b_survey.json").unlink()
+    report("Removed file dropped",
+           catalog.refresh() and catalog.get("duplex_b") is None)
+
+    polled = SampleCatalog(tmp, poll_s=0)
+    write(tmp / "b_survey.json", other, 4_000_000_000)
+    report("poll_s=0 rescans on every lookup",
+           polled.get("duplex_b") is not None)
+
+    shutil.rmtree(tmp)
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""test_stage_graph.py — Stage dependency graph, critical path, overlapped pipeline."""
+
+import sys
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import llm_mock
+import pipeline
+from pipeline import REPORT_SYSTEM_PROMPT, load_system_prompt, run_pipeline
+from stage_graph import StageGraph
+
+
+def sleeper(seconds, value=None):
+    def fn(*deps):
+        time.sleep(seconds)
+        return value if value is not None else deps
+    return fn
+
+
+def main():
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    # ── Overlapped pipeline run (first: the ontology is not loaded yet) ──
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    description = "A two-storey duplex with a shared party wall."
+    tmp = Path(tempfile.mkdtemp())
+    cassette = llm_mock.Cassette(tmp / "run.jsonl")
+    cassette.record(load_system_prompt(), description, json.dumps(survey),
+                    "claude", "recorded", 0.0, 0.0)
+    cassette.record(REPORT_SYSTEM_PROMPT, "(any results)", "# Report",
+                    "claude", "recorded", 0.0, 0.0)
+    pipeline.MOCK_TTFT_S = "1.5"        # LLM#1 outlasts the ontology load
+    try:
+        result = run_pipeline(description, provider="mock",
+                              model=str(tmp / "run.jsonl"),
+                              report_sections=False, report_mode="llm")
+    finally:
+        pipeline.MOCK_TTFT_S = ""
+    schedule = result["schedule"]
+    tasks = schedule["tasks"]
+    report("Ontology and report client prepared while LLM#1 ran",
+           tasks["ontology"]["start_s"] < 0.1
+           and tasks["report_client"]["start_s"] < 0.1
+           and tasks["ontology"]["start_s"] + tasks["ontology"]["seconds"]
+           < tasks["llm1"]["seconds"],
+           f"  (ontology {tasks['ontology']['seconds']:.2f}s, "
+           f"llm1 {tasks['llm1']['seconds']:.2f}s)")
+    report("Critical path is the stage chain",
+           schedule["critical_path"] == ["llm1", "convert", "sparql", "report"])
+    reference = pipeline.stage_sparql(result["abox_path"],
+                                      tbox_path=str(pipeline.TBOX_PATH))
+    report("Results unchanged by the overlap",
+           result["survey"] == survey and result["report"] == "# Report"
+           and result["sparql_results"]["results"] == reference["results"]
+           and result["sparql_results"]["probes"] == reference["probes"])
+
+    # ── Prepared queries handed to another thread ─────────────────
+    ctx = pipeline.get_query_context()
+    took = []
+
+    def first_use():
+        t0 = time.perf_counter()
+        ctx.queries
+        took.append(time.perf_counter() - t0)
+
+    for target in (ctx.prepare, first_use):
+        worker = threading.Thread(target=target)
+        worker.start()
+        worker.join()
+    report("A thread adopts the prepared query set",
+           took[0] < 0.05, f"  ({took[0] * 1000:.1f} ms)")
+
+    # ── Scheduling ────────────────────────────────────────────────
+    graph = StageGraph()
+    graph.add("a", sleeper(0.3, "A"))
+    graph.add("b", sleeper(0.3, "B"))
+    graph.add("c", lambda a, b: a + b, after=["a", "b"])
+    results = graph.run()
+    report("Independent tasks run concurrently",
+           results["c"] == "AB" and graph.wall_s < 0.5,
+           f"  ({graph.wall_s:.2f}s)")
+    report("Dependent task starts after its dependencies",
+           graph.tasks["c"].start >= max(graph.tasks["a"].end,
+                                         graph.tasks["b"].end))
+
+    graph = StageGraph()
+    graph.add("prep", sleeper(0.1, "P"))
+    graph.add("stage1", sleeper(0.3, "S1"))
+    graph.add("stage2", sleeper(0.1), after=["stage1"])
+    graph.add("stage3", sleeper(0.1), after=["stage2", "prep"])
+    graph.run()
+    summary = graph.summary()
+    report("Critical path through the slowest dependency",
+           [t.name for t in graph.critical_path()]
+           == ["stage1", "stage2", "stage3"]
+           and "overlapped: prep" in summary)
+
+    # ── Failures ──────────────────────────────────────────────────
+    def boom(*_):
+        raise RuntimeError("boom")
+
+    graph = StageGraph()
+    graph.add("prep", boom, optional=True)
+    graph.add("stage", lambda prep: ("ran", prep), after=["prep"])
+    report("Failed optional task yields None, run continues",
+           graph.run()["stage"] == ("ran", None))
+
+    graph = StageGraph()
+    ran = []
+    graph.add("stage1", boom)
+    graph.add("slow", sleeper(0.2, "S"))
+    graph.add("stage2", lambda _: ran.append(True), after=["stage1"])
+    try:
+        graph.run()
+        ok = False
+    except RuntimeError:
+        ok = graph.tasks["slow"].end is not None
+    report("Stage failure stops dependants and is re-raised",
+           ok and not ran)
+
+    try:
+        StageGraph().add("x", boom, after=["missing"])
+        ok = False
+    except ValueError:
+        ok = True
+    report("Unknown dependency rejected", ok)
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""test_survey_repair.py — Local repair must fix mechanical LLM#1 errors."""
+
+import json
+import copy
+import sys
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline import get_validator
+from ficr_survey_repair import repair, match_term, extract_patch
+
+
+def load_json(path):
+    with open(ROOT / path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    survey = load_json("references/duplex_a_survey.json")
+    validator = get_validator()
+
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    def run(label, mutate, expect_valid=True):
+        """Break a copy of the sample with *mutate*, then repair it."""
+        broken = copy.deepcopy(survey)
+        mutate(broken)
+        before = validator.validate(broken)
+        snapshot = copy.deepcopy(broken)
+        fixed, patch = repair(broken, validator)
+        after = validator.validate(fixed)
+        ok = bool(before) and (not after) == expect_valid \
+            and broken == snapshot
+        detail = f"  ({len(before)} → {len(after)} errors, {len(patch)} fixes)"
+        report(label, ok, detail)
+
+    def set_path(*path_and_value):
+        *path, value = path_and_value
+
+        def mutate(doc):
+            node = doc
+            for key in path[:-1]:
+                node = node[key]
+            node[path[-1]] = value
+        return mutate
+
+    first = {kind: next(i for i, e in enumerate(survey["elements"])
+                        if e["type"] == kind)
+             for kind in ("ficr:Wall", "ficr:Doorset", "ficr:Ceiling")}
+
+    run("Missing ficr: prefix on enum",
+        set_path("spaces", 0, "type", "RoomSpace"))
+    run("Enum near-miss",
+        set_path("storeys", 1, "type", "ficr:GroundAndAboveStory"))
+    run("Case / namespace variant",
+        set_path("building", "purpose_group",
+                 "https://w3id.org/bam/ficr#purposegroup1A"))
+    run("Element type discriminator (oneOf)",
+        set_path("elements", first["ficr:Ceiling"], "type", "Ceiling"))
+    run("Enum-or-null near-miss",
+        set_path("risk_units", 0, "installation_status",
+                 "Unsprinklered or non compliant"))
+    run("Number-typed strings",
+        lambda d: (set_path("storeys", 0, "elevation_m", "-1.0")(d),
+                   set_path("elements", first["ficr:Doorset"], "rei", "30")(d)))
+    run("Number string inside a oneOf branch",
+        lambda d: (set_path("elements", first["ficr:Wall"], "type", "Wall")(d),
+                   set_path("elements", first["ficr:Wall"], "rei", "60")(d)))
+    run("Missing optional array",
+        lambda d: d["elements"][first["ficr:Wall"]].update(usage_roles=None))
+    run("Prefixed reference",
+        lambda d: d["spaces"][1].update(
+            storey_ref="inst:" + d["spaces"][1]["storey_ref"]))
+    run("Unrepairable error left for the LLM",
+        set_path("spaces", 0, "storey_ref", "S-NOWHERE"), expect_valid=False)
+
+    report("Unrelated term not forced into an enum",
+           match_term("Garage", ["ficr:Kitchen", "ficr:Foyer"]) is None)
+
+    patch = extract_patch('Here you go:\n```json\n'
+                          '[{"op": "replace", "path": "/a", "value": 1}]\n```')
+    report("JSON Patch extracted from fenced reply", patch[0]["path"] == "/a")
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""test_survey_stream.py — Streamed LLM#1 output: incremental parse, checks, overlap."""
+
+import sys
+import json
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import ficr_json_to_rdf
+from ficr_abox_patch import apply_json_patch
+from ficr_survey_stream import SurveyStream, StructuralError
+from pipeline import get_validator, load_schema, stage_llm1
+
+
+def feed_all(text, size):
+    stream = SurveyStream()
+    events = []
+    for i in range(0, len(text), size):
+        events += stream.feed(text[i:i + size])
+    return stream, events
+
+
+class StreamingLLM:
+    """Scripted LLM#1: streams each reply in 20-char chunks."""
+
+    provider, model = "scripted", "mock"
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.sent = []          # chars streamed per call
+        self.closed = []
+
+    def stream(self, system, user):
+        text = self.replies.pop(0)
+        self.sent.append(0)
+        try:
+            for i in range(0, len(text), 20):
+                self.sent[-1] += len(text[i:i + 20])
+                yield text[i:i + 20]
+        finally:
+            self.closed.append(True)
+
+
+def main():
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    n_records = sum(len(v) for v in survey.values() if isinstance(v, list))
+    pretty = json.dumps(survey, indent=2, ensure_ascii=False)
+
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    # ── Incremental parsing ───────────────────────────────────────
+    results = []
+    for size in (1, 13, 4096):
+        stream, events = feed_all(pretty, size)
+        results.append(stream.document() == survey
+                       and sum(1 for e in events if e[1] is not None) == n_records
+                       and [e[0] for e in events if e[1] is None]
+                       == ["meta", "building"])
+    report("Every record emitted once, at any chunk size", all(results))
+
+    stream, events = feed_all(pretty, 50)
+    first_space = next(i for i, e in enumerate(events) if e[0] == "spaces")
+    report("Records emitted in document order with indices",
+           events[first_space][1:] == (0, survey["spaces"][0])
+           and events[-1] == ("evidence_log", len(survey["evidence_log"]) - 1,
+                              survey["evidence_log"][-1]))
+
+    fenced = ("Here is the survey:\n```json\n" + pretty + "\n```\n\n"
+              "Notes: {assumptions} " + "x" * 200)
+    stream, _ = feed_all(fenced, 64)
+    report("Code fence and surrounding prose ignored",
+           stream.document() == survey)
+
+    tricky = {"meta": {"note": 'brace } bracket ] quote " slash \\'},
+              "spaces": [{"id": "S-1", "label": "A \"quoted\" {room}"}]}
+    stream, events = feed_all(json.dumps(tricky), 3)
+    report("Escapes and brackets inside strings",
+           stream.document() == tricky and events[-1][2] == tricky["spaces"][0])
+
+    # ── Structural errors abort early ─────────────────────────────
+    def then_rest(head):
+        """*head* followed by the rest of the survey, unbroken."""
+        return json.dumps(head)[:-1] + ", " + json.dumps(
+            {k: survey[k] for k in ("elements", "evidence_log")})[1:]
+
+    cases = {
+        "Malformed record":
+            pretty.replace('"type": "ficr:Wall"', '"type" "ficr:Wall"', 1),
+        "Section not an array":
+            then_rest({"meta": survey["meta"], "spaces": {"id": "S-1"}}),
+        "Record not an object":
+            then_rest({"meta": survey["meta"], "storeys": ["S-L0"]}),
+        "Mismatched bracket":
+            then_rest({"meta": survey["meta"]}).replace("}", "]", 1),
+    }
+    for label, text in cases.items():
+        stream = SurveyStream()
+        error = None
+        for i in range(0, len(text), 20):
+            try:
+                stream.feed(text[i:i + 20])
+            except StructuralError as e:
+                error = e
+                break
+        seen = stream.received
+        report(f"{label} detected as it streams",
+               error is not None and seen <= max(len(text) // 2, 60),
+               f"  (after {seen}/{len(text)} chars)")
+
+    stream, _ = feed_all(pretty[:len(pretty) // 2], 100)
+    try:
+        stream.document()
+        ok = False
+    except StructuralError:
+        ok = True
+    report("Truncated document rejected", ok)
+
+    # ── Per-record validation ─────────────────────────────────────
+    validator = get_validator()
+    space = dict(survey["spaces"][3], type="Room")
+    errors = validator.record_errors("spaces", 3, space)
+    report("Record checked against its section's item schema",
+           len(errors) == 1 and errors[0].startswith("spaces.3.type:")
+           and not validator.record_errors("spaces", 0, survey["spaces"][0]))
+
+    # ── Stage 2 overlap ───────────────────────────────────────────
+    converter = ficr_json_to_rdf.IncrementalConverter()
+    stream, events = feed_all(pretty, 200)
+    for section, index, record in events:
+        converter.add(section, record)
+    changed = apply_json_patch(stream.document(), [
+        {"op": "replace", "path": "/elements/0/label",
+         "value": "Repaired after streaming"},
+        {"op": "remove", "path": "/spaces/0/adjacent_elements/0"}])
+    g = converter.convert(changed)
+    report("Incremental conversion equals convert(), only changes re-emitted",
+           set(g) == set(ficr_json_to_rdf.convert(changed))
+           and converter.records == n_records + 1
+           and converter.reused == n_records - 1)
+
+    converter = ficr_json_to_rdf.IncrementalConverter()
+    for section, index, record in feed_all(pretty, 200)[1]:
+        converter.add(section, record)
+    converter.add("elements", survey["elements"][0])       # duplicate id
+    report("Untrustworthy streamed graph falls back to a full conversion",
+           set(converter.convert(survey))
+           == set(ficr_json_to_rdf.convert(survey))
+           and converter.reused == 0)
+
+    # ── stage_llm1 ────────────────────────────────────────────────
+    broken = pretty.replace('"label"', '"label" 1', 3)
+    llm = StreamingLLM(broken, fenced)
+    converter = ficr_json_to_rdf.IncrementalConverter()
+    result = stage_llm1(llm, "description", load_schema(), converter=converter)
+    report("Broken reply aborted early, regenerated, converted while streaming",
+           result == survey and llm.sent[0] < len(broken) // 4
+           and llm.closed == [True, True]
+           and converter.records == n_records + 1,     # + building
+           f"  (aborted after {llm.sent[0]}/{len(broken)} chars)")
+    report("Stream closed at the document's closing brace",
+           llm.sent[1] < len(fenced))
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
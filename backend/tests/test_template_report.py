@@ -0,0 +1,95 @@
+"""test_template_report.py — Report sections rendered from SPARQL rows, no LLM."""
+
+import sys
+import copy
+import json
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import ficr_json_to_rdf
+from pipeline import (TEMPLATE_SECTIONS, get_query_context,
+                      render_template_sections, report_llm_sections,
+                      stage_llm2)
+
+
+def main():
+    survey = json.loads((ROOT / "references" / "duplex_a_survey.json")
+                        .read_text(encoding="utf-8"))
+    data = get_query_context().run(ficr_json_to_rdf.convert(survey))
+
+    passed = 0
+    failed = 0
+
+    def report(label, ok, detail=""):
+        nonlocal passed, failed
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+        passed, failed = passed + ok, failed + (not ok)
+
+    # ── Rendering ─────────────────────────────────────────────────
+    sections = render_template_sections(data)
+    report("Template mode renders sections 1-5 in order",
+           [s.split("\n", 1)[0] for s in sections]
+           == ["## 1. Building Overview", "## 2. Element Inventory",
+               "## 3. Compliance Check", "## 4. Risk Assessment",
+               "## 5. Evidence Summary"])
+    report("Hybrid mode renders the tabular sections only",
+           len(render_template_sections(data, TEMPLATE_SECTIONS["hybrid"])) == 3)
+
+    overview = sections[0]
+    storeys = data["results"]["A1"]["rows"]
+    report("Overview counts storeys and spaces from the rows",
+           f"- **Storeys:** {len(storeys)}" in overview
+           and f"- **Spaces:** {sum(x['spaceCount'] for x in storeys)}"
+           in overview)
+
+    detail = data["results"]["B2"]["rows"]
+    failing = [x for x in detail if x.get("complianceStatus") != "Compliant"]
+    report("Compliance summary and one table row per failing element",
+           f"**{len(detail) - len(failing)} of {len(detail)}**" in sections[2]
+           and sum(1 for line in sections[2].splitlines()
+                   if line.startswith("| ")) >= len(failing) + 1)
+
+    tables_ok = True
+    for section in sections:
+        for line in section.splitlines():
+            if line.startswith("|") and not line.endswith("|"):
+                tables_ok = False
+    report("Every table line is well-formed Markdown", tables_ok)
+
+    # ── Missing data ──────────────────────────────────────────────
+    broken = copy.deepcopy(data)
+    broken["results"]["A1"] = {"title": "A1", "error": "timeout"}
+    broken["probes"]["B2"] = {"pass": False}
+    out = render_template_sections(broken)
+    report("Failed query or probe rendered as a no-data note",
+           "_No data for A1" in out[0] and "_No data for B2" in out[2])
+
+    escaped = copy.deepcopy(data)
+    escaped["results"]["A3"]["rows"] = [{"usageType": "a|b\nc", "count": 1.5}]
+    report("Cells escaped (pipes, newlines) and floats compact",
+           "| a\\|b c | 1.5 |" in render_template_sections(escaped, (1,))[0])
+
+    # ── Stage 4 without an LLM ────────────────────────────────────
+    text = stage_llm2(None, data, mode="template")
+    report("Template report needs no LLM and joins the sections",
+           report_llm_sections("template", False) == ()
+           and text.startswith("## 1. Building Overview")
+           and "## 6." not in text)
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""test_validator.py — SurveyValidator referential-integrity checks."""
+
+import json
+import copy
+import sys
+from pathlib import Path
+
+# Project root = parent of tests/
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline import SurveyValidator, load_schema
+
+
+def load_json(path):
+    with open(ROOT / path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check(label, validator, instance, expect_path=None):
+    """Expect no errors, or an error whose path starts with expect_path."""
+    errors = validator.validate(instance)
+    if expect_path is None:
+        ok = not errors
+        detail = f"  unexpected: {errors[:3]}" if errors else ""
+    else:
+        hits = [e for e in errors if e.startswith(expect_path + ":")]
+        ok = bool(hits)
+        detail = f"  reported: {hits[0]}" if ok else f"  got: {errors[:3]}"
+    print(f"  [{'PASS' if ok else 'FAIL'}] {label}{detail}")
+    return ok
+
+
+def main():
+    validator = SurveyValidator(load_schema())
+    survey = load_json("references/duplex_a_survey.json")
+
+    passed = 0
+    failed = 0
+
+    def run(label, instance, expect_path=None):
+        nonlocal passed, failed
+        if check(label, validator, instance, expect_path):
+            passed += 1
+        else:
+            failed += 1
+
+    print("\n=== POSITIVE SAMPLE (duplex_a_survey.json) ===")
+    run("Full survey JSON", survey)
+
+    print("\n=== REFERENTIAL INTEGRITY ===")
+
+    d = copy.deepcopy(survey)
+    d["spaces"][2]["storey_ref"] = "S-L9"
+    run("Dangling storey_ref", d, "spaces.2.storey_ref")
+
+    d = copy.deepcopy(survey)
+    d["spaces"][0]["adjacent_elements"].append("W-999")
+    n = len(d["spaces"][0]["adjacent_elements"]) - 1
+    run("Dangling adjacent_elements entry", d, f"spaces.0.adjacent_elements.{n}")
+
+    d = copy.deepcopy(survey)
+    d["spaces"][0]["adjacent_elements"].append(
+        d["spaces"][0]["adjacent_elements"][0])
+    run("Duplicate adjacent_elements entry", d, f"spaces.0.adjacent_elements.{n}")
+
+    d = copy.deepcopy(survey)
+    d["risk_units"][1]["covers_spaces"][0] = "RU-A"
+    run("covers_spaces pointing at a risk unit", d,
+        "risk_units.1.covers_spaces.0")
+
+    d = copy.deepcopy(survey)
+    d["boundary_assumptions"][3]["applies_to_risk_unit"] = "RU-Z"
+    run("Dangling applies_to_risk_unit", d,
+        "boundary_assumptions.3.applies_to_risk_unit")
+
+    d = copy.deepcopy(survey)
+    d["boundary_assumptions"][0]["supported_by_evidence"] = ["EV-404"]
+    run("Dangling supported_by_evidence", d,
+        "boundary_assumptions.0.supported_by_evidence.0")
+
+    d = copy.deepcopy(survey)
+    d["elements"][5]["id"] = d["elements"][4]["id"]
+    run("Duplicate element id", d, "elements.5.id")
+
+    d = copy.deepcopy(survey)
+    d["storeys"][1]["building_ref"] = "BLD-X"
+    run("Dangling building_ref", d, "storeys.1.building_ref")
+
+    print("\n=== SCHEMA ERRORS STILL REPORTED ===")
+
+    d = copy.deepcopy(survey)
+    d["elements"][0]["type"] = "ficr:Beam"
+    run("Invalid element type (Beam)", d, "elements.0")
+
+    d = copy.deepcopy(survey)
+    del d["risk_units"]
+    run("Missing 'risk_units' key", d, "(root)")
+
+    # ── Summary ───────────────────────────────────────────────────
+    total = passed + failed
+    print(f"\n{'='*50}")
+    print(f"  {passed}/{total} tests passed", end="")
+    if failed:
+        print(f"  ({failed} FAILED)")
+    else:
+        print("  — all green")
+    print()
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -102,7 +102,7 @@ export const Chatbot: React.FC = () => {
       const response = await fetch('/api/chatbot/run-pipeline', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ survey, provider, model }),
+        body: JSON.stringify({ survey, provider, model, compact: true }),
         signal: controller.signal,
       });
 
@@ -206,7 +206,34 @@ function extractLocalName(uri: string): string {
   return parts[parts.length - 1] || uri;
 }
 
+// Precomputed by the backend (backend/ontology_index.py); same shape as
+// ParsedOntology plus a hierarchy and search token index.
+const ONTOLOGY_INDEX_URL = '/api/chatbot/ontology/index';
+
+async function loadOntologyIndex(): Promise<ParsedOntology | null> {
+  try {
+    const response = await fetch(ONTOLOGY_INDEX_URL);
+    if (!response.ok) {
+      return null;
+    }
+    const index = await response.json();
+    return {
+      classes: index.classes,
+      objectProperties: index.objectProperties,
+      datatypeProperties: index.datatypeProperties,
+      metadata: index.metadata,
+    };
+  } catch {
+    return null;
+  }
+}
+
 export async function loadOntology(): Promise<ParsedOntology> {
+  const indexed = await loadOntologyIndex();
+  if (indexed) {
+    return indexed;
+  }
+  // Backend unavailable (e.g. static deployment): parse the TTL in the browser.
   try {
     const response = await fetch(`${import.meta.env.BASE_URL}ficr_tbox_0.13.0.ttl`);
     if (!response.ok) {